@@ -0,0 +1,173 @@
+"""Compare per-request JSON encode/decode time before and after lazy JSON columns
+
+"Before" parses the stored strings with json.loads on every access, the
+way the routes used to. "After" goes through the lazy_json attributes,
+once with the standard library codec and once with orjson if it is
+installed. Run from the repository root:
+
+    python benchmarks/json_fields.py --requests 2000 --json json_fields.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Jobs matched per batch request, as in match_jobs_batch
+BATCH_SIZE = 25
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--requests', type=int, default=2000, help='Simulated requests per scenario')
+    parser.add_argument('--json', help='Write the results to this file as JSON')
+    return parser.parse_args()
+
+def sample_documents():
+    """Stored JSON documents shaped like real profile, analysis and match rows"""
+    skills = [{'name': f'Skill {i}', 'level': 'advanced', 'relevance': 0.8} for i in range(25)]
+    experience = [
+        {'title': f'Engineer {i}', 'company': f'Company {i}', 'years': i + 1, 'description': 'Built things. ' * 20}
+        for i in range(6)
+    ]
+    education = [{'degree': 'BSc', 'field': 'Computer Science', 'school': 'University'}]
+    profile = {'firstName': {'localized': {'en_US': 'Ada'}}, 'headline': 'Engineer', 'summary': 'Summary. ' * 50}
+    analysis = {
+        'required_skills': [{'name': f'Skill {i}', 'importance': 'required'} for i in range(12)],
+        'experience_requirements': {'min_years': 5, 'seniority': 'senior'},
+        'education_requirements': {'degree': 'BSc', 'field': 'Computer Science'},
+        'responsibilities': ['Ship features. ' * 5] * 10
+    }
+    match = {
+        'match_score': 84,
+        'matching_skills': [f'Skill {i}' for i in range(10)],
+        'missing_skills': [f'Skill {i}' for i in range(10, 14)],
+        'experience_match': {'score': 0.9, 'notes': 'Strong fit. ' * 10},
+        'education_match': {'score': 1.0},
+        'explanation': 'Good match. ' * 40
+    }
+    return {
+        'profile': {'profile_data': profile, 'skills': skills, 'experience': experience, 'education': education},
+        'analysis': {
+            'required_skills': analysis['required_skills'],
+            'experience_requirements': analysis['experience_requirements'],
+            'education_requirements': analysis['education_requirements'],
+            'analysis_data': analysis
+        },
+        'match': {
+            'skills_match': match['matching_skills'],
+            'missing_skills': match['missing_skills'],
+            'experience_match': match['experience_match'],
+            'education_match': match['education_match'],
+            'match_details': match
+        }
+    }
+
+def loaded(model, raw_values):
+    """A model instance holding encoded columns, as if just loaded"""
+    from src.models.json_type import RawJSON
+
+    instance = model()
+    for column, raw in raw_values.items():
+        setattr(instance, f'_{column}', RawJSON(raw))
+    return instance
+
+def scenarios(documents):
+    """Request bodies by name, each as (before, after) callables"""
+    from src.models.models import JobAnalysis, JobMatch, LinkedInProfile
+
+    raw = {name: {column: json.dumps(value) for column, value in columns.items()} for name, columns in documents.items()}
+    match_result = documents['match']['match_details']
+
+    def view_before():
+        match, analysis = loaded(JobMatch, raw['match']), loaded(JobAnalysis, raw['analysis'])
+        for column in ('match_details', 'skills_match', 'missing_skills'):
+            json.loads(getattr(match, f'_{column}'))
+        for column in ('analysis_data', 'required_skills'):
+            json.loads(getattr(analysis, f'_{column}'))
+
+    def view_after():
+        match, analysis = loaded(JobMatch, raw['match']), loaded(JobAnalysis, raw['analysis'])
+        match.match_details, match.skills_match, match.missing_skills
+        analysis.analysis_data, analysis.required_skills
+
+    def batch_before():
+        # The profile and each analysis were parsed again for every job
+        profile = loaded(LinkedInProfile, raw['profile'])
+        analysis = loaded(JobAnalysis, raw['analysis'])
+        for _ in range(BATCH_SIZE):
+            for column in ('profile_data', 'skills', 'experience', 'education'):
+                json.loads(getattr(profile, f'_{column}'))
+            json.loads(analysis._analysis_data)
+
+    def batch_after():
+        profile = loaded(LinkedInProfile, raw['profile'])
+        analysis = loaded(JobAnalysis, raw['analysis'])
+        for _ in range(BATCH_SIZE):
+            profile.profile_data, profile.skills, profile.experience, profile.education
+            analysis.analysis_data
+
+    def save_before():
+        for _ in range(BATCH_SIZE):
+            match = JobMatch()
+            match._skills_match = json.dumps(match_result['matching_skills'])
+            match._missing_skills = json.dumps(match_result['missing_skills'])
+            match._experience_match = json.dumps(match_result['experience_match'])
+            match._education_match = json.dumps(match_result['education_match'])
+            match._match_details = json.dumps(match_result)
+
+    def save_after():
+        for _ in range(BATCH_SIZE):
+            match = JobMatch()
+            match.skills_match = match_result['matching_skills']
+            match.missing_skills = match_result['missing_skills']
+            match.experience_match = match_result['experience_match']
+            match.education_match = match_result['education_match']
+            match.match_details = match_result
+
+    return {
+        'jobs.view': (view_before, view_after),
+        f'match batch of {BATCH_SIZE}': (batch_before, batch_after),
+        f'save {BATCH_SIZE} matches': (save_before, save_after)
+    }
+
+def time_per_request(body, requests):
+    """Mean microseconds per call of body"""
+    body()  # warm up
+    started = time.perf_counter()
+    for _ in range(requests):
+        body()
+    return round((time.perf_counter() - started) / requests * 1e6, 2)
+
+def main():
+    args = parse_args()
+    sys.path.insert(0, ROOT)
+
+    import src.main  # the models bind to the app's db
+    from src.models import json_type
+
+    fast_codec = json_type.orjson
+    report = {'requests': args.requests, 'orjson': fast_codec is not None, 'scenarios': {}}
+
+    for name, (before, after) in scenarios(sample_documents()).items():
+        json_type.orjson = None
+        result = {
+            'before_us': time_per_request(before, args.requests),
+            'after_stdlib_us': time_per_request(after, args.requests)
+        }
+        if fast_codec is not None:
+            json_type.orjson = fast_codec
+            result['after_orjson_us'] = time_per_request(after, args.requests)
+
+        report['scenarios'][name] = result
+        print(f"{name}: " + ', '.join(f'{key} {value}' for key, value in result.items()))
+
+    json_type.orjson = fast_codec
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,176 @@
+"""Show how the hot lookup queries are planned before and after the index migration
+
+Seeds a throwaway SQLite database at the schema just before the indexes
+(0002), prints the query plan and timing for each hot query, upgrades to
+head and prints them again. Run from the repository root:
+
+    python benchmarks/query_plans.py --users 20 --jobs 5000 --json plans.json
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def parse_args():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=20)
+    parser.add_argument('--jobs', type=int, default=5000)
+    parser.add_argument('--repeat', type=int, default=50, help='Timed runs per query')
+    parser.add_argument('--json', help='Write the results to this file as JSON')
+    return parser.parse_args()
+
+def seed(db, users, jobs):
+    """Bulk insert users, jobs, matches, applications and summaries"""
+    from src.models.models import DailySummary, Job, JobApplication, JobMatch, LinkedInProfile, User
+
+    now = datetime.utcnow()
+    rng = random.Random(42)
+
+    db.session.execute(User.__table__.insert(), [
+        {'id': user_id, 'username': f'user{user_id}', 'email': f'user{user_id}@example.com',
+         'password_hash': 'x', 'verification_token': f'token-{user_id}', 'created_at': now}
+        for user_id in range(1, users + 1)
+    ])
+    db.session.execute(LinkedInProfile.__table__.insert(), [
+        {'user_id': user_id, 'profile_data': '{}'} for user_id in range(1, users + 1)
+    ])
+    db.session.execute(Job.__table__.insert(), [
+        {'id': job_id, 'linkedin_job_id': f'job-{job_id}', 'title': f'Job {job_id}',
+         'company': f'Company {job_id % 200}', 'employment_type': rng.choice(['Full-time', 'Contract', 'Part-time']),
+         'posted_at': now - timedelta(days=rng.randint(0, 60)), 'created_at': now}
+        for job_id in range(1, jobs + 1)
+    ])
+
+    for user_id in range(1, users + 1):
+        db.session.execute(JobMatch.__table__.insert(), [
+            {'user_id': user_id, 'job_id': job_id, 'match_score': rng.randint(0, 100),
+             'created_at': now - timedelta(days=rng.randint(0, 30)), 'updated_at': now}
+            for job_id in range(1, jobs + 1)
+        ])
+        db.session.execute(JobApplication.__table__.insert(), [
+            {'user_id': user_id, 'job_id': job_id, 'status': 'submitted',
+             'applied_at': now - timedelta(days=rng.randint(0, 30))}
+            for job_id in rng.sample(range(1, jobs + 1), jobs // 10)
+        ])
+        db.session.execute(DailySummary.__table__.insert(), [
+            {'user_id': user_id, 'date': (now - timedelta(days=day)).date()} for day in range(30)
+        ])
+
+    db.session.commit()
+
+def hot_queries(user_id, job_id):
+    """The lookups the routes run on every page view, by name"""
+    from sqlalchemy import and_, exists, func, select
+    from sqlalchemy.orm import aliased
+
+    from src.models.models import DailySummary, Job, JobAnalysis, JobApplication, JobMatch, LinkedInProfile, User
+
+    today = datetime.utcnow().date()
+    applied_to = aliased(JobApplication)
+
+    return {
+        'jobs.index page': select(JobMatch, Job, JobApplication).join(
+            Job, Job.id == JobMatch.job_id
+        ).outerjoin(
+            JobApplication, and_(JobApplication.job_id == JobMatch.job_id, JobApplication.user_id == user_id)
+        ).where(
+            JobMatch.user_id == user_id,
+            ~exists().where(applied_to.user_id == user_id, applied_to.job_id == JobMatch.job_id)
+        ).order_by(JobMatch.match_score.desc(), JobMatch.id).limit(26),
+        'match by user and job': select(JobMatch).where(JobMatch.user_id == user_id, JobMatch.job_id == job_id),
+        'application by user and job': select(JobApplication).where(
+            JobApplication.user_id == user_id, JobApplication.job_id == job_id
+        ),
+        'applications today': select(func.count()).select_from(JobApplication).where(
+            JobApplication.user_id == user_id,
+            JobApplication.applied_at >= datetime.combine(today, datetime.min.time())
+        ),
+        'excellent match count': select(func.count()).select_from(JobMatch).where(
+            JobMatch.user_id == user_id, JobMatch.match_score >= 90
+        ),
+        'analysis by job': select(JobAnalysis).where(JobAnalysis.job_id == job_id),
+        'profile by user': select(LinkedInProfile).where(LinkedInProfile.user_id == user_id),
+        'daily summary by user and date': select(DailySummary).where(
+            DailySummary.user_id == user_id, DailySummary.date == today
+        ),
+        'user by verification token': select(User).where(User.verification_token == f'token-{user_id}'),
+    }
+
+def explain(conn, stmt):
+    """Query plan lines for a statement on this connection's dialect"""
+    compiled = stmt.compile(dialect=conn.dialect)
+    params = compiled.construct_params()
+    if compiled.positiontup is not None:
+        params = tuple(params[name] for name in compiled.positiontup)
+
+    prefix = 'EXPLAIN QUERY PLAN' if conn.dialect.name == 'sqlite' else 'EXPLAIN'
+    rows = conn.exec_driver_sql(f'{prefix} {compiled}', params).fetchall()
+
+    if conn.dialect.name == 'sqlite':
+        return [row[-1] for row in rows]
+    return [' '.join(str(value) for value in row) for row in rows]
+
+def measure(db, queries, repeat):
+    """Plan and mean latency for each query"""
+    results = {}
+
+    with db.engine.connect() as conn:
+        for name, stmt in queries.items():
+            plan = explain(conn, stmt)
+
+            started = time.perf_counter()
+            for _ in range(repeat):
+                conn.execute(stmt).fetchall()
+            elapsed = (time.perf_counter() - started) / repeat
+
+            results[name] = {
+                'plan': plan,
+                'scans': sum(1 for line in plan if line.startswith('SCAN')),
+                'mean_ms': round(elapsed * 1000, 3)
+            }
+
+    return results
+
+def main():
+    args = parse_args()
+    workdir = tempfile.mkdtemp(prefix='query-plans-')
+    os.environ['DATABASE_URL'] = f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    sys.path.insert(0, ROOT)
+
+    from flask_migrate import upgrade
+
+    from src.main import app, db
+
+    migrations = os.path.join(ROOT, 'migrations')
+    report = {'users': args.users, 'jobs': args.jobs, 'repeat': args.repeat}
+
+    with app.app_context():
+        upgrade(directory=migrations, revision='0002')
+        seed(db, args.users, args.jobs)
+
+        queries = hot_queries(user_id=args.users // 2 or 1, job_id=args.jobs // 2 or 1)
+        report['before'] = measure(db, queries, args.repeat)
+
+        upgrade(directory=migrations, revision='head')
+        with db.engine.begin() as conn:
+            conn.exec_driver_sql('ANALYZE')
+        report['after'] = measure(db, queries, args.repeat)
+
+    for name in queries:
+        before, after = report['before'][name], report['after'][name]
+        print(f'{name}: {before["mean_ms"]} ms -> {after["mean_ms"]} ms')
+        print(f'  before: {" | ".join(before["plan"])}')
+        print(f'  after:  {" | ".join(after["plan"])}')
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+if __name__ == '__main__':
+    main()
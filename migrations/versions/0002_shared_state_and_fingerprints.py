@@ -0,0 +1,211 @@
+"""shared state and fingerprints
+
+Adds what the models gained before the schema was managed with
+migrations: the background task queue, the Grok-3 result cache, job
+analysis leases and outbound guard state tables, the input fingerprint
+columns, and job_match.updated_at (filled from created_at). Job
+analyses become one per job, so duplicate rows left by older code are
+removed first, keeping the oldest.
+
+Fingerprints are filled in for existing profiles, criteria and
+analyses. Existing matches are stamped with their user's and job's
+current fingerprints, so upgrading does not send every match back to
+Grok-3; they are recomputed once their inputs next change.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 09:12:37.508114
+
+"""
+import hashlib
+import json
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+# Fingerprinted tables: (table, fingerprint column, owner column, plain columns, JSON columns),
+# hashed in the order compute_fingerprint() uses
+FINGERPRINTS = [
+    ('linked_in_profile', 'profile_fingerprint', 'user_id', [], ['profile_data', 'skills', 'experience', 'education']),
+    ('matching_criteria', 'fingerprint', 'user_id',
+     ['min_match_threshold', 'skills_weight', 'experience_weight', 'education_weight'], ['preferred_companies']),
+    ('job_analysis', 'fingerprint', 'job_id', [], ['analysis_data']),
+]
+
+
+def decode(raw):
+    # JSON columns reach fingerprint() decoded, as the models see them
+    if raw is None:
+        return None
+    try:
+        return json.loads(raw)
+    except ValueError:
+        return raw
+
+
+def fingerprint(*values):
+    # Copy of src.models.models.fingerprint at this revision
+    digest = hashlib.sha256()
+    for value in values:
+        if isinstance(value, (dict, list)):
+            value = json.dumps(value)
+        digest.update(b'\0' if value is None else str(value).encode('utf-8'))
+        digest.update(b'\x1f')
+    return digest.hexdigest()
+
+
+def backfill_fingerprints(conn):
+    stamps = {}
+
+    for table_name, target, owner, plain_columns, json_columns in FINGERPRINTS:
+        table = sa.table(
+            table_name, sa.column('id'), sa.column(owner), sa.column(target),
+            *[sa.column(column) for column in plain_columns + json_columns]
+        )
+        updates = []
+        # Oldest row per owner, the one 0003 keeps
+        owners = stamps[table_name] = {}
+
+        for row in conn.execute(sa.select(table).order_by(table.c.id)):
+            stamp = fingerprint(
+                *[getattr(row, column) for column in plain_columns],
+                *[decode(getattr(row, column)) for column in json_columns]
+            )
+            updates.append({'row_id': row.id, 'stamp': stamp})
+            owners.setdefault(getattr(row, owner), stamp)
+
+        if updates:
+            conn.execute(
+                table.update().where(table.c.id == sa.bindparam('row_id')).values({target: sa.bindparam('stamp')}),
+                updates
+            )
+
+    # Matches take the fingerprints of the inputs they stand for today
+    job_match = sa.table(
+        'job_match', sa.column('user_id'), sa.column('job_id'),
+        sa.column('profile_fingerprint'), sa.column('criteria_fingerprint'), sa.column('analysis_fingerprint')
+    )
+    for column, key, owners in [
+        ('profile_fingerprint', 'user_id', stamps['linked_in_profile']),
+        ('criteria_fingerprint', 'user_id', stamps['matching_criteria']),
+        ('analysis_fingerprint', 'job_id', stamps['job_analysis']),
+    ]:
+        if owners:
+            conn.execute(
+                job_match.update().where(job_match.c[key] == sa.bindparam('owner')).values({column: sa.bindparam('stamp')}),
+                [{'owner': owner, 'stamp': stamp} for owner, stamp in owners.items()]
+            )
+
+
+def upgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    op.create_table('grok_cache_entry',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('cache_key', sa.String(length=64), nullable=False),
+    sa.Column('analysis_type', sa.String(length=50), nullable=False),
+    sa.Column('result_data', sa.Text(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('cache_key')
+    )
+    op.create_table('outbound_service_state',
+    sa.Column('service', sa.String(length=50), nullable=False),
+    sa.Column('tokens', sa.Double(), nullable=False),
+    sa.Column('refilled_at', sa.Double(), nullable=False),
+    sa.Column('breaker_state', sa.String(length=20), nullable=False),
+    sa.Column('failure_count', sa.Integer(), nullable=False),
+    sa.Column('opened_at', sa.Double(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.PrimaryKeyConstraint('service')
+    )
+    op.create_table('background_task',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=True),
+    sa.Column('task_type', sa.String(length=50), nullable=False),
+    sa.Column('payload', sa.Text(), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('progress', sa.Integer(), nullable=True),
+    sa.Column('message', sa.String(length=200), nullable=True),
+    sa.Column('result', sa.Text(), nullable=True),
+    sa.Column('error', sa.Text(), nullable=True),
+    sa.Column('attempts', sa.Integer(), nullable=True),
+    sa.Column('locked_by', sa.String(length=100), nullable=True),
+    sa.Column('locked_until', sa.DateTime(), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.Column('started_at', sa.DateTime(), nullable=True),
+    sa.Column('finished_at', sa.DateTime(), nullable=True),
+    sa.Column('updated_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['user.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('job_analysis_lease',
+    sa.Column('job_id', sa.Integer(), nullable=False),
+    sa.Column('owner', sa.String(length=100), nullable=False),
+    sa.Column('expires_at', sa.DateTime(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['job_id'], ['job.id'], ),
+    sa.PrimaryKeyConstraint('job_id')
+    )
+
+    with op.batch_alter_table('linked_in_profile', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('profile_fingerprint', sa.String(length=64), nullable=True))
+
+    with op.batch_alter_table('matching_criteria', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('fingerprint', sa.String(length=64), nullable=True))
+
+    with op.batch_alter_table('job_match', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('profile_fingerprint', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('criteria_fingerprint', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('analysis_fingerprint', sa.String(length=64), nullable=True))
+        batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=True))
+
+    # ### end Alembic commands ###
+
+    job_match = sa.table('job_match', sa.column('created_at'), sa.column('updated_at'))
+    op.execute(job_match.update().where(job_match.c.updated_at.is_(None)).values(updated_at=job_match.c.created_at))
+
+    # The derived table keeps MySQL from rejecting a subquery on the table being deleted from
+    op.execute(
+        'DELETE FROM job_analysis WHERE id NOT IN '
+        '(SELECT id FROM (SELECT MIN(id) AS id FROM job_analysis GROUP BY job_id) AS keep)'
+    )
+
+    with op.batch_alter_table('job_analysis', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('fingerprint', sa.String(length=64), nullable=True))
+        batch_op.create_unique_constraint('uq_job_analysis_job_id', ['job_id'])
+
+    backfill_fingerprints(op.get_bind())
+
+
+def downgrade():
+    # ### commands auto generated by Alembic - please adjust! ###
+    with op.batch_alter_table('job_analysis', schema=None) as batch_op:
+        batch_op.drop_constraint('uq_job_analysis_job_id', type_='unique')
+        batch_op.drop_column('fingerprint')
+
+    with op.batch_alter_table('job_match', schema=None) as batch_op:
+        batch_op.drop_column('updated_at')
+        batch_op.drop_column('analysis_fingerprint')
+        batch_op.drop_column('criteria_fingerprint')
+        batch_op.drop_column('profile_fingerprint')
+
+    with op.batch_alter_table('matching_criteria', schema=None) as batch_op:
+        batch_op.drop_column('fingerprint')
+
+    with op.batch_alter_table('linked_in_profile', schema=None) as batch_op:
+        batch_op.drop_column('profile_fingerprint')
+
+    op.drop_table('job_analysis_lease')
+    op.drop_table('background_task')
+    op.drop_table('outbound_service_state')
+    op.drop_table('grok_cache_entry')
+    # ### end Alembic commands ###
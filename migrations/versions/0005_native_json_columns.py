@@ -0,0 +1,59 @@
+"""native json columns
+
+Stores the JSON document columns as native JSON on MySQL, which validates
+them on write. Other databases keep them as TEXT, so this is a no-op
+there. Rows holding invalid JSON make the ALTER fail and must be fixed
+first.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-18 05:02:41.318204
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0005'
+down_revision = '0004'
+branch_labels = None
+depends_on = None
+
+
+# JSONText columns, by table
+JSON_COLUMNS = [
+    ('background_task', ['payload', 'result']),
+    ('daily_summary', ['summary_data']),
+    ('job', ['industries', 'job_data']),
+    ('job_analysis', ['required_skills', 'experience_requirements', 'education_requirements', 'analysis_data']),
+    ('job_match', ['skills_match', 'missing_skills', 'experience_match', 'education_match', 'match_details']),
+    ('job_preference', ['industries', 'job_types']),
+    ('linked_in_profile', ['profile_data', 'skills', 'experience', 'education']),
+    ('matching_criteria', ['preferred_companies']),
+    ('user_stats', ['top_matches']),
+]
+
+
+def is_mysql():
+    return op.get_bind().dialect.name in ('mysql', 'mariadb')
+
+
+def upgrade():
+    if not is_mysql():
+        return
+
+    for table, columns in JSON_COLUMNS:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            for column in columns:
+                batch_op.alter_column(column, existing_type=sa.Text(), type_=sa.JSON(), existing_nullable=True)
+
+
+def downgrade():
+    if not is_mysql():
+        return
+
+    for table, columns in JSON_COLUMNS:
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            for column in columns:
+                batch_op.alter_column(column, existing_type=sa.JSON(), type_=sa.Text(), existing_nullable=True)
@@ -0,0 +1,87 @@
+import os
+import secrets
+
+from sqlalchemy import event
+from sqlalchemy.engine import URL
+
+# Connection pool settings for MySQL and other server databases
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '10'))
+DB_MAX_OVERFLOW = int(os.getenv('DB_MAX_OVERFLOW', '20'))
+DB_POOL_TIMEOUT = int(os.getenv('DB_POOL_TIMEOUT', '30'))  # seconds to wait for a free connection
+DB_POOL_RECYCLE = int(os.getenv('DB_POOL_RECYCLE', '280'))  # seconds, below MySQL's idle disconnect
+
+# SQLite connection profile, applied to every new connection
+SQLITE_JOURNAL_MODE = os.getenv('SQLITE_JOURNAL_MODE', 'WAL')
+SQLITE_SYNCHRONOUS = os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL')
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv('SQLITE_BUSY_TIMEOUT_MS', '5000'))
+SQLITE_MMAP_SIZE = int(os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)))
+
+DEFAULT_DATABASE_URI = 'sqlite:///linkedin_jobs.db'
+
+def database_uri():
+    """DATABASE_URL if set, else MySQL from the DB_* variables, else local SQLite"""
+    uri = os.getenv('DATABASE_URL')
+    if uri:
+        # Hosting providers hand out mysql:// URLs; use the PyMySQL driver we ship
+        if uri.startswith('mysql://'):
+            uri = 'mysql+pymysql://' + uri[len('mysql://'):]
+        return uri
+
+    if os.getenv('DB_HOST'):
+        return URL.create(
+            'mysql+pymysql',
+            username=os.getenv('DB_USERNAME'),
+            password=os.getenv('DB_PASSWORD'),
+            host=os.getenv('DB_HOST'),
+            port=int(os.getenv('DB_PORT') or 3306),
+            database=os.getenv('DB_NAME'),
+            query={'charset': 'utf8mb4'}
+        ).render_as_string(hide_password=False)
+
+    return DEFAULT_DATABASE_URI
+
+def engine_options(uri):
+    """SQLAlchemy engine options for the database at uri"""
+    if uri.startswith('sqlite'):
+        # SQLite needs no pool tuning; its profile is applied per connection
+        return {}
+
+    return {
+        'pool_size': DB_POOL_SIZE,
+        'max_overflow': DB_MAX_OVERFLOW,
+        'pool_timeout': DB_POOL_TIMEOUT,
+        'pool_recycle': DB_POOL_RECYCLE,
+        'pool_pre_ping': True
+    }
+
+def apply_sqlite_profile(engine):
+    """Set the SQLite pragmas on every connection the engine opens
+
+    WAL lets readers run alongside the single writer, so gunicorn workers
+    stop queueing behind each other's reads. synchronous=NORMAL is safe in
+    WAL mode, and busy_timeout makes writers wait for the lock instead of
+    failing at once.
+    """
+    if engine.dialect.name != 'sqlite':
+        return
+
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute(f'PRAGMA journal_mode={SQLITE_JOURNAL_MODE}')
+        cursor.execute(f'PRAGMA synchronous={SQLITE_SYNCHRONOUS}')
+        cursor.execute(f'PRAGMA busy_timeout={SQLITE_BUSY_TIMEOUT_MS}')
+        cursor.execute(f'PRAGMA mmap_size={SQLITE_MMAP_SIZE}')
+        cursor.close()
+
+def secret_key():
+    """SECRET_KEY from the environment
+
+    Falls back to a random key, which logs everyone out on restart and
+    differs between gunicorn workers, so production must set it.
+    """
+    key = os.getenv('SECRET_KEY')
+    if not key:
+        print("SECRET_KEY is not set; using a random key for this process")
+        key = secrets.token_hex(16)
+    return key
@@ -1,27 +1,35 @@
 from flask import Flask, render_template, request, redirect, url_for, flash, jsonify, session
 from flask_sqlalchemy import SQLAlchemy
+from flask_migrate import Migrate
 from werkzeug.security import generate_password_hash, check_password_hash
 import os
 import sys
 import json
 import requests
 from datetime import datetime, timedelta
-import secrets
+import click
 
 # Add the parent directory to sys.path
 sys.path.insert(0, os.path.dirname(os.path.dirname(__file__)))
 
+from src.config import apply_sqlite_profile, database_uri, engine_options, secret_key
+
 # Initialize Flask app
 app = Flask(__name__)
-app.config['SECRET_KEY'] = secrets.token_hex(16)
+app.config['SECRET_KEY'] = secret_key()
 
-# Configure database
-app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///linkedin_jobs.db'
+# Configure database from DATABASE_URL or the DB_* variables
+app.config['SQLALCHEMY_DATABASE_URI'] = database_uri()
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config['SQLALCHEMY_DATABASE_URI'])
 
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
 
-# Initialize database
+# Initialize database; the schema is managed by migrations (flask db upgrade)
 db = SQLAlchemy(app)
+migrate = Migrate(app, db, render_as_batch=True)
+
+with app.app_context():
+    apply_sqlite_profile(db.engine)
 
 # Import routes after app initialization to avoid circular imports
 from src.routes.auth import auth_bp
@@ -29,6 +37,9 @@ from src.routes.dashboard import dashboard_bp
 from src.routes.wizard import wizard_bp
 from src.routes.jobs import jobs_bp
 from src.routes.settings import settings_bp
+from src.routes.grok import grok_bp
+from src.routes.tasks import tasks_bp
+from src.routes.metrics import metrics_bp
 
 # Register blueprints
 app.register_blueprint(auth_bp)
@@ -36,6 +47,21 @@ app.register_blueprint(dashboard_bp)
 app.register_blueprint(wizard_bp)
 app.register_blueprint(jobs_bp)
 app.register_blueprint(settings_bp)
+app.register_blueprint(grok_bp)
+app.register_blueprint(tasks_bp)
+app.register_blueprint(metrics_bp)
+
+# Write API call logs in the background, in bulk
+from src.services.api_log import api_log_buffer
+api_log_buffer.init_app(app)
+
+# Request, outbound API and database timing histograms
+from src.services.metrics import metrics
+metrics.init_app(app)
+
+# Opt-in per-request profiler (PROFILER_ENABLED or a signed X-Profile header)
+from src.services.profiler import request_profiler
+request_profiler.init_app(app)
 
 # LinkedIn API configuration
 LINKEDIN_CLIENT_ID = os.getenv('LINKEDIN_CLIENT_ID', '')
@@ -67,11 +93,77 @@ def utility_processor():
     def is_active(route):
         return request.path.startswith(route)
     
-    return dict(is_active=is_active)
+    from src.services.match_stats import match_bucket
+    return dict(is_active=is_active, match_bucket=match_bucket)
 
-# Initialize database tables
-with app.app_context():
-    db.create_all()
+# Schema migration command for deploys
+@app.cli.command('upgrade-db')
+def upgrade_db():
+    """Apply migrations, stamping databases built by db.create_all() at 0001 first"""
+    from flask_migrate import stamp, upgrade
+    from sqlalchemy import inspect
+    
+    tables = set(inspect(db.engine).get_table_names())
+    if 'user' in tables and 'alembic_version' not in tables:
+        # The initial schema is already there, so only record it
+        click.echo('Database predates migrations; stamping it at 0001')
+        stamp(revision='0001')
+    upgrade()
+
+# Background task worker command
+@app.cli.command('worker')
+@click.option('--poll-interval', type=float, default=None, help='Seconds to sleep when the queue is empty')
+@click.option('--once', is_flag=True, help='Exit once the queue is empty')
+def worker(poll_interval, once):
+    """Run the background task worker"""
+    from src.services.tasks import run_worker
+    run_worker(app, poll_interval=poll_interval, once=once)
+
+# Daily summary rollup command
+@app.cli.command('rollup-daily-summaries')
+@click.option('--date', 'day', type=click.DateTime(formats=['%Y-%m-%d']), default=None, help='Day to roll up (default: yesterday, UTC)')
+@click.option('--until', type=click.DateTime(formats=['%Y-%m-%d']), default=None, help='Backfill every day from --date to this day')
+def rollup_daily_summaries(day, until):
+    """Compute DailySummary rows for every user"""
+    from datetime import datetime, timedelta
+    from src.services.daily_rollup import backfill_daily_summaries
+    
+    first_day = day.date() if day else datetime.utcnow().date() - timedelta(days=1)
+    last_day = until.date() if until else first_day
+    if last_day < first_day:
+        raise click.BadParameter('--until must not be before --date')
+    
+    written = backfill_daily_summaries(first_day, last_day)
+    click.echo(f'Wrote {written} daily summaries for {first_day} to {last_day}')
+
+# API call log retention command
+@app.cli.command('rollup-api-calls')
+@click.option('--days', type=int, default=None, help='Keep raw logs this many days (default: API_LOG_RETENTION_DAYS)')
+def rollup_api_calls(days):
+    """Roll old API call logs up into per-minute aggregates and delete them"""
+    from src.services.api_log import rollup_api_calls
+    
+    rolled = rollup_api_calls(days)
+    click.echo(f'Rolled up {rolled} API call logs')
+
+# Grok-3 cache retention command
+@app.cli.command('purge-grok-cache')
+def purge_grok_cache():
+    """Delete expired Grok-3 results from the database cache"""
+    from src.services.grok_cache import grok_cache
+    
+    purged = grok_cache.purge_expired()
+    click.echo(f'Purged {purged} expired Grok-3 cache entries')
+
+# Request profiler header command
+@app.cli.command('profile-token')
+@click.option('--cprofile', is_flag=True, help='Also capture a cProfile of each profiled request')
+def profile_token(cprofile):
+    """Print an X-Profile header value that turns on profiling for a request"""
+    from src.services.profiler import PROFILE_HEADER, PROFILER_TOKEN_MAX_AGE, request_profiler
+    
+    click.echo(f'{PROFILE_HEADER}: {request_profiler.token(cprofile)}')
+    click.echo(f'Valid for {PROFILER_TOKEN_MAX_AGE} seconds', err=True)
 
 if __name__ == '__main__':
     app.run(host='0.0.0.0', debug=True)
@@ -0,0 +1,96 @@
+import json
+
+from sqlalchemy.orm import synonym
+from sqlalchemy.types import Text, TypeDecorator, UserDefinedType
+
+try:
+    import orjson
+except ImportError:  # pinned in requirements.txt; the slower stdlib codec keeps bare checkouts working
+    orjson = None
+
+def dumps(value):
+    """Encode value as a JSON string with the fastest codec available"""
+    if orjson is not None:
+        return orjson.dumps(
+            value, default=str, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+        ).decode('utf-8')
+    return json.dumps(value, default=str)
+
+def loads(raw):
+    """Decode a JSON string with the fastest codec available"""
+    if orjson is not None:
+        # orjson only takes exact str, so unwrap RawJSON first
+        return orjson.loads(str(raw))
+    return json.loads(raw)
+
+class RawJSON(str):
+    """A JSON document still in its encoded form"""
+    __slots__ = ()
+
+class NativeJSON(UserDefinedType):
+    """MySQL's JSON column type, passing encoded documents through untouched"""
+    cache_ok = True
+
+    def get_col_spec(self, **kw):
+        return 'JSON'
+
+class JSONText(TypeDecorator):
+    """JSON document column, stored as text or as native JSON on MySQL
+
+    Loaded values stay encoded (as RawJSON) until a lazy_json attribute
+    decodes them, so rows that are never inspected cost no parsing. Any
+    other value bound to the column, including a plain str, is encoded.
+    """
+    impl = Text
+    cache_ok = True
+
+    def load_dialect_impl(self, dialect):
+        if dialect.name in ('mysql', 'mariadb'):
+            return dialect.type_descriptor(NativeJSON())
+        return dialect.type_descriptor(Text())
+
+    def process_bind_param(self, value, dialect):
+        if value is None or isinstance(value, RawJSON):
+            return value
+        return dumps(value)
+
+    def process_result_value(self, value, dialect):
+        return None if value is None else RawJSON(value)
+
+class LazyJSON:
+    """Decodes a JSONText column on first access and caches the result
+
+    The decoded value is kept on the instance until the column is assigned
+    or reloaded. In-place changes to a decoded value are not saved; assign
+    the value back to write it.
+    """
+
+    def __init__(self, column_key):
+        self.column_key = column_key
+
+    def __get__(self, instance, owner):
+        if instance is None:
+            return self
+
+        raw = getattr(instance, self.column_key)
+        cache = instance.__dict__.setdefault('_decoded_json', {})
+        cached = cache.get(self.column_key)
+        if cached is not None and cached[0] is raw:
+            return cached[1]
+
+        value = None if raw is None else loads(raw)
+        cache[self.column_key] = (raw, value)
+        return value
+
+    def __set__(self, instance, value):
+        raw = None if value is None else RawJSON(dumps(value))
+        setattr(instance, self.column_key, raw)
+        instance.__dict__.setdefault('_decoded_json', {})[self.column_key] = (raw, value)
+
+def lazy_json(column_key):
+    """Decoded view of the JSONText column mapped at column_key
+
+    Reads and writes Python values on instances and still works in query
+    expressions under its own name.
+    """
+    return synonym(column_key, descriptor=LazyJSON(column_key))
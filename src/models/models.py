@@ -1,6 +1,21 @@
 from flask_sqlalchemy import SQLAlchemy
+import hashlib
+import json
 from datetime import datetime
+from sqlalchemy import event
 from src.main import db
+from src.models.json_type import JSONText, lazy_json
+
+def fingerprint(*values):
+    """Stable SHA-256 over the given column values"""
+    digest = hashlib.sha256()
+    for value in values:
+        if isinstance(value, (dict, list)):
+            # Decoded JSON columns hash the same as the strings they used to be
+            value = json.dumps(value)
+        digest.update(b'\0' if value is None else str(value).encode('utf-8'))
+        digest.update(b'\x1f')
+    return digest.hexdigest()
 
 class User(db.Model):
     id = db.Column(db.Integer, primary_key=True)
@@ -10,7 +25,7 @@ class User(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     is_active = db.Column(db.Boolean, default=True)
     is_verified = db.Column(db.Boolean, default=False)
-    verification_token = db.Column(db.String(100), nullable=True)
+    verification_token = db.Column(db.String(100), unique=True, index=True, nullable=True)
     
     # Relationships
     linkedin_profile = db.relationship('LinkedInProfile', backref='user', uselist=False)
@@ -23,26 +38,36 @@ class User(db.Model):
 
 class LinkedInProfile(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), unique=True, index=True, nullable=False)  # one row per user
     linkedin_id = db.Column(db.String(100), nullable=True)
     access_token = db.Column(db.String(500), nullable=True)
     refresh_token = db.Column(db.String(500), nullable=True)
     token_expiry = db.Column(db.DateTime, nullable=True)
-    profile_data = db.Column(db.Text, nullable=True)  # JSON string of profile data
-    skills = db.Column(db.Text, nullable=True)  # JSON string of skills
-    experience = db.Column(db.Text, nullable=True)  # JSON string of experience
-    education = db.Column(db.Text, nullable=True)  # JSON string of education
+    _profile_data = db.Column('profile_data', JSONText, nullable=True)  # JSON document of profile data
+    profile_data = lazy_json('_profile_data')
+    _skills = db.Column('skills', JSONText, nullable=True)  # JSON document of skills
+    skills = lazy_json('_skills')
+    _experience = db.Column('experience', JSONText, nullable=True)  # JSON document of experience
+    experience = lazy_json('_experience')
+    _education = db.Column('education', JSONText, nullable=True)  # JSON document of education
+    education = lazy_json('_education')
+    profile_fingerprint = db.Column(db.String(64), nullable=True)  # stamp of the data matches are computed from
     last_updated = db.Column(db.DateTime, default=datetime.utcnow)
     
+    def compute_fingerprint(self):
+        return fingerprint(self.profile_data, self.skills, self.experience, self.education)
+    
     def __repr__(self):
         return f'<LinkedInProfile {self.linkedin_id}>'
 
 class JobPreference(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), unique=True, index=True, nullable=False)  # one row per user
     location = db.Column(db.String(100), default='UAE')
-    industries = db.Column(db.Text, nullable=True)  # JSON string of industries
-    job_types = db.Column(db.Text, nullable=True)  # JSON string of job types
+    _industries = db.Column('industries', JSONText, nullable=True)  # JSON document of industries
+    industries = lazy_json('_industries')
+    _job_types = db.Column('job_types', JSONText, nullable=True)  # JSON document of job types
+    job_types = lazy_json('_job_types')
     experience_level = db.Column(db.String(50), nullable=True)
     salary_min = db.Column(db.Integer, nullable=True)
     salary_max = db.Column(db.Integer, nullable=True)
@@ -54,21 +79,32 @@ class JobPreference(db.Model):
 
 class MatchingCriteria(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), unique=True, index=True, nullable=False)  # one row per user
     min_match_threshold = db.Column(db.Integer, default=80)
     skills_weight = db.Column(db.Integer, default=40)
     experience_weight = db.Column(db.Integer, default=35)
     education_weight = db.Column(db.Integer, default=25)
-    preferred_companies = db.Column(db.Text, nullable=True)  # JSON string of companies
+    _preferred_companies = db.Column('preferred_companies', JSONText, nullable=True)  # JSON document of companies
+    preferred_companies = lazy_json('_preferred_companies')
+    fingerprint = db.Column(db.String(64), nullable=True)  # stamp of the criteria matches are computed from
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     
+    def compute_fingerprint(self):
+        return fingerprint(
+            self.min_match_threshold,
+            self.skills_weight,
+            self.experience_weight,
+            self.education_weight,
+            self.preferred_companies
+        )
+    
     def __repr__(self):
         return f'<MatchingCriteria {self.user_id}>'
 
 class ApplicationSetting(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), unique=True, index=True, nullable=False)  # one row per user
     daily_limit = db.Column(db.Integer, default=5)
     application_time = db.Column(db.String(50), default='09:00')  # Time of day to run applications
     is_active = db.Column(db.Boolean, default=False)
@@ -85,17 +121,19 @@ class Job(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     linkedin_job_id = db.Column(db.String(100), unique=True, nullable=False)
     title = db.Column(db.String(200), nullable=False)
-    company = db.Column(db.String(200), nullable=False)
+    company = db.Column(db.String(200), index=True, nullable=False)
     location = db.Column(db.String(200), nullable=True)
     description = db.Column(db.Text, nullable=True)
     job_url = db.Column(db.String(500), nullable=True)
-    posted_at = db.Column(db.DateTime, nullable=True)
+    posted_at = db.Column(db.DateTime, index=True, nullable=True)
     expires_at = db.Column(db.DateTime, nullable=True)
     job_function = db.Column(db.String(200), nullable=True)
-    employment_type = db.Column(db.String(100), nullable=True)
-    industries = db.Column(db.Text, nullable=True)  # JSON string of industries
+    employment_type = db.Column(db.String(100), index=True, nullable=True)
+    _industries = db.Column('industries', JSONText, nullable=True)  # JSON document of industries
+    industries = lazy_json('_industries')
     seniority_level = db.Column(db.String(100), nullable=True)
-    job_data = db.Column(db.Text, nullable=True)  # JSON string of full job data
+    _job_data = db.Column('job_data', JSONText, nullable=True)  # JSON document of full job data
+    job_data = lazy_json('_job_data')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     # Relationships
@@ -108,35 +146,82 @@ class Job(db.Model):
 
 class JobAnalysis(db.Model):
     id = db.Column(db.Integer, primary_key=True)
-    job_id = db.Column(db.Integer, db.ForeignKey('job.id'), nullable=False)
-    required_skills = db.Column(db.Text, nullable=True)  # JSON string of skills
-    experience_requirements = db.Column(db.Text, nullable=True)  # JSON string of experience
-    education_requirements = db.Column(db.Text, nullable=True)  # JSON string of education
-    analysis_data = db.Column(db.Text, nullable=True)  # JSON string of full analysis
+    job_id = db.Column(db.Integer, db.ForeignKey('job.id'), unique=True, nullable=False)  # one shared analysis per job
+    _required_skills = db.Column('required_skills', JSONText, nullable=True)  # JSON document of skills
+    required_skills = lazy_json('_required_skills')
+    _experience_requirements = db.Column('experience_requirements', JSONText, nullable=True)  # JSON document of experience
+    experience_requirements = lazy_json('_experience_requirements')
+    _education_requirements = db.Column('education_requirements', JSONText, nullable=True)  # JSON document of education
+    education_requirements = lazy_json('_education_requirements')
+    _analysis_data = db.Column('analysis_data', JSONText, nullable=True)  # JSON document of full analysis
+    analysis_data = lazy_json('_analysis_data')
+    fingerprint = db.Column(db.String(64), nullable=True)  # stamp of the analysis matches are computed from
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
+    def compute_fingerprint(self):
+        return fingerprint(self.analysis_data)
+    
     def __repr__(self):
         return f'<JobAnalysis {self.job_id}>'
 
+class JobAnalysisLease(db.Model):
+    job_id = db.Column(db.Integer, db.ForeignKey('job.id'), primary_key=True)
+    owner = db.Column(db.String(100), nullable=False)  # worker running the analysis
+    expires_at = db.Column(db.DateTime, nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<JobAnalysisLease {self.job_id} - {self.owner}>'
+
 class JobMatch(db.Model):
+    __table_args__ = (
+        db.Index('ix_job_match_user_id_job_id', 'user_id', 'job_id', unique=True),  # one match per user and job
+        db.Index('ix_job_match_user_id_match_score', 'user_id', 'match_score'),
+        db.Index('ix_job_match_user_id_created_at', 'user_id', 'created_at'),
+        db.Index('ix_job_match_user_id_updated_at', 'user_id', 'updated_at'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    job_id = db.Column(db.Integer, db.ForeignKey('job.id'), nullable=False)
+    job_id = db.Column(db.Integer, db.ForeignKey('job.id'), index=True, nullable=False)
     match_score = db.Column(db.Integer, nullable=False)
-    skills_match = db.Column(db.Text, nullable=True)  # JSON string of matching skills
-    missing_skills = db.Column(db.Text, nullable=True)  # JSON string of missing skills
-    experience_match = db.Column(db.Text, nullable=True)  # JSON string of experience match
-    education_match = db.Column(db.Text, nullable=True)  # JSON string of education match
-    match_details = db.Column(db.Text, nullable=True)  # JSON string of full match details
+    _skills_match = db.Column('skills_match', JSONText, nullable=True)  # JSON document of matching skills
+    skills_match = lazy_json('_skills_match')
+    _missing_skills = db.Column('missing_skills', JSONText, nullable=True)  # JSON document of missing skills
+    missing_skills = lazy_json('_missing_skills')
+    _experience_match = db.Column('experience_match', JSONText, nullable=True)  # JSON document of experience match
+    experience_match = lazy_json('_experience_match')
+    _education_match = db.Column('education_match', JSONText, nullable=True)  # JSON document of education match
+    education_match = lazy_json('_education_match')
+    _match_details = db.Column('match_details', JSONText, nullable=True)  # JSON document of full match details
+    match_details = lazy_json('_match_details')
+    profile_fingerprint = db.Column(db.String(64), nullable=True)  # inputs this match was computed from
+    criteria_fingerprint = db.Column(db.String(64), nullable=True)
+    analysis_fingerprint = db.Column(db.String(64), nullable=True)
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def is_current(self, profile_fingerprint, criteria_fingerprint, analysis_fingerprint):
+        """Whether this match was computed from the given inputs"""
+        return (
+            self.profile_fingerprint is not None
+            and self.profile_fingerprint == profile_fingerprint
+            and self.criteria_fingerprint == criteria_fingerprint
+            and self.analysis_fingerprint == analysis_fingerprint
+        )
     
     def __repr__(self):
         return f'<JobMatch {self.user_id} - {self.job_id}: {self.match_score}%>'
 
 class JobApplication(db.Model):
+    __table_args__ = (
+        db.Index('ix_job_application_user_id_job_id', 'user_id', 'job_id', unique=True),  # one application per user and job
+        db.Index('ix_job_application_user_id_applied_at', 'user_id', 'applied_at'),
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
-    job_id = db.Column(db.Integer, db.ForeignKey('job.id'), nullable=False)
+    job_id = db.Column(db.Integer, db.ForeignKey('job.id'), index=True, nullable=False)
     linkedin_application_id = db.Column(db.String(100), nullable=True)
     status = db.Column(db.String(50), default='pending')  # pending, submitted, viewed, responded, rejected
     applied_at = db.Column(db.DateTime, default=datetime.utcnow)
@@ -147,6 +232,10 @@ class JobApplication(db.Model):
         return f'<JobApplication {self.user_id} - {self.job_id}>'
 
 class DailySummary(db.Model):
+    __table_args__ = (
+        db.Index('ix_daily_summary_user_id_date', 'user_id', 'date', unique=True),  # one summary per user and day
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=False)
     date = db.Column(db.Date, nullable=False)
@@ -156,13 +245,39 @@ class DailySummary(db.Model):
     fair_matches = db.Column(db.Integer, default=0)
     poor_matches = db.Column(db.Integer, default=0)
     applications_submitted = db.Column(db.Integer, default=0)
-    summary_data = db.Column(db.Text, nullable=True)  # JSON string of full summary
+    _summary_data = db.Column('summary_data', JSONText, nullable=True)  # JSON document of full summary
+    summary_data = lazy_json('_summary_data')
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     
     def __repr__(self):
         return f'<DailySummary {self.user_id} - {self.date}>'
 
+class UserStats(db.Model):
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), primary_key=True)
+    total_matches = db.Column(db.Integer, default=0, nullable=False)
+    excellent_matches = db.Column(db.Integer, default=0, nullable=False)
+    good_matches = db.Column(db.Integer, default=0, nullable=False)
+    fair_matches = db.Column(db.Integer, default=0, nullable=False)
+    poor_matches = db.Column(db.Integer, default=0, nullable=False)
+    total_applications = db.Column(db.Integer, default=0, nullable=False)
+    pending_applications = db.Column(db.Integer, default=0, nullable=False)
+    submitted_applications = db.Column(db.Integer, default=0, nullable=False)
+    viewed_applications = db.Column(db.Integer, default=0, nullable=False)
+    responded_applications = db.Column(db.Integer, default=0, nullable=False)
+    rejected_applications = db.Column(db.Integer, default=0, nullable=False)
+    _top_matches = db.Column('top_matches', JSONText, nullable=True)  # JSON list of the best job matches by score
+    top_matches = lazy_json('_top_matches')
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<UserStats {self.user_id}: {self.total_matches} matches, {self.total_applications} applications>'
+
 class ApiCallLog(db.Model):
+    __table_args__ = (
+        db.Index('ix_api_call_log_user_id_created_at', 'user_id', 'created_at'),
+        db.Index('ix_api_call_log_created_at', 'created_at'),  # retention rollups
+    )
+    
     id = db.Column(db.Integer, primary_key=True)
     user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
     endpoint = db.Column(db.String(200), nullable=False)
@@ -173,3 +288,114 @@ class ApiCallLog(db.Model):
     
     def __repr__(self):
         return f'<ApiCallLog {self.endpoint} - {self.status_code}>'
+
+class ApiCallRollup(db.Model):
+    __table_args__ = (
+        db.Index('ix_api_call_rollup_endpoint_method_minute', 'endpoint', 'method', 'minute', unique=True),  # one row per endpoint and minute
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    endpoint = db.Column(db.String(200), nullable=False)
+    method = db.Column(db.String(10), nullable=False)
+    minute = db.Column(db.DateTime, nullable=False)  # start of the minute the calls were made in
+    calls = db.Column(db.Integer, default=0, nullable=False)
+    errors = db.Column(db.Integer, default=0, nullable=False)  # calls answered with a 4xx or 5xx status
+    total_response_time = db.Column(db.Float, default=0, nullable=False)  # in seconds, over calls that reported one
+    timed_calls = db.Column(db.Integer, default=0, nullable=False)  # calls that reported a response time
+    max_response_time = db.Column(db.Float, nullable=True)  # in seconds
+    
+    def __repr__(self):
+        return f'<ApiCallRollup {self.endpoint} {self.minute}: {self.calls} calls>'
+
+class MetricBucket(db.Model):
+    __table_args__ = (
+        db.Index('ix_metric_bucket_name_labels_bucket', 'name', 'labels', 'bucket', unique=True),  # one row per histogram bucket
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    name = db.Column(db.String(100), nullable=False)  # histogram name
+    labels = db.Column(db.String(255), nullable=False)  # rendered label pairs, e.g. endpoint="jobs.index"
+    bucket = db.Column(db.String(20), nullable=False)  # upper bound, +Inf, or sum
+    value = db.Column(db.Float, default=0, nullable=False)  # observations in the bucket, or their sum, from every worker
+    
+    def __repr__(self):
+        return f'<MetricBucket {self.name}{{{self.labels}}} {self.bucket}: {self.value}>'
+
+class OutboundServiceState(db.Model):
+    service = db.Column(db.String(50), primary_key=True)  # grok3, linkedin
+    tokens = db.Column(db.Double, nullable=False)  # rate limiter bucket level
+    refilled_at = db.Column(db.Double, nullable=False)  # epoch seconds of the last refill
+    breaker_state = db.Column(db.String(20), default='closed', nullable=False)  # closed, open, half_open
+    failure_count = db.Column(db.Integer, default=0, nullable=False)  # consecutive failures
+    opened_at = db.Column(db.Double, nullable=True)  # epoch seconds the breaker last opened or probed
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def __repr__(self):
+        return f'<OutboundServiceState {self.service}: {self.breaker_state}>'
+
+class GrokCacheEntry(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    cache_key = db.Column(db.String(64), unique=True, nullable=False)  # SHA-256 of analysis type and payload
+    analysis_type = db.Column(db.String(50), nullable=False)
+    result_data = db.Column(db.Text, nullable=False)  # JSON string of Grok-3 result
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    expires_at = db.Column(db.DateTime, index=True, nullable=False)
+    
+    def __repr__(self):
+        return f'<GrokCacheEntry {self.analysis_type} - {self.cache_key[:12]}>'
+
+class BackgroundTask(db.Model):
+    __table_args__ = (
+        db.Index('ix_background_task_status_id', 'status', 'id'),  # queue claims
+        db.Index('ix_background_task_user_id_updated_at', 'user_id', 'updated_at'),
+    )
+    
+    id = db.Column(db.Integer, primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('user.id'), nullable=True)
+    task_type = db.Column(db.String(50), nullable=False)
+    _payload = db.Column('payload', JSONText, nullable=True)  # JSON document of task arguments
+    payload = lazy_json('_payload')
+    status = db.Column(db.String(20), default='queued', nullable=False)  # queued, running, succeeded, failed
+    progress = db.Column(db.Integer, default=0)  # 0-100
+    message = db.Column(db.String(200), nullable=True)
+    _result = db.Column('result', JSONText, nullable=True)  # JSON document of task result
+    result = lazy_json('_result')
+    error = db.Column(db.Text, nullable=True)
+    attempts = db.Column(db.Integer, default=0)
+    locked_by = db.Column(db.String(100), nullable=True)  # worker holding the task
+    locked_until = db.Column(db.DateTime, nullable=True)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+    started_at = db.Column(db.DateTime, nullable=True)
+    finished_at = db.Column(db.DateTime, nullable=True)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+    
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'task_type': self.task_type,
+            'status': self.status,
+            'progress': self.progress,
+            'message': self.message,
+            'result': self.result,
+            'error': self.error,
+            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'started_at': self.started_at.isoformat() if self.started_at else None,
+            'finished_at': self.finished_at.isoformat() if self.finished_at else None
+        }
+    
+    def __repr__(self):
+        return f'<BackgroundTask {self.id} {self.task_type}: {self.status}>'
+
+def stamp_fingerprint(mapper, connection, target):
+    """Keep the stored fingerprint in step with the row's contents"""
+    # Column defaults are applied after before_insert, so fill them in first
+    for column in mapper.columns:
+        if column.default is not None and column.default.is_scalar and getattr(target, column.key) is None:
+            setattr(target, column.key, column.default.arg)
+    
+    column = 'profile_fingerprint' if isinstance(target, LinkedInProfile) else 'fingerprint'
+    setattr(target, column, target.compute_fingerprint())
+
+for stamped_model in (LinkedInProfile, MatchingCriteria, JobAnalysis):
+    event.listen(stamped_model, 'before_insert', stamp_fingerprint)
+    event.listen(stamped_model, 'before_update', stamp_fingerprint)
@@ -15,7 +15,8 @@ def login():
         
         user = User.query.filter_by(email=email).first()
         
-        if user and check_password_hash(user.password_hash, password):
+        # Accounts being deleted are deactivated first
+        if user and user.is_active and check_password_hash(user.password_hash, password):
             # Email verification check removed to allow immediate login
             # Original code:
             # if not user.is_verified:
@@ -1,12 +1,32 @@
-from flask import Blueprint, request, render_template, redirect, url_for, flash, session, jsonify
+from flask import Blueprint, request, render_template, redirect, url_for, flash, session, jsonify, Response, stream_with_context
 from functools import wraps
 import json
+import os
+import threading
+import time
 from datetime import datetime, timedelta
 
-from src.models.models import User, Job, JobMatch, JobApplication, DailySummary, db
+from sqlalchemy import or_, select
+from sqlalchemy.orm import joinedload
+
+from src.models.models import User, Job, JobMatch, JobApplication, DailySummary, BackgroundTask, db
+from src.services.daily_rollup import rollup_daily_summaries, summarize_day
+from src.services.match_stats import APPLICATION_STATUSES, get_user_stats, match_bucket
+
+# Live update stream configuration
+SSE_POLL_INTERVAL = float(os.getenv('SSE_POLL_INTERVAL', '2'))
+SSE_HEARTBEAT_SECONDS = float(os.getenv('SSE_HEARTBEAT_SECONDS', '15'))
+SSE_MAX_DURATION = float(os.getenv('SSE_MAX_DURATION', '60'))  # clients reconnect after this
+SSE_MAX_STREAMS = int(os.getenv('SSE_MAX_STREAMS', '4'))  # per worker process; each holds a thread
+SSE_OVERLAP_SECONDS = float(os.getenv('SSE_OVERLAP_SECONDS', '5'))  # re-check window for late commits
+SSE_BATCH_LIMIT = int(os.getenv('SSE_BATCH_LIMIT', '500'))
+SSE_RETRY_MS = 3000
 
 dashboard_bp = Blueprint('dashboard', __name__, url_prefix='/dashboard')
 
+# Open live update streams in this process, so they never take every request thread
+stream_slots = threading.BoundedSemaphore(SSE_MAX_STREAMS)
+
 # Decorator to check if user is logged in
 def login_required(f):
     @wraps(f)
@@ -32,55 +52,67 @@ def index():
     app_settings = ApplicationSetting.query.filter_by(user_id=user_id).first()
     
     # Get recent job applications
-    recent_applications = JobApplication.query.filter_by(user_id=user_id).order_by(
-        JobApplication.applied_at.desc()
-    ).limit(5).all()
+    recent_applications = JobApplication.query.options(joinedload(JobApplication.job)).filter_by(
+        user_id=user_id
+    ).order_by(JobApplication.applied_at.desc()).limit(5).all()
     
-    # Get application statistics
-    total_applications = JobApplication.query.filter_by(user_id=user_id).count()
+    # Get match and application statistics
+    user_stats = get_user_stats(user_id)
     
-    # Get recent job matches
-    recent_matches = JobMatch.query.filter_by(user_id=user_id).order_by(
-        JobMatch.match_score.desc()
-    ).limit(5).all()
-    
-    # Get match statistics
-    excellent_matches = JobMatch.query.filter_by(user_id=user_id).filter(JobMatch.match_score >= 90).count()
-    good_matches = JobMatch.query.filter_by(user_id=user_id).filter(JobMatch.match_score >= 70, JobMatch.match_score < 90).count()
-    fair_matches = JobMatch.query.filter_by(user_id=user_id).filter(JobMatch.match_score >= 50, JobMatch.match_score < 70).count()
+    # Get top job matches, kept on the stats row
+    top_match_ids = [match['id'] for match in user_stats.top_matches or []]
+    matches_by_id = {
+        match.id: match for match in JobMatch.query.options(joinedload(JobMatch.job)).filter(
+            JobMatch.id.in_(top_match_ids)
+        ).all()
+    } if top_match_ids else {}
+    recent_matches = [matches_by_id[match_id] for match_id in top_match_ids if match_id in matches_by_id]
     
     # Get setup completion status
     setup_complete = False
     if linkedin_profile and app_settings:
         setup_complete = app_settings.is_active
     
-    # Get jobs for recent applications
-    application_jobs = {}
-    for app in recent_applications:
-        job = Job.query.get(app.job_id)
-        if job:
-            application_jobs[app.id] = job
+    # Get jobs for recent applications, loaded with them
+    application_jobs = {app.id: app.job for app in recent_applications if app.job}
     
     # Get jobs for recent matches
-    match_jobs = {}
-    for match in recent_matches:
-        job = Job.query.get(match.job_id)
-        if job:
-            match_jobs[match.id] = job
+    match_jobs = {match.id: match.job for match in recent_matches if match.job}
     
     return render_template('dashboard/index.html',
                           linkedin_profile=linkedin_profile,
                           app_settings=app_settings,
                           recent_applications=recent_applications,
                           application_jobs=application_jobs,
-                          total_applications=total_applications,
+                          total_applications=user_stats.total_applications,
                           recent_matches=recent_matches,
                           match_jobs=match_jobs,
-                          excellent_matches=excellent_matches,
-                          good_matches=good_matches,
-                          fair_matches=fair_matches,
+                          excellent_matches=user_stats.excellent_matches,
+                          good_matches=user_stats.good_matches,
+                          fair_matches=user_stats.fair_matches,
                           setup_complete=setup_complete)
 
+@dashboard_bp.route('/stream')
+@login_required
+def stream():
+    """Server-sent events for task progress and new or updated job matches"""
+    user_id = session.get('user_id')
+    since = parse_event_id(request.headers.get('Last-Event-ID') or request.args.get('since'))
+    
+    # No free slot: 204 tells EventSource to stop, and the page retries later
+    if not stream_slots.acquire(blocking=False):
+        return Response(status=204)
+    
+    response = Response(
+        stream_with_context(live_updates(user_id, since)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+    
+    # The server closes the response when the stream ends or the client goes away
+    response.call_on_close(stream_slots.release)
+    return response
+
 @dashboard_bp.route('/activity')
 @login_required
 def activity():
@@ -88,16 +120,12 @@ def activity():
     user_id = session.get('user_id')
     
     # Get all job applications
-    applications = JobApplication.query.filter_by(user_id=user_id).order_by(
-        JobApplication.applied_at.desc()
-    ).all()
+    applications = JobApplication.query.options(joinedload(JobApplication.job)).filter_by(
+        user_id=user_id
+    ).order_by(JobApplication.applied_at.desc()).all()
     
-    # Get jobs for applications
-    application_jobs = {}
-    for app in applications:
-        job = Job.query.get(app.job_id)
-        if job:
-            application_jobs[app.id] = job
+    # Get jobs for applications, loaded with them
+    application_jobs = {app.id: app.job for app in applications if app.job}
     
     # Get daily summaries
     summaries = DailySummary.query.filter_by(user_id=user_id).order_by(
@@ -115,20 +143,9 @@ def stats():
     """Statistics and analytics page"""
     user_id = session.get('user_id')
     
-    # Get application statistics
-    total_applications = JobApplication.query.filter_by(user_id=user_id).count()
-    
-    # Get status breakdown
-    status_counts = {}
-    for status in ['pending', 'submitted', 'viewed', 'responded', 'rejected']:
-        count = JobApplication.query.filter_by(user_id=user_id, status=status).count()
-        status_counts[status] = count
-    
-    # Get match statistics
-    excellent_matches = JobMatch.query.filter_by(user_id=user_id).filter(JobMatch.match_score >= 90).count()
-    good_matches = JobMatch.query.filter_by(user_id=user_id).filter(JobMatch.match_score >= 70, JobMatch.match_score < 90).count()
-    fair_matches = JobMatch.query.filter_by(user_id=user_id).filter(JobMatch.match_score >= 50, JobMatch.match_score < 70).count()
-    poor_matches = JobMatch.query.filter_by(user_id=user_id).filter(JobMatch.match_score < 50).count()
+    # Get match and application statistics
+    user_stats = get_user_stats(user_id)
+    status_counts = {status: getattr(user_stats, f'{status}_applications') for status in APPLICATION_STATUSES}
     
     # Get application timeline data
     thirty_days_ago = datetime.utcnow() - timedelta(days=30)
@@ -149,12 +166,12 @@ def stats():
     timeline_counts = [row.count for row in daily_applications]
     
     return render_template('dashboard/stats.html',
-                          total_applications=total_applications,
+                          total_applications=user_stats.total_applications,
                           status_counts=status_counts,
-                          excellent_matches=excellent_matches,
-                          good_matches=good_matches,
-                          fair_matches=fair_matches,
-                          poor_matches=poor_matches,
+                          excellent_matches=user_stats.excellent_matches,
+                          good_matches=user_stats.good_matches,
+                          fair_matches=user_stats.fair_matches,
+                          poor_matches=user_stats.poor_matches,
                           timeline_dates=json.dumps(timeline_dates),
                           timeline_counts=json.dumps(timeline_counts))
 
@@ -212,91 +229,137 @@ def daily_summary():
     else:
         summary_date = datetime.utcnow().date()
     
-    # Get or create daily summary
+    # Get the rolled up summary
     summary = DailySummary.query.filter_by(user_id=user_id, date=summary_date).first()
     
     if not summary:
-        # Calculate summary data
-        jobs_analyzed = JobMatch.query.filter_by(user_id=user_id).filter(
-            db.func.date(JobMatch.created_at) == summary_date
-        ).count()
-        
-        excellent_matches = JobMatch.query.filter_by(user_id=user_id).filter(
-            db.func.date(JobMatch.created_at) == summary_date,
-            JobMatch.match_score >= 90
-        ).count()
-        
-        good_matches = JobMatch.query.filter_by(user_id=user_id).filter(
-            db.func.date(JobMatch.created_at) == summary_date,
-            JobMatch.match_score >= 70,
-            JobMatch.match_score < 90
-        ).count()
-        
-        fair_matches = JobMatch.query.filter_by(user_id=user_id).filter(
-            db.func.date(JobMatch.created_at) == summary_date,
-            JobMatch.match_score >= 50,
-            JobMatch.match_score < 70
-        ).count()
-        
-        poor_matches = JobMatch.query.filter_by(user_id=user_id).filter(
-            db.func.date(JobMatch.created_at) == summary_date,
-            JobMatch.match_score < 50
-        ).count()
-        
-        applications_submitted = JobApplication.query.filter_by(user_id=user_id).filter(
-            db.func.date(JobApplication.applied_at) == summary_date
-        ).count()
-        
-        # Get top matches
-        top_matches = JobMatch.query.filter_by(user_id=user_id).filter(
-            db.func.date(JobMatch.created_at) == summary_date
-        ).order_by(
-            JobMatch.match_score.desc()
-        ).limit(5).all()
-        
-        top_match_data = []
-        for match in top_matches:
-            job = Job.query.get(match.job_id)
-            if job:
-                application = JobApplication.query.filter_by(user_id=user_id, job_id=job.id).first()
-                top_match_data.append({
-                    'job_title': job.title,
-                    'company': job.company,
-                    'match_score': match.match_score,
-                    'applied': application is not None
-                })
-        
-        # Create summary data
-        summary_data = {
-            'jobs_analyzed': jobs_analyzed,
-            'excellent_matches': excellent_matches,
-            'good_matches': good_matches,
-            'fair_matches': fair_matches,
-            'poor_matches': poor_matches,
-            'applications_submitted': applications_submitted,
-            'top_matches': top_match_data
-        }
-        
-        # Create new summary
-        summary = DailySummary(
-            user_id=user_id,
-            date=summary_date,
-            jobs_analyzed=jobs_analyzed,
-            excellent_matches=excellent_matches,
-            good_matches=good_matches,
-            fair_matches=fair_matches,
-            poor_matches=poor_matches,
-            applications_submitted=applications_submitted,
-            summary_data=json.dumps(summary_data)
-        )
-        
-        db.session.add(summary)
-        db.session.commit()
+        if summary_date < datetime.utcnow().date():
+            # Past day the nightly rollup has not reached yet
+            rollup_daily_summaries(summary_date, [user_id])
+            summary = DailySummary.query.filter_by(user_id=user_id, date=summary_date).first()
+        else:
+            # Today is still in progress, so summarize it without storing it
+            summary = DailySummary(**summarize_day(db.session, [user_id], summary_date)[user_id])
     
     # Parse summary data
-    summary_data = json.loads(summary.summary_data) if summary.summary_data else {}
+    summary_data = summary.summary_data or {}
     
     return render_template('dashboard/daily_summary.html',
                           summary=summary,
                           summary_data=summary_data,
                           summary_date=summary_date)
+
+def parse_event_id(event_id):
+    """Parse the stream cursor a reconnecting client sends back"""
+    if not event_id:
+        return None
+    
+    try:
+        return datetime.fromisoformat(event_id)
+    except ValueError:
+        return None
+
+def format_sse(event, data, event_id=None):
+    """Format one server-sent event"""
+    lines = [f'event: {event}']
+    if event_id:
+        lines.append(f'id: {event_id}')
+    lines.append(f"data: {json.dumps(data, separators=(',', ':'))}")
+    return '\n'.join(lines) + '\n\n'
+
+def live_updates(user_id, since=None):
+    """Yield task progress and job match events for a user until SSE_MAX_DURATION
+    
+    Matches are tracked by updated_at, re-checking a short overlap window so
+    rows committed late by long transactions are not skipped. The event ID
+    is the cursor, so a reconnecting EventSource resumes where it left off.
+    """
+    cursor = since or datetime.utcnow()
+    seen_matches = {}
+    task_states = {}
+    started = last_sent = time.monotonic()
+    
+    yield f'retry: {SSE_RETRY_MS}\n\n'
+    
+    while time.monotonic() - started < SSE_MAX_DURATION:
+        window_start = cursor - timedelta(seconds=SSE_OVERLAP_SECONDS)
+        events = []
+        
+        # Fresh connection per poll so REPEATABLE READ snapshots never hide new rows
+        with db.engine.connect() as conn:
+            candidates = conn.execute(
+                select(JobMatch.id, JobMatch.updated_at).where(
+                    JobMatch.user_id == user_id,
+                    JobMatch.updated_at >= window_start
+                ).order_by(JobMatch.updated_at, JobMatch.id)
+            ).all()
+            unseen = [row.id for row in candidates if seen_matches.get(row.id) != row.updated_at][:SSE_BATCH_LIMIT]
+            
+            match_rows = conn.execute(
+                select(
+                    JobMatch.id,
+                    JobMatch.job_id,
+                    JobMatch.match_score,
+                    JobMatch.updated_at,
+                    Job.title,
+                    Job.company
+                ).join(Job, Job.id == JobMatch.job_id).where(
+                    JobMatch.id.in_(unseen)
+                ).order_by(JobMatch.updated_at, JobMatch.id)
+            ).all() if unseen else []
+            
+            task_rows = conn.execute(
+                select(
+                    BackgroundTask.id,
+                    BackgroundTask.task_type,
+                    BackgroundTask.status,
+                    BackgroundTask.progress,
+                    BackgroundTask.message
+                ).where(
+                    BackgroundTask.user_id == user_id,
+                    or_(
+                        BackgroundTask.status.in_(('queued', 'running')),
+                        BackgroundTask.updated_at >= window_start
+                    )
+                ).order_by(BackgroundTask.id)
+            ).all()
+        
+        for row in task_rows:
+            state = (row.status, row.progress, row.message)
+            if task_states.get(row.id) == state:
+                continue
+            
+            task_states[row.id] = state
+            events.append(format_sse('task', {
+                'id': row.id,
+                'type': row.task_type,
+                'status': row.status,
+                'progress': row.progress,
+                'message': row.message
+            }))
+        
+        for row in match_rows:
+            seen_matches[row.id] = row.updated_at
+            cursor = max(cursor, row.updated_at)
+            events.append(format_sse('match', {
+                'id': row.id,
+                'job_id': row.job_id,
+                'score': row.match_score,
+                'bucket': match_bucket(row.match_score),
+                'title': row.title,
+                'company': row.company,
+                'url': url_for('jobs.view', job_id=row.job_id)
+            }, event_id=cursor.isoformat()))
+        
+        # Forget matches that have left the overlap window
+        horizon = cursor - timedelta(seconds=SSE_OVERLAP_SECONDS)
+        seen_matches = {match_id: updated_at for match_id, updated_at in seen_matches.items() if updated_at >= horizon}
+        
+        if events:
+            yield ''.join(events)
+            last_sent = time.monotonic()
+        elif time.monotonic() - last_sent >= SSE_HEARTBEAT_SECONDS:
+            yield ': keep-alive\n\n'
+            last_sent = time.monotonic()
+        
+        time.sleep(SSE_POLL_INTERVAL)
@@ -1,15 +1,31 @@
 from flask import Blueprint, request, render_template, redirect, url_for, flash, session, jsonify
 from functools import wraps
-import json
-import requests
 import os
+import threading
+import time
 from datetime import datetime
 
-from src.models.models import User, Job, JobAnalysis, JobMatch, JobApplication, ApiCallLog, db
+from sqlalchemy import and_, or_
+
+from src.models.models import User, Job, JobAnalysis, JobMatch, JobApplication, db, fingerprint
+from src.services import grok_client
+from src.services.api_log import log_api_call
+from src.services.concurrency import run_bounded
+from src.services.grok_cache import GROK3_CACHE_ENABLED, cache_key, grok_cache
+from src.services.match_scoring import score_jobs
+from src.services.match_stats import match_bucket
+from src.services.single_flight import acquire_analysis_leases, release_analysis_leases, renew_analysis_leases, wait_for_analyses
+from src.services.tasks import enqueue
+from src.services.upsert import upsert_rows
 
 # Grok-3 API configuration
 GROK3_API_KEY = os.getenv('GROK3_API_KEY', '')
 GROK3_API_URL = os.getenv('GROK3_API_URL', 'https://api.grok-3.com/analyze')
+GROK3_BATCH_URL = os.getenv('GROK3_BATCH_URL', GROK3_API_URL.rstrip('/') + '/batch')
+GROK3_BATCH_SIZE = int(os.getenv('GROK3_BATCH_SIZE', '25'))
+
+# Score jobs locally and only send those above the user's threshold to Grok-3
+LOCAL_PREFILTER_ENABLED = os.getenv('LOCAL_PREFILTER_ENABLED', 'true').lower() in ('1', 'true', 'yes')
 
 grok_bp = Blueprint('grok', __name__, url_prefix='/grok')
 
@@ -26,48 +42,20 @@ def login_required(f):
 @grok_bp.route('/analyze-profile', methods=['POST'])
 @login_required
 def analyze_profile():
-    """Analyze LinkedIn profile using Grok-3"""
+    """Queue LinkedIn profile analysis using Grok-3"""
     user_id = session.get('user_id')
     
     # Get LinkedIn profile data
     from src.models.models import LinkedInProfile
     linkedin_profile = LinkedInProfile.query.filter_by(user_id=user_id).first()
     
-    if not linkedin_profile or not linkedin_profile.profile_data:
+    if not linkedin_profile or linkedin_profile.profile_data is None:
         return jsonify({'error': 'LinkedIn profile data not found'}), 400
     
-    # Prepare profile data for Grok-3
-    profile_data = json.loads(linkedin_profile.profile_data)
-    
-    # Add skills, experience, and education if available
-    if linkedin_profile.skills:
-        profile_data['skills'] = json.loads(linkedin_profile.skills)
-    
-    if linkedin_profile.experience:
-        profile_data['experience'] = json.loads(linkedin_profile.experience)
-    
-    if linkedin_profile.education:
-        profile_data['education'] = json.loads(linkedin_profile.education)
-    
-    # Call Grok-3 API for profile analysis
-    analysis_result = call_grok3_api(profile_data, 'profile_analysis')
-    
-    if not analysis_result:
-        return jsonify({'error': 'Failed to analyze profile with Grok-3'}), 500
-    
-    # Update LinkedIn profile with analysis results
-    if 'skills' in analysis_result:
-        linkedin_profile.skills = json.dumps(analysis_result['skills'])
-    
-    if 'experience' in analysis_result:
-        linkedin_profile.experience = json.dumps(analysis_result['experience'])
-    
-    if 'education' in analysis_result:
-        linkedin_profile.education = json.dumps(analysis_result['education'])
-    
-    db.session.commit()
+    # Analyze profile in the background
+    queued_task = enqueue('profile_analysis', user_id=user_id)
     
-    return jsonify({'success': True, 'analysis': analysis_result})
+    return task_accepted(queued_task)
 
 @grok_bp.route('/analyze-job', methods=['POST'])
 @login_required
@@ -87,44 +75,15 @@ def analyze_job():
     # Check if job analysis already exists
     job_analysis = JobAnalysis.query.filter_by(job_id=job.id).first()
     
-    if job_analysis:
-        # Return existing analysis
-        return jsonify({
-            'success': True, 
-            'analysis': json.loads(job_analysis.analysis_data) if job_analysis.analysis_data else {}
-        })
-    
-    # Prepare job data for Grok-3
-    job_data = {
-        'id': job.linkedin_job_id,
-        'title': job.title,
-        'company': job.company,
-        'description': job.description,
-        'location': job.location,
-        'seniority_level': job.seniority_level,
-        'employment_type': job.employment_type,
-        'industries': json.loads(job.industries) if job.industries else []
-    }
-    
-    # Call Grok-3 API for job analysis
-    analysis_result = call_grok3_api(job_data, 'job_analysis')
-    
-    if not analysis_result:
-        return jsonify({'error': 'Failed to analyze job with Grok-3'}), 500
-    
-    # Save job analysis to database
-    new_analysis = JobAnalysis(
-        job_id=job.id,
-        required_skills=json.dumps(analysis_result.get('required_skills', [])),
-        experience_requirements=json.dumps(analysis_result.get('experience_requirements', {})),
-        education_requirements=json.dumps(analysis_result.get('education_requirements', {})),
-        analysis_data=json.dumps(analysis_result)
-    )
-    
-    db.session.add(new_analysis)
-    db.session.commit()
-    
-    return jsonify({'success': True, 'analysis': analysis_result})
+    if not job_analysis:
+        # Analyze job in the background
+        queued_task = enqueue('job_analysis', user_id=session.get('user_id'), job_ids=[job.id])
+        return task_accepted(queued_task)
+    
+    return jsonify({
+        'success': True,
+        'analysis': job_analysis.analysis_data or {}
+    })
 
 @grok_bp.route('/match-job', methods=['POST'])
 @login_required
@@ -151,119 +110,25 @@ def match_job():
             'success': True, 
             'match': {
                 'score': job_match.match_score,
-                'skills_match': json.loads(job_match.skills_match) if job_match.skills_match else [],
-                'missing_skills': json.loads(job_match.missing_skills) if job_match.missing_skills else [],
-                'experience_match': json.loads(job_match.experience_match) if job_match.experience_match else {},
-                'education_match': json.loads(job_match.education_match) if job_match.education_match else {},
-                'details': json.loads(job_match.match_details) if job_match.match_details else {}
+                'bucket': match_bucket(job_match.match_score),
+                'skills_match': job_match.skills_match or [],
+                'missing_skills': job_match.missing_skills or [],
+                'experience_match': job_match.experience_match or {},
+                'education_match': job_match.education_match or {},
+                'details': job_match.match_details or {}
             }
         })
     
-    # Get LinkedIn profile data
-    from src.models.models import LinkedInProfile
-    linkedin_profile = LinkedInProfile.query.filter_by(user_id=user_id).first()
-    
-    if not linkedin_profile or not linkedin_profile.profile_data:
-        return jsonify({'error': 'LinkedIn profile data not found'}), 400
-    
-    # Get job analysis
-    job_analysis = JobAnalysis.query.filter_by(job_id=job.id).first()
+    # Match job in the background
+    queued_task = enqueue('job_matching', user_id=user_id, job_ids=[job.id])
     
-    if not job_analysis:
-        # Analyze job first
-        job_data = {
-            'id': job.linkedin_job_id,
-            'title': job.title,
-            'company': job.company,
-            'description': job.description,
-            'location': job.location,
-            'seniority_level': job.seniority_level,
-            'employment_type': job.employment_type,
-            'industries': json.loads(job.industries) if job.industries else []
-        }
-        
-        analysis_result = call_grok3_api(job_data, 'job_analysis')
-        
-        if not analysis_result:
-            return jsonify({'error': 'Failed to analyze job with Grok-3'}), 500
-        
-        job_analysis = JobAnalysis(
-            job_id=job.id,
-            required_skills=json.dumps(analysis_result.get('required_skills', [])),
-            experience_requirements=json.dumps(analysis_result.get('experience_requirements', {})),
-            education_requirements=json.dumps(analysis_result.get('education_requirements', {})),
-            analysis_data=json.dumps(analysis_result)
-        )
-        
-        db.session.add(job_analysis)
-        db.session.commit()
-    
-    # Prepare data for matching
-    profile_data = json.loads(linkedin_profile.profile_data)
-    
-    # Add skills, experience, and education if available
-    if linkedin_profile.skills:
-        profile_data['skills'] = json.loads(linkedin_profile.skills)
-    
-    if linkedin_profile.experience:
-        profile_data['experience'] = json.loads(linkedin_profile.experience)
-    
-    if linkedin_profile.education:
-        profile_data['education'] = json.loads(linkedin_profile.education)
-    
-    # Get job analysis data
-    job_analysis_data = json.loads(job_analysis.analysis_data) if job_analysis.analysis_data else {}
-    
-    # Get matching criteria
-    from src.models.models import MatchingCriteria
-    match_criteria = MatchingCriteria.query.filter_by(user_id=user_id).first()
-    
-    if not match_criteria:
-        match_criteria = MatchingCriteria(user_id=user_id)
-        db.session.add(match_criteria)
-        db.session.commit()
-    
-    # Prepare matching data
-    matching_data = {
-        'profile': profile_data,
-        'job': {
-            'id': job.linkedin_job_id,
-            'title': job.title,
-            'company': job.company,
-            'description': job.description,
-            'analysis': job_analysis_data
-        },
-        'criteria': {
-            'min_match_threshold': match_criteria.min_match_threshold,
-            'skills_weight': match_criteria.skills_weight,
-            'experience_weight': match_criteria.experience_weight,
-            'education_weight': match_criteria.education_weight,
-            'preferred_companies': json.loads(match_criteria.preferred_companies) if match_criteria.preferred_companies else []
-        }
-    }
-    
-    # Call Grok-3 API for job matching
-    match_result = call_grok3_api(matching_data, 'job_matching')
-    
-    if not match_result:
-        return jsonify({'error': 'Failed to match job with Grok-3'}), 500
-    
-    # Save job match to database
-    new_match = JobMatch(
-        user_id=user_id,
-        job_id=job.id,
-        match_score=match_result.get('match_score', 0),
-        skills_match=json.dumps(match_result.get('matching_skills', [])),
-        missing_skills=json.dumps(match_result.get('missing_skills', [])),
-        experience_match=json.dumps(match_result.get('experience_match', {})),
-        education_match=json.dumps(match_result.get('education_match', {})),
-        match_details=json.dumps(match_result)
-    )
-    
-    db.session.add(new_match)
-    db.session.commit()
-    
-    return jsonify({'success': True, 'match': match_result})
+    return task_accepted(queued_task)
+
+@grok_bp.route('/cache-stats')
+@login_required
+def cache_stats():
+    """Grok-3 result cache statistics for this worker"""
+    return jsonify(grok_cache.stats())
 
 @grok_bp.route('/apply-job', methods=['POST'])
 @login_required
@@ -315,16 +180,7 @@ def apply_job():
     # Apply to job using LinkedIn API
     # This would be a real API call in production
     # For now, we'll simulate a successful application
-    
-    # Log API call
-    api_log = ApiCallLog(
-        user_id=user_id,
-        endpoint=f"linkedin/jobs/{job.linkedin_job_id}/applications",
-        method="POST",
-        status_code=200,
-        response_time=0.5
-    )
-    db.session.add(api_log)
+    started = time.perf_counter()
     
     # Create job application record
     new_application = JobApplication(
@@ -337,10 +193,463 @@ def apply_job():
     db.session.add(new_application)
     db.session.commit()
     
+    # Log API call with the time the application actually took
+    log_api_call(
+        f"linkedin/jobs/{job.linkedin_job_id}/applications",
+        "POST",
+        status_code=200,
+        response_time=time.perf_counter() - started,
+        user_id=user_id
+    )
+    
     return jsonify({'success': True, 'application_id': new_application.id})
 
+def task_accepted(queued_task):
+    """Response for a request handed off to the task queue"""
+    if queued_task.status == 'succeeded':
+        return jsonify({'success': True, 'task': queued_task.to_dict()})
+    
+    return jsonify({
+        'success': True,
+        'task_id': queued_task.id,
+        'status_url': url_for('tasks.status', task_id=queued_task.id)
+    }), 202
+
+def run_profile_analysis(user_id):
+    """Analyze LinkedIn profile using Grok-3 and save the results
+    
+    Returns an (analysis, error) tuple where error is a (message, status) pair.
+    """
+    # Get LinkedIn profile data
+    from src.models.models import LinkedInProfile
+    linkedin_profile = LinkedInProfile.query.filter_by(user_id=user_id).first()
+    
+    if not linkedin_profile or linkedin_profile.profile_data is None:
+        return None, ('LinkedIn profile data not found', 400)
+    
+    # Call Grok-3 API for profile analysis
+    analysis_result = call_grok3_api(build_profile_data(linkedin_profile), 'profile_analysis')
+    
+    if not analysis_result:
+        return None, ('Failed to analyze profile with Grok-3', 500)
+    
+    # Update LinkedIn profile with analysis results
+    if 'skills' in analysis_result:
+        linkedin_profile.skills = analysis_result['skills']
+    
+    if 'experience' in analysis_result:
+        linkedin_profile.experience = analysis_result['experience']
+    
+    if 'education' in analysis_result:
+        linkedin_profile.education = analysis_result['education']
+    
+    db.session.commit()
+    
+    return analysis_result, None
+
+def build_job_data(job):
+    """Prepare job data for Grok-3"""
+    return {
+        'id': job.linkedin_job_id,
+        'title': job.title,
+        'company': job.company,
+        'description': job.description,
+        'location': job.location,
+        'seniority_level': job.seniority_level,
+        'employment_type': job.employment_type,
+        'industries': job.industries or []
+    }
+
+def build_profile_data(linkedin_profile):
+    """Prepare LinkedIn profile data for Grok-3"""
+    # Copy so the profile's cached decoded data is left untouched
+    profile_data = dict(linkedin_profile.profile_data)
+    
+    # Add skills, experience, and education if available
+    if linkedin_profile.skills is not None:
+        profile_data['skills'] = linkedin_profile.skills
+    
+    if linkedin_profile.experience is not None:
+        profile_data['experience'] = linkedin_profile.experience
+    
+    if linkedin_profile.education is not None:
+        profile_data['education'] = linkedin_profile.education
+    
+    return profile_data
+
+def get_matching_criteria(user_id):
+    """Get matching criteria for user, creating defaults if missing"""
+    from src.models.models import MatchingCriteria
+    match_criteria = MatchingCriteria.query.filter_by(user_id=user_id).first()
+    
+    if not match_criteria:
+        match_criteria = MatchingCriteria(user_id=user_id)
+        db.session.add(match_criteria)
+        db.session.flush()
+    
+    return match_criteria
+
+def build_matching_data(profile_data, job, job_analysis, match_criteria):
+    """Prepare matching data for Grok-3"""
+    return {
+        'profile': profile_data,
+        'job': {
+            'id': job.linkedin_job_id,
+            'title': job.title,
+            'company': job.company,
+            'description': job.description,
+            'analysis': job_analysis.analysis_data or {}
+        },
+        'criteria': {
+            'min_match_threshold': match_criteria.min_match_threshold,
+            'skills_weight': match_criteria.skills_weight,
+            'experience_weight': match_criteria.experience_weight,
+            'education_weight': match_criteria.education_weight,
+            'preferred_companies': match_criteria.preferred_companies or []
+        }
+    }
+
+def job_analysis_values(analysis_result):
+    """JobAnalysis column values from Grok-3 analysis result"""
+    return {
+        'required_skills': analysis_result.get('required_skills', []),
+        'experience_requirements': analysis_result.get('experience_requirements', {}),
+        'education_requirements': analysis_result.get('education_requirements', {}),
+        'analysis_data': analysis_result
+    }
+
+def build_job_analysis(job_id, analysis_result):
+    """Build JobAnalysis row from Grok-3 analysis result"""
+    return JobAnalysis(job_id=job_id, **job_analysis_values(analysis_result))
+
+def match_stamps(linkedin_profile, match_criteria, job_analysis):
+    """Fingerprints of the inputs a match is computed from"""
+    return {
+        'profile_fingerprint': linkedin_profile.compute_fingerprint(),
+        'criteria_fingerprint': match_criteria.compute_fingerprint(),
+        'analysis_fingerprint': job_analysis.fingerprint or job_analysis.compute_fingerprint()
+    }
+
+def build_job_match(user_id, job, match_result, stamps=None):
+    """Build JobMatch row from Grok-3 match result"""
+    return fill_job_match(JobMatch(user_id=user_id, job_id=job.id), match_result, stamps)
+
+def fill_job_match(job_match, match_result, stamps=None):
+    """Copy a Grok-3 match result and its input stamps onto a JobMatch row"""
+    job_match.match_score = match_result.get('match_score', 0)
+    job_match.skills_match = match_result.get('matching_skills', [])
+    job_match.missing_skills = match_result.get('missing_skills', [])
+    job_match.experience_match = match_result.get('experience_match', {})
+    job_match.education_match = match_result.get('education_match', {})
+    job_match.match_details = match_result
+    
+    for column, value in (stamps or {}).items():
+        setattr(job_match, column, value)
+    
+    return job_match
+
+def analyze_jobs_batch(jobs, chunk_size=None, max_concurrency=None, stats=None, on_progress=None):
+    """Ensure every job has a JobAnalysis, analyzing missing ones in batches
+    
+    Returns a dict of job ID to JobAnalysis for every job that could be analyzed.
+    """
+    job_ids = [job.id for job in jobs]
+    job_analyses = {
+        analysis.job_id: analysis
+        for analysis in JobAnalysis.query.filter(JobAnalysis.job_id.in_(job_ids)).all()
+    } if job_ids else {}
+    
+    # Prepare Grok-3 payloads before the commit below expires the jobs
+    missing_job_data = {job.id: build_job_data(job) for job in jobs if job.id not in job_analyses}
+    
+    if not missing_job_data:
+        return job_analyses
+    
+    # Run each analysis once across concurrent requests and workers
+    db.session.commit()
+    flight = acquire_analysis_leases(list(missing_job_data))
+    
+    try:
+        # Skip jobs another caller finished analyzing before we got the lease
+        owned_ids = set(flight.owned)
+        if owned_ids:
+            owned_ids -= {
+                row.job_id
+                for row in db.session.query(JobAnalysis.job_id).filter(JobAnalysis.job_id.in_(owned_ids)).all()
+            }
+        
+        owned_job_ids = [job_id for job_id in missing_job_data if job_id in owned_ids]
+        
+        def renew_leases(done, total):
+            # Keep the leases alive for as long as the chunks keep completing
+            renew_analysis_leases(flight)
+            if on_progress:
+                on_progress(done, total)
+        
+        if owned_job_ids:
+            analysis_results = call_grok3_api_batch(
+                [missing_job_data[job_id] for job_id in owned_job_ids],
+                'job_analysis',
+                chunk_size=chunk_size,
+                max_concurrency=max_concurrency,
+                stats=stats,
+                on_progress=renew_leases
+            )
+            
+            save_job_analyses([
+                (job_id, analysis_result)
+                for job_id, analysis_result in zip(owned_job_ids, analysis_results)
+                if analysis_result
+            ])
+            db.session.commit()
+    finally:
+        release_analysis_leases(flight)
+    
+    if flight.waiting:
+        # Wait for the callers that held the leases
+        wait_for_analyses(flight.waiting)
+        db.session.commit()
+    
+    # Reload everything the commits expired, plus the waited-for results, in one query
+    return {
+        analysis.job_id: analysis
+        for analysis in JobAnalysis.query.filter(JobAnalysis.job_id.in_(job_ids)).all()
+    }
+
+def save_job_analyses(analyses):
+    """Insert (job_id, analysis_result) pairs, keeping existing rows if one won the race"""
+    rows = []
+    now = datetime.utcnow()
+    
+    for job_id, analysis_result in analyses:
+        # Core insert, so JSONText encodes each value exactly once
+        rows.append({
+            'job_id': job_id,
+            **job_analysis_values(analysis_result),
+            'fingerprint': fingerprint(analysis_result),
+            'created_at': now
+        })
+    
+    if rows:
+        upsert_rows(db.session.connection(), JobAnalysis.__table__, rows, ['job_id'])
+
+def match_jobs_batch(user_id, jobs, chunk_size=None, max_concurrency=None, stats=None, progress=None):
+    """Match jobs to user profile in batches and save the results
+    
+    Existing matches for these jobs are updated in place. When given,
+    progress(percent, message) is called as analysis and matching chunks
+    complete.
+    
+    Returns a (matches, error) tuple where error is a (message, status) pair.
+    """
+    # Get LinkedIn profile data
+    from src.models.models import LinkedInProfile
+    linkedin_profile = LinkedInProfile.query.filter_by(user_id=user_id).first()
+    
+    if not linkedin_profile or linkedin_profile.profile_data is None:
+        return [], ('LinkedIn profile data not found', 400)
+    
+    job_ids = [job.id for job in jobs]
+    match_criteria = get_matching_criteria(user_id)
+    job_analyses = analyze_jobs_batch(
+        jobs,
+        chunk_size=chunk_size,
+        max_concurrency=max_concurrency,
+        stats=stats,
+        on_progress=scaled_progress(progress, 10, 40, 'Analyzed {done} of {total} jobs')
+    )
+    
+    # Reload jobs expired by the analysis commits in one query
+    jobs = Job.query.filter(Job.id.in_(job_ids)).order_by(Job.id).all() if job_ids else []
+    profile_data = build_profile_data(linkedin_profile)
+    
+    matchable_jobs = [job for job in jobs if job.id in job_analyses]
+    match_results = [None] * len(matchable_jobs)
+    grok_positions = list(range(len(matchable_jobs)))
+    
+    if LOCAL_PREFILTER_ENABLED and matchable_jobs:
+        # Score every job locally; only promising ones go to Grok-3
+        local_scores = score_jobs(
+            linkedin_profile,
+            match_criteria,
+            [job_analyses[job.id] for job in matchable_jobs]
+        )
+        above_threshold = local_scores.above(match_criteria.min_match_threshold or 0)
+        grok_positions = [position for position in range(len(matchable_jobs)) if above_threshold[position]]
+        
+        for position in range(len(matchable_jobs)):
+            if not above_threshold[position]:
+                match_results[position] = local_scores.match_result(position)
+        
+        if stats is not None:
+            stats['prefiltered'] = stats.get('prefiltered', 0) + len(matchable_jobs) - len(grok_positions)
+    
+    grok_results = call_grok3_api_batch(
+        [
+            build_matching_data(profile_data, matchable_jobs[position], job_analyses[matchable_jobs[position].id], match_criteria)
+            for position in grok_positions
+        ],
+        'job_matching',
+        chunk_size=chunk_size,
+        max_concurrency=max_concurrency,
+        stats=stats,
+        on_progress=scaled_progress(progress, 40, 90, 'Matched {done} of {total} jobs with Grok-3')
+    )
+    
+    for position, match_result in zip(grok_positions, grok_results):
+        match_results[position] = match_result
+    
+    if progress:
+        progress(95, 'Saving matches')
+    
+    new_matches = save_job_matches(user_id, [
+        (job, match_result, match_stamps(linkedin_profile, match_criteria, job_analyses[job.id]))
+        for job, match_result in zip(matchable_jobs, match_results)
+        if match_result
+    ])
+    
+    return new_matches, None
+
+def save_job_matches(user_id, results):
+    """Save (job, match_result, stamps) triples, updating existing matches in place
+    
+    Every row is written in one transaction, so readers see either the old
+    matches or the new ones. Returns the saved matches.
+    """
+    job_ids = [job.id for job, _, _ in results]
+    existing_matches = {}
+    
+    if job_ids:
+        for job_match in JobMatch.query.filter(
+            JobMatch.user_id == user_id,
+            JobMatch.job_id.in_(job_ids)
+        ).order_by(JobMatch.id).all():
+            if job_match.job_id in existing_matches:
+                # Drop duplicates left by older delete-and-recreate refreshes
+                db.session.delete(job_match)
+            else:
+                existing_matches[job_match.job_id] = job_match
+    
+    saved_matches = []
+    for job, match_result, stamps in results:
+        job_match = existing_matches.get(job.id)
+        
+        if job_match:
+            fill_job_match(job_match, match_result, stamps)
+        else:
+            job_match = build_job_match(user_id, job, match_result, stamps)
+            db.session.add(job_match)
+        
+        saved_matches.append(job_match)
+    
+    db.session.flush()
+    match_ids = [job_match.id for job_match in saved_matches]
+    db.session.commit()
+    
+    # Reload the committed matches in one query rather than one per row
+    return JobMatch.query.filter(JobMatch.id.in_(match_ids)).all() if match_ids else []
+
+def stale_match_job_ids(user_id, profile_fingerprint, criteria_fingerprint):
+    """IDs of jobs whose match for the user is missing or out of date"""
+    stale = or_(
+        JobMatch.id.is_(None),
+        JobAnalysis.id.is_(None),
+        JobMatch.profile_fingerprint.is_distinct_from(profile_fingerprint),
+        JobMatch.criteria_fingerprint.is_distinct_from(criteria_fingerprint),
+        JobMatch.analysis_fingerprint.is_distinct_from(JobAnalysis.fingerprint)
+    )
+    
+    rows = db.session.query(Job.id).outerjoin(
+        JobAnalysis, JobAnalysis.job_id == Job.id
+    ).outerjoin(
+        JobMatch, and_(JobMatch.job_id == Job.id, JobMatch.user_id == user_id)
+    ).filter(stale).distinct().order_by(Job.id).all()
+    
+    return [row.id for row in rows]
+
+def scaled_progress(progress, start, end, message):
+    """Map (done, total) chunk progress onto the start-end slice of a task's progress"""
+    if not progress:
+        return None
+    
+    def on_progress(done, total):
+        progress(start + (end - start) * done / max(total, 1), message.format(done=done, total=total))
+    
+    return on_progress
+
+def refresh_user_matches(user_id, progress=None):
+    """Recompute the user's job matches whose inputs changed
+    
+    Each JobMatch is stamped with fingerprints of the profile, matching
+    criteria and job analysis it was computed from. Only jobs without a
+    match, or whose match was computed from different inputs, are rematched.
+    
+    Returns a (summary, error) tuple where error is a (message, status) pair.
+    """
+    started = time.perf_counter()
+    
+    # Get LinkedIn profile data
+    from src.models.models import LinkedInProfile
+    linkedin_profile = LinkedInProfile.query.filter_by(user_id=user_id).first()
+    
+    if not linkedin_profile or linkedin_profile.profile_data is None:
+        return None, ('LinkedIn profile data not found', 400)
+    
+    match_criteria = get_matching_criteria(user_id)
+    
+    # Find the jobs whose match is missing or stale
+    stale_job_ids = stale_match_job_ids(
+        user_id,
+        linkedin_profile.compute_fingerprint(),
+        match_criteria.compute_fingerprint()
+    )
+    total_jobs = Job.query.count()
+    jobs = Job.query.filter(Job.id.in_(stale_job_ids)).all() if stale_job_ids else []
+    
+    # Rematch only those, updating existing matches in place
+    fan_out_stats = {}
+    if progress:
+        progress(5, f'{len(stale_job_ids)} of {total_jobs} matches need refreshing')
+    
+    new_matches, error = match_jobs_batch(user_id, jobs, stats=fan_out_stats, progress=progress) if jobs else ([], None)
+    
+    if error:
+        db.session.rollback()
+        return None, error
+    
+    db.session.commit()
+    
+    return {
+        'match_count': len(new_matches),
+        'stale_count': len(stale_job_ids),
+        'unchanged_count': total_jobs - len(stale_job_ids),
+        'total_time': round(time.perf_counter() - started, 3),
+        'requests': fan_out_stats.get('requests', 0),
+        'max_concurrency': fan_out_stats.get('max_concurrency', 0),
+        'peak_concurrency': fan_out_stats.get('peak_concurrency', 0),
+        'prefiltered': fan_out_stats.get('prefiltered', 0)
+    }, None
+
 def call_grok3_api(data, analysis_type):
-    """Call Grok-3 API for analysis"""
+    """Call Grok-3 API for analysis, serving repeated payloads from cache"""
+    if not GROK3_CACHE_ENABLED:
+        return request_grok3_api(data, analysis_type)
+    
+    key = cache_key(data, analysis_type)
+    cached_result = grok_cache.get(key)
+    
+    if cached_result is not None:
+        return cached_result
+    
+    result = request_grok3_api(data, analysis_type)
+    
+    if result:
+        grok_cache.set(key, analysis_type, result)
+    
+    return result
+
+def request_grok3_api(data, analysis_type):
+    """Send a single analysis request to Grok-3"""
     if not GROK3_API_KEY:
         # Simulate Grok-3 API response for development
         return simulate_grok3_response(data, analysis_type)
@@ -356,7 +665,9 @@ def call_grok3_api(data, analysis_type):
     }
     
     try:
-        response = requests.post(GROK3_API_URL, headers=headers, json=payload)
+        response = grok_client.post(
+            GROK3_API_URL, headers=headers, json=payload, metric_labels={'analysis_type': analysis_type, 'mode': 'single'}
+        )
         
         if response.status_code == 200:
             return response.json()
@@ -367,6 +678,124 @@ def call_grok3_api(data, analysis_type):
         print(f"Grok-3 API exception: {str(e)}")
         return None
 
+def call_grok3_api_batch(items, analysis_type, chunk_size=None, max_concurrency=None, stats=None, on_progress=None):
+    """Call Grok-3 API for a list of payloads, returning results in input order
+    
+    Cached payloads are served locally, identical payloads are sent once, and
+    the rest go out in chunks of chunk_size (GROK3_BATCH_SIZE by default),
+    at most max_concurrency chunks at a time (GROK3_MAX_CONCURRENCY by
+    default). Failed items come back as None. When a stats dict is passed it
+    is updated with the number of requests sent and the peak concurrency.
+    on_progress(done, total) is called as each chunk completes.
+    """
+    chunk_size = chunk_size or GROK3_BATCH_SIZE
+    results = [None] * len(items)
+    
+    # Serve cached payloads, grouping the rest by content address
+    keys = [cache_key(data, analysis_type) for data in items]
+    cached_results = grok_cache.get_many(keys) if GROK3_CACHE_ENABLED else {}
+    
+    pending = {}
+    for index, key in enumerate(keys):
+        if key in cached_results:
+            results[index] = cached_results[key]
+        else:
+            pending.setdefault(key, []).append(index)
+    
+    pending_keys = list(pending)
+    chunks = [pending_keys[start:start + chunk_size] for start in range(0, len(pending_keys), chunk_size)]
+    
+    completed = [0]
+    progress_lock = threading.Lock()
+    
+    def send_chunk(chunk_keys):
+        chunk_results = request_grok3_api_batch([items[pending[key][0]] for key in chunk_keys], analysis_type)
+        
+        if on_progress:
+            with progress_lock:
+                completed[0] += len(chunk_keys)
+                done = completed[0]
+            on_progress(done, len(pending_keys))
+        
+        return chunk_results
+    
+    # Send chunks concurrently; results are written back on this thread
+    chunk_results, fan_out_stats = run_bounded(send_chunk, chunks, max_concurrency=max_concurrency)
+    
+    if stats is not None:
+        stats['requests'] = stats.get('requests', 0) + len(chunks)
+        stats['peak_concurrency'] = max(stats.get('peak_concurrency', 0), fan_out_stats['peak_concurrency'])
+        stats['max_concurrency'] = fan_out_stats['max_concurrency']
+    
+    new_entries = []
+    for chunk_keys, results_for_chunk in zip(chunks, chunk_results):
+        if not results_for_chunk:
+            continue
+        
+        for key, result in zip(chunk_keys, results_for_chunk):
+            if not result:
+                continue
+            
+            new_entries.append((key, analysis_type, result))
+            for index in pending[key]:
+                results[index] = result
+    
+    if GROK3_CACHE_ENABLED:
+        grok_cache.set_many(new_entries)
+    
+    return results
+
+def request_grok3_api_batch(items, analysis_type):
+    """Send one batch of analysis requests to Grok-3"""
+    payload = {
+        'analysis_type': analysis_type,
+        'batch': [{'id': str(index), 'data': data} for index, data in enumerate(items)]
+    }
+    
+    if not GROK3_API_KEY:
+        # Simulate Grok-3 API response for development
+        response_data = simulate_grok3_batch_response(payload)
+    else:
+        headers = {
+            'Authorization': f'Bearer {GROK3_API_KEY}',
+            'Content-Type': 'application/json'
+        }
+        
+        try:
+            response = grok_client.post(
+                GROK3_BATCH_URL, headers=headers, json=payload, metric_labels={'analysis_type': analysis_type, 'mode': 'batch'}
+            )
+            
+            if response.status_code != 200:
+                print(f"Grok-3 batch API error: {response.status_code} - {response.text}")
+                return [None] * len(items)
+            
+            response_data = response.json()
+        except Exception as e:
+            print(f"Grok-3 batch API exception: {str(e)}")
+            return [None] * len(items)
+    
+    # Map results back to input order by item ID
+    results_by_id = {
+        str(item.get('id')): item.get('result')
+        for item in response_data.get('results', [])
+        if not item.get('error')
+    }
+    
+    return [results_by_id.get(str(index)) for index in range(len(items))]
+
+def simulate_grok3_batch_response(payload):
+    """Simulate Grok-3 batch API response for development"""
+    analysis_type = payload.get('analysis_type')
+    
+    return {
+        'analysis_type': analysis_type,
+        'results': [
+            {'id': item['id'], 'result': simulate_grok3_response(item['data'], analysis_type)}
+            for item in payload.get('batch', [])
+        ]
+    }
+
 def simulate_grok3_response(data, analysis_type):
     """Simulate Grok-3 API response for development"""
     if analysis_type == 'profile_analysis':
@@ -1,9 +1,16 @@
 from flask import Blueprint, request, render_template, redirect, url_for, flash, session, jsonify
 from functools import wraps
-import json
+from datetime import datetime, timedelta
+
+from sqlalchemy import and_, exists, or_
+from sqlalchemy.orm import aliased, contains_eager
 
 from src.models.models import User, Job, JobMatch, JobApplication, db
 
+# Job listing page sizes
+JOBS_PER_PAGE = 25
+MAX_JOBS_PER_PAGE = 100
+
 jobs_bp = Blueprint('jobs', __name__, url_prefix='/jobs')
 
 # Decorator to check if user is logged in
@@ -26,42 +33,70 @@ def index():
     min_score = request.args.get('min_score', 0, type=int)
     max_score = request.args.get('max_score', 100, type=int)
     status = request.args.get('status', 'all')
+    posted_within = request.args.get('posted_within', type=int)  # in days
+    company = request.args.get('company', '').strip()
+    job_type = request.args.get('job_type', '').strip()
+    per_page = max(1, min(request.args.get('per_page', JOBS_PER_PAGE, type=int), MAX_JOBS_PER_PAGE))
+    after_score, after_id = parse_cursor(request.args.get('cursor'))
     
-    # Base query for job matches
-    query = JobMatch.query.filter_by(user_id=user_id)
+    # Job matches with their job and the user's application, in one query
+    query = db.session.query(JobMatch, JobApplication).join(
+        JobMatch.job
+    ).outerjoin(
+        JobApplication,
+        and_(JobApplication.job_id == JobMatch.job_id, JobApplication.user_id == user_id)
+    ).options(
+        contains_eager(JobMatch.job)
+    ).filter(JobMatch.user_id == user_id)
     
     # Apply score filter
     query = query.filter(JobMatch.match_score >= min_score, JobMatch.match_score <= max_score)
     
-    # Order by match score
-    query = query.order_by(JobMatch.match_score.desc())
+    # Apply application status filter
+    applied_to = aliased(JobApplication)
+    applied = exists().where(
+        applied_to.user_id == user_id,
+        applied_to.job_id == JobMatch.job_id
+    )
+    if status == 'applied':
+        query = query.filter(applied)
+    elif status == 'not_applied':
+        query = query.filter(~applied)
+    
+    # Apply job filters
+    if posted_within:
+        query = query.filter(Job.posted_at >= datetime.utcnow() - timedelta(days=posted_within))
+    if company:
+        query = query.filter(Job.company == company)
+    if job_type:
+        query = query.filter(Job.employment_type == job_type)
     
-    # Get job matches
-    job_matches = query.all()
+    # Continue after the last match of the previous page
+    if after_score is not None:
+        query = query.filter(or_(
+            JobMatch.match_score < after_score,
+            and_(JobMatch.match_score == after_score, JobMatch.id > after_id)
+        ))
     
-    # Get jobs and application status
+    # Order by match score, with ID as a stable tie-breaker
+    query = query.order_by(JobMatch.match_score.desc(), JobMatch.id).limit(per_page + 1)
+    
+    # Get jobs and application status from the joined rows
+    job_matches = []
     jobs = {}
     applications = {}
     
-    for match in job_matches:
-        job = Job.query.get(match.job_id)
-        if job:
-            jobs[match.job_id] = job
-            
-            # Check if already applied
-            application = JobApplication.query.filter_by(user_id=user_id, job_id=job.id).first()
-            if application:
-                applications[job.id] = application
+    for match, application in query.all():
+        if match.job_id not in jobs:
+            job_matches.append(match)
+            jobs[match.job_id] = match.job
+        
+        if application and match.job_id not in applications:
+            applications[match.job_id] = application
     
-    # Filter by application status if needed
-    if status != 'all':
-        filtered_matches = []
-        for match in job_matches:
-            if status == 'applied' and match.job_id in applications:
-                filtered_matches.append(match)
-            elif status == 'not_applied' and match.job_id not in applications:
-                filtered_matches.append(match)
-        job_matches = filtered_matches
+    has_next = len(job_matches) > per_page
+    job_matches = job_matches[:per_page]
+    next_cursor = f'{job_matches[-1].match_score}:{job_matches[-1].id}' if has_next else None
     
     return render_template('jobs/index.html',
                           job_matches=job_matches,
@@ -69,7 +104,13 @@ def index():
                           applications=applications,
                           min_score=min_score,
                           max_score=max_score,
-                          status=status)
+                          status=status,
+                          posted_within=posted_within,
+                          company=company,
+                          job_type=job_type,
+                          per_page=per_page,
+                          has_next=has_next,
+                          next_cursor=next_cursor)
 
 @jobs_bp.route('/<int:job_id>')
 @login_required
@@ -94,18 +135,12 @@ def view(job_id):
     # Check if already applied
     application = JobApplication.query.filter_by(user_id=user_id, job_id=job.id).first()
     
-    # Parse JSON data
-    match_details = json.loads(job_match.match_details) if job_match.match_details else {}
-    skills_match = json.loads(job_match.skills_match) if job_match.skills_match else []
-    missing_skills = json.loads(job_match.missing_skills) if job_match.missing_skills else []
-    
-    analysis_data = {}
-    if job_analysis and job_analysis.analysis_data:
-        analysis_data = json.loads(job_analysis.analysis_data)
-    
-    required_skills = []
-    if job_analysis and job_analysis.required_skills:
-        required_skills = json.loads(job_analysis.required_skills)
+    # Get decoded JSON data
+    match_details = job_match.match_details or {}
+    skills_match = job_match.skills_match or []
+    missing_skills = job_match.missing_skills or []
+    analysis_data = (job_analysis.analysis_data if job_analysis else None) or {}
+    required_skills = (job_analysis.required_skills if job_analysis else None) or []
     
     return render_template('jobs/view.html',
                           job=job,
@@ -196,41 +231,18 @@ def search():
             }
         ]
         
-        # Save jobs to database
-        saved_jobs = []
+        # Save jobs to database in one transaction
+        from src.services.job_ingest import bulk_ingest_jobs
+        job_ids, new_job_ids = bulk_ingest_jobs(sample_jobs)
+        db.session.commit()
         
-        for job_data in sample_jobs:
-            # Check if job already exists
-            existing_job = Job.query.filter_by(linkedin_job_id=job_data['linkedin_job_id']).first()
-            
-            if existing_job:
-                saved_jobs.append(existing_job)
-                continue
-            
-            # Create new job
-            new_job = Job(
-                linkedin_job_id=job_data['linkedin_job_id'],
-                title=job_data['title'],
-                company=job_data['company'],
-                location=job_data['location'],
-                description=job_data['description'],
-                job_url=job_data['job_url'],
-                posted_at=datetime.strptime(job_data['posted_at'], '%Y-%m-%d'),
-                employment_type=job_data['employment_type'],
-                industries=json.dumps(job_data['industries'])
-            )
-            
-            db.session.add(new_job)
-            db.session.commit()
-            
-            saved_jobs.append(new_job)
-            
-            # Analyze job and create match
-            from src.routes.grok import analyze_job, match_job
-            analyze_job({'job_id': new_job.id})
-            match_job({'job_id': new_job.id})
+        # Analyze new jobs and create matches in the background
+        if new_job_ids:
+            from src.services.tasks import enqueue
+            enqueue('job_matching', user_id=user_id, job_ids=new_job_ids)
+            flash(f'Matching {len(new_job_ids)} new jobs in the background', 'info')
         
-        flash(f'Found {len(saved_jobs)} jobs matching your search', 'success')
+        flash(f'Found {len(job_ids)} jobs matching your search', 'success')
         return redirect(url_for('jobs.index'))
     
     return render_template('jobs/search.html')
@@ -241,25 +253,25 @@ def refresh_matches():
     """Refresh job matches"""
     user_id = session.get('user_id')
     
-    # Get all jobs
-    jobs = Job.query.all()
-    
-    # Refresh matches for each job
-    match_count = 0
+    # Refresh matches in the background
+    from src.services.tasks import enqueue
+    queued_task = enqueue('refresh_matches', user_id=user_id)
     
-    for job in jobs:
-        # Check if match already exists
-        existing_match = JobMatch.query.filter_by(user_id=user_id, job_id=job.id).first()
-        
-        if existing_match:
-            # Delete existing match
-            db.session.delete(existing_match)
-            db.session.commit()
-        
-        # Create new match
-        from src.routes.grok import match_job
-        match_job({'job_id': job.id})
-        match_count += 1
+    if wants_json():
+        from src.routes.grok import task_accepted
+        return task_accepted(queued_task)
     
-    flash(f'Refreshed matches for {match_count} jobs', 'success')
+    flash('Refreshing your job matches in the background', 'info')
     return redirect(url_for('jobs.index'))
+
+def wants_json():
+    """Check if the client asked for a JSON response"""
+    return request.is_json or request.accept_mimetypes.best == 'application/json'
+
+def parse_cursor(cursor):
+    """Parse a 'match_score:id' listing cursor into its parts"""
+    try:
+        score, match_id = cursor.split(':')
+        return int(score), int(match_id)
+    except (AttributeError, ValueError):
+        return None, None
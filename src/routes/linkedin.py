@@ -1,16 +1,21 @@
 from flask import Blueprint, request, render_template, redirect, url_for, flash, session, jsonify
 import requests
-import json
 import os
 from datetime import datetime, timedelta
 import secrets
 
 from src.models.models import User, LinkedInProfile, db
+from src.services.metrics import linkedin_endpoint, linkedin_latency
+from src.services.outbound import OutboundUnavailable, guard_from_env
 
 # LinkedIn API configuration
 LINKEDIN_CLIENT_ID = os.getenv('LINKEDIN_CLIENT_ID', '')
 LINKEDIN_CLIENT_SECRET = os.getenv('LINKEDIN_CLIENT_SECRET', '')
 LINKEDIN_REDIRECT_URI = os.getenv('LINKEDIN_REDIRECT_URI', 'http://localhost:5000/linkedin/callback')
+LINKEDIN_TIMEOUT = float(os.getenv('LINKEDIN_TIMEOUT', '10'))
+
+# Shared rate limit and circuit breaker for every worker calling LinkedIn
+linkedin_guard = guard_from_env('linkedin', 'LINKEDIN', rate=2, burst=5)
 
 linkedin_bp = Blueprint('linkedin', __name__, url_prefix='/linkedin')
 
@@ -72,9 +77,9 @@ def callback():
         'client_secret': LINKEDIN_CLIENT_SECRET
     }
     
-    token_response = requests.post(token_url, data=token_data)
+    token_response = linkedin_request('POST', token_url, data=token_data)
     
-    if token_response.status_code != 200:
+    if token_response is None or token_response.status_code != 200:
         flash('Failed to obtain access token', 'danger')
         return redirect(url_for('dashboard.index'))
     
@@ -103,7 +108,7 @@ def callback():
         linkedin_profile.access_token = access_token
         linkedin_profile.refresh_token = refresh_token
         linkedin_profile.token_expiry = datetime.utcnow() + timedelta(seconds=expires_in)
-        linkedin_profile.profile_data = json.dumps(profile_data)
+        linkedin_profile.profile_data = profile_data
         linkedin_profile.last_updated = datetime.utcnow()
     else:
         # Create new profile
@@ -113,7 +118,7 @@ def callback():
             access_token=access_token,
             refresh_token=refresh_token,
             token_expiry=datetime.utcnow() + timedelta(seconds=expires_in),
-            profile_data=json.dumps(profile_data),
+            profile_data=profile_data,
             last_updated=datetime.utcnow()
         )
         db.session.add(linkedin_profile)
@@ -144,6 +149,23 @@ def disconnect():
     
     return redirect(url_for('settings.index'))
 
+def linkedin_request(method, url, **kwargs):
+    """Call the LinkedIn API behind the shared rate limiter and circuit breaker
+    
+    Returns None when LinkedIn is unavailable or the request fails.
+    """
+    kwargs.setdefault('timeout', LINKEDIN_TIMEOUT)
+    
+    try:
+        send = linkedin_latency.timed(requests.request, endpoint=linkedin_endpoint(url))
+        return linkedin_guard.call(send, method, url, **kwargs)
+    except OutboundUnavailable as e:
+        print(f"LinkedIn API unavailable: {str(e)}")
+        return None
+    except requests.RequestException as e:
+        print(f"LinkedIn API exception: {str(e)}")
+        return None
+
 def get_linkedin_profile(access_token):
     """Get LinkedIn profile data using access token"""
     headers = {
@@ -153,18 +175,18 @@ def get_linkedin_profile(access_token):
     
     # Get basic profile data
     profile_url = 'https://api.linkedin.com/v2/me'
-    profile_response = requests.get(profile_url, headers=headers)
+    profile_response = linkedin_request('GET', profile_url, headers=headers)
     
-    if profile_response.status_code != 200:
+    if profile_response is None or profile_response.status_code != 200:
         return None
     
     profile_data = profile_response.json()
     
     # Get email address
     email_url = 'https://api.linkedin.com/v2/emailAddress?q=members&projection=(elements*(handle~))'
-    email_response = requests.get(email_url, headers=headers)
+    email_response = linkedin_request('GET', email_url, headers=headers)
     
-    if email_response.status_code == 200:
+    if email_response is not None and email_response.status_code == 200:
         email_data = email_response.json()
         if 'elements' in email_data and len(email_data['elements']) > 0:
             email = email_data['elements'][0].get('handle~', {}).get('emailAddress')
@@ -182,9 +204,9 @@ def refresh_linkedin_token(refresh_token):
         'client_secret': LINKEDIN_CLIENT_SECRET
     }
     
-    token_response = requests.post(token_url, data=token_data)
+    token_response = linkedin_request('POST', token_url, data=token_data)
     
-    if token_response.status_code != 200:
+    if token_response is None or token_response.status_code != 200:
         return None
     
     return token_response.json()
@@ -197,9 +219,9 @@ def get_linkedin_skills(access_token, linkedin_id):
     }
     
     skills_url = f'https://api.linkedin.com/v2/skillsV2?q=members&members=List({linkedin_id})'
-    skills_response = requests.get(skills_url, headers=headers)
+    skills_response = linkedin_request('GET', skills_url, headers=headers)
     
-    if skills_response.status_code != 200:
+    if skills_response is None or skills_response.status_code != 200:
         return None
     
     return skills_response.json()
@@ -212,9 +234,9 @@ def get_linkedin_experience(access_token, linkedin_id):
     }
     
     experience_url = f'https://api.linkedin.com/v2/positions?q=members&members=List({linkedin_id})'
-    experience_response = requests.get(experience_url, headers=headers)
+    experience_response = linkedin_request('GET', experience_url, headers=headers)
     
-    if experience_response.status_code != 200:
+    if experience_response is None or experience_response.status_code != 200:
         return None
     
     return experience_response.json()
@@ -227,9 +249,9 @@ def get_linkedin_education(access_token, linkedin_id):
     }
     
     education_url = f'https://api.linkedin.com/v2/educations?q=members&members=List({linkedin_id})'
-    education_response = requests.get(education_url, headers=headers)
+    education_response = linkedin_request('GET', education_url, headers=headers)
     
-    if education_response.status_code != 200:
+    if education_response is None or education_response.status_code != 200:
         return None
     
     return education_response.json()
@@ -0,0 +1,23 @@
+from flask import Blueprint, request, Response, abort
+import hmac
+import os
+
+from src.services.metrics import metrics
+
+metrics_bp = Blueprint('metrics', __name__)
+
+# Bearer token required to scrape /metrics; open when unset
+METRICS_TOKEN = os.getenv('METRICS_TOKEN', '')
+
+@metrics_bp.route('/metrics')
+def index():
+    """Histograms from every worker in the Prometheus text format"""
+    if METRICS_TOKEN:
+        supplied = request.headers.get('Authorization', '').removeprefix('Bearer ')
+        if not hmac.compare_digest(supplied, METRICS_TOKEN):
+            abort(401)
+    
+    # Include this worker's latest observations
+    metrics.flush()
+    
+    return Response(metrics.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
@@ -0,0 +1,28 @@
+from flask import Blueprint, request, render_template, redirect, url_for, flash, session, jsonify
+from functools import wraps
+
+from src.models.models import BackgroundTask, db
+
+tasks_bp = Blueprint('tasks', __name__, url_prefix='/tasks')
+
+# Decorator to check if user is logged in
+def login_required(f):
+    @wraps(f)
+    def decorated_function(*args, **kwargs):
+        if 'user_id' not in session:
+            return jsonify({'error': 'Authentication required'}), 401
+        return f(*args, **kwargs)
+    return decorated_function
+
+@tasks_bp.route('/<int:task_id>')
+@login_required
+def status(task_id):
+    """Background task status"""
+    user_id = session.get('user_id')
+    
+    queued_task = BackgroundTask.query.filter_by(id=task_id, user_id=user_id).first()
+    
+    if not queued_task:
+        return jsonify({'error': 'Task not found'}), 404
+    
+    return jsonify(queued_task.to_dict())
@@ -1,6 +1,5 @@
 from flask import Blueprint, request, render_template, redirect, url_for, flash, session, jsonify
 from functools import wraps
-import json
 
 from src.models.models import User, JobPreference, MatchingCriteria, ApplicationSetting, db
 
@@ -61,8 +60,8 @@ def profile_analysis():
     linkedin_profile = LinkedInProfile.query.filter_by(user_id=user_id).first()
     
     profile_data = {}
-    if linkedin_profile and linkedin_profile.profile_data:
-        profile_data = json.loads(linkedin_profile.profile_data)
+    if linkedin_profile and linkedin_profile.profile_data is not None:
+        profile_data = linkedin_profile.profile_data
     
     return render_template('wizard/profile_analysis.html', profile_data=profile_data)
 
@@ -83,8 +82,8 @@ def job_preferences():
     if request.method == 'POST':
         # Update job preferences
         job_pref.location = request.form.get('location', 'UAE')
-        job_pref.industries = json.dumps(request.form.getlist('industries[]'))
-        job_pref.job_types = json.dumps(request.form.getlist('job_types[]'))
+        job_pref.industries = request.form.getlist('industries[]')
+        job_pref.job_types = request.form.getlist('job_types[]')
         job_pref.experience_level = request.form.get('experience_level')
         
         # Handle salary range
@@ -121,8 +120,8 @@ def job_preferences():
     ]
     
     # Parse JSON strings to lists
-    selected_industries = json.loads(job_pref.industries) if job_pref.industries else []
-    selected_job_types = json.loads(job_pref.job_types) if job_pref.job_types else []
+    selected_industries = job_pref.industries or []
+    selected_job_types = job_pref.job_types or []
     
     return render_template('wizard/job_preferences.html', 
                           job_pref=job_pref,
@@ -169,7 +168,7 @@ def matching_criteria():
         # Process preferred companies as a comma-separated list
         if preferred_companies:
             companies_list = [company.strip() for company in preferred_companies.split(',')]
-            match_criteria.preferred_companies = json.dumps(companies_list)
+            match_criteria.preferred_companies = companies_list
         
         db.session.commit()
         
@@ -177,7 +176,7 @@ def matching_criteria():
         return redirect(url_for('wizard.application_settings'))
     
     # Parse JSON string to list
-    preferred_companies = json.loads(match_criteria.preferred_companies) if match_criteria.preferred_companies else []
+    preferred_companies = match_criteria.preferred_companies or []
     preferred_companies_str = ', '.join(preferred_companies)
     
     return render_template('wizard/matching_criteria.html', 
@@ -245,9 +244,9 @@ def review():
             return redirect(url_for('dashboard.index'))
     
     # Parse JSON strings for display
-    industries = json.loads(job_pref.industries) if job_pref and job_pref.industries else []
-    job_types = json.loads(job_pref.job_types) if job_pref and job_pref.job_types else []
-    preferred_companies = json.loads(match_criteria.preferred_companies) if match_criteria and match_criteria.preferred_companies else []
+    industries = (job_pref.industries if job_pref else None) or []
+    job_types = (job_pref.job_types if job_pref else None) or []
+    preferred_companies = (match_criteria.preferred_companies if match_criteria else None) or []
     
     return render_template('wizard/review.html',
                           linkedin_profile=linkedin_profile,
@@ -0,0 +1,215 @@
+import logging
+import os
+import threading
+from collections import deque
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.exc import DBAPIError, OperationalError, SQLAlchemyError
+
+from src.models.models import ApiCallLog, ApiCallRollup, db
+from src.services.background_flush import BackgroundFlusher
+from src.services.upsert import UPSERT_CHUNK_SIZE, upsert_rows
+
+logger = logging.getLogger(__name__)
+
+# Buffered writer settings
+API_LOG_BUFFER_SIZE = int(os.getenv('API_LOG_BUFFER_SIZE', '10000'))  # entries held before the oldest are dropped
+API_LOG_FLUSH_SIZE = int(os.getenv('API_LOG_FLUSH_SIZE', '200'))
+API_LOG_FLUSH_INTERVAL = float(os.getenv('API_LOG_FLUSH_INTERVAL', '5'))  # seconds
+
+# Raw rows older than this are folded into per-minute rollups
+API_LOG_RETENTION_DAYS = int(os.getenv('API_LOG_RETENTION_DAYS', '7'))
+# Raw rows rolled up per transaction
+API_LOG_ROLLUP_WINDOW = timedelta(hours=1)
+
+# Rollup counters, added together when more calls land in an existing minute
+ROLLUP_COLUMNS = ['calls', 'errors', 'total_response_time', 'timed_calls', 'max_response_time']
+
+class ApiLogBuffer(BackgroundFlusher):
+    """In-process ring buffer of API call log entries, written in bulk off the request path
+
+    record() only appends to a bounded deque. The writer thread inserts
+    the entries with one multi-row INSERT once API_LOG_FLUSH_SIZE have
+    built up or every API_LOG_FLUSH_INTERVAL seconds, and once more at
+    exit. If the database falls behind, the oldest entries are dropped
+    instead of slowing requests down.
+    """
+    thread_name = 'api-log-writer'
+
+    def __init__(self, capacity=API_LOG_BUFFER_SIZE, flush_size=API_LOG_FLUSH_SIZE,
+                 flush_interval=API_LOG_FLUSH_INTERVAL):
+        super().__init__(flush_interval)
+        self.entries = deque(maxlen=capacity)
+        self.flush_size = flush_size
+        self.dropped = 0
+        self._flush_lock = threading.Lock()
+
+    def record(self, endpoint, method, status_code=None, response_time=None, user_id=None):
+        """Queue one API call for the next bulk insert"""
+        if len(self.entries) == self.entries.maxlen:
+            self.dropped += 1
+
+        self.entries.append({
+            'user_id': user_id,
+            'endpoint': endpoint[:200],
+            'method': method,
+            'status_code': status_code,
+            'response_time': response_time,
+            'created_at': datetime.utcnow()
+        })
+
+        self.ensure_writer()
+        if len(self.entries) >= self.flush_size:
+            self.wake()
+
+    def flush(self):
+        """Write every buffered entry now and return how many were written"""
+        with self._flush_lock:
+            # Keep entries buffered until there is a database to write them to
+            if self.app is None:
+                return 0
+
+            batch = []
+            while self.entries:
+                batch.append(self.entries.popleft())
+
+            if not batch:
+                return 0
+
+            try:
+                with self.app.app_context(), db.engine.begin() as conn:
+                    for start in range(0, len(batch), UPSERT_CHUNK_SIZE):
+                        conn.execute(ApiCallLog.__table__.insert(), batch[start:start + UPSERT_CHUNK_SIZE])
+                written = len(batch)
+            except SQLAlchemyError as e:
+                if is_transient(e):
+                    logger.warning("Error writing %d API call log entries; will retry: %s", len(batch), e)
+                    self.requeue(batch)
+                    return 0
+
+                # Some entry can never be written (say its user was deleted), so
+                # find it rather than letting it block everything behind it
+                logger.warning("Error writing %d API call log entries; writing them one at a time: %s", len(batch), e)
+                written = self.write_each(batch)
+
+            if self.dropped:
+                logger.warning("API call log buffer dropped %d entries", self.dropped)
+                self.dropped = 0
+
+            return written
+
+    def write_each(self, batch):
+        """Insert entries one per transaction, dropping the ones the database rejects"""
+        written = 0
+        with self.app.app_context():
+            for index, entry in enumerate(batch):
+                try:
+                    with db.engine.begin() as conn:
+                        conn.execute(ApiCallLog.__table__.insert(), [entry])
+                    written += 1
+                except SQLAlchemyError as e:
+                    if is_transient(e):
+                        self.requeue(batch[index:])
+                        break
+                    logger.warning("Dropping API call log entry for %s: %s", entry['endpoint'], e)
+                    self.dropped += 1
+        return written
+
+    def requeue(self, batch):
+        """Put a batch that failed to write back in front of newer entries
+
+        Whatever no longer fits is dropped, oldest first, and counted.
+        """
+        room = self.entries.maxlen - len(self.entries)
+        kept = batch[len(batch) - room:] if room < len(batch) else batch
+        self.dropped += len(batch) - len(kept)
+        self.entries.extendleft(reversed(kept))
+
+def is_transient(error):
+    """Whether a failed write may succeed if retried later"""
+    return isinstance(error, OperationalError) or (
+        isinstance(error, DBAPIError) and error.connection_invalidated
+    )
+
+api_log_buffer = ApiLogBuffer()
+
+def log_api_call(endpoint, method, status_code=None, response_time=None, user_id=None):
+    """Record an API call in the buffered log"""
+    api_log_buffer.record(endpoint, method, status_code, response_time, user_id)
+
+def minute_of(moment):
+    """Start of the minute containing moment"""
+    return moment.replace(second=0, microsecond=0)
+
+def rollup_window(conn, start, end):
+    """Fold raw log rows in [start, end) into per-minute rollups and delete them
+
+    Counts are added to any rollup rows the minutes already have, so a
+    window can be rolled up again after late entries arrive. Returns the
+    number of raw rows removed.
+    """
+    log = ApiCallLog.__table__
+    rollup = ApiCallRollup.__table__
+    in_window = (log.c.created_at >= start) & (log.c.created_at < end)
+
+    # Rollups already stored for these minutes
+    aggregates = {}
+    for row in conn.execute(select(rollup).where(rollup.c.minute >= start, rollup.c.minute < end)):
+        aggregates[(row.endpoint, row.method, row.minute)] = {
+            'endpoint': row.endpoint,
+            'method': row.method,
+            'minute': row.minute,
+            **{column: getattr(row, column) for column in ROLLUP_COLUMNS}
+        }
+
+    rolled = 0
+    calls = conn.execute(
+        select(log.c.endpoint, log.c.method, log.c.status_code, log.c.response_time, log.c.created_at).where(in_window)
+    )
+    for call in calls:
+        key = (call.endpoint, call.method, minute_of(call.created_at))
+        aggregate = aggregates.get(key)
+        if aggregate is None:
+            aggregate = aggregates[key] = {
+                'endpoint': call.endpoint, 'method': call.method, 'minute': key[2],
+                'calls': 0, 'errors': 0, 'total_response_time': 0.0, 'timed_calls': 0, 'max_response_time': None
+            }
+
+        aggregate['calls'] += 1
+        if call.status_code is not None and call.status_code >= 400:
+            aggregate['errors'] += 1
+        if call.response_time is not None:
+            aggregate['total_response_time'] += call.response_time
+            aggregate['timed_calls'] += 1
+            aggregate['max_response_time'] = max(aggregate['max_response_time'] or 0.0, call.response_time)
+        rolled += 1
+
+    if not rolled:
+        return 0
+
+    upsert_rows(conn, rollup, list(aggregates.values()), ['endpoint', 'method', 'minute'], ROLLUP_COLUMNS)
+    conn.execute(delete(log).where(in_window))
+    return rolled
+
+def rollup_api_calls(retention_days=None):
+    """Roll up and delete raw API call logs older than the retention period
+
+    Works through the old rows an hour at a time, each hour in its own
+    transaction. Returns the number of raw rows rolled up.
+    """
+    retention_days = API_LOG_RETENTION_DAYS if retention_days is None else retention_days
+    cutoff = minute_of(datetime.utcnow() - timedelta(days=retention_days))
+    log = ApiCallLog.__table__
+    rolled = 0
+
+    while True:
+        with db.engine.connect() as conn:
+            oldest = conn.execute(select(func.min(log.c.created_at)).where(log.c.created_at < cutoff)).scalar()
+        if oldest is None:
+            return rolled
+
+        start = oldest.replace(minute=0, second=0, microsecond=0)
+        end = min(start + API_LOG_ROLLUP_WINDOW, cutoff)
+        with db.engine.begin() as conn:
+            rolled += rollup_window(conn, start, end)
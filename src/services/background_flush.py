@@ -0,0 +1,51 @@
+import atexit
+import os
+import threading
+from abc import ABC, abstractmethod
+
+class BackgroundFlusher(ABC):
+    """Writes in-process state to the database from a daemon thread
+
+    Subclasses implement flush(). The thread calls it every interval
+    seconds, or sooner after wake(), and flush() runs once more at exit.
+    A forked worker inherits the state but not the thread, so each
+    process starts its own thread on first use.
+    """
+    thread_name = 'background-flusher'
+
+    def __init__(self, interval):
+        self.interval = interval
+        self.app = None
+        self._wakeup = threading.Event()
+        self._start_lock = threading.Lock()
+        self._writer_pid = None
+
+    def init_app(self, app):
+        """Bind to the app whose database the state is written to"""
+        self.app = app
+        atexit.register(self.flush)
+
+    def ensure_writer(self):
+        """Start the writer thread in this process if it is not running"""
+        if self._writer_pid == os.getpid():
+            return
+
+        with self._start_lock:
+            if self._writer_pid == os.getpid():
+                return
+            self._writer_pid = os.getpid()
+            threading.Thread(target=self._write_loop, name=self.thread_name, daemon=True).start()
+
+    def wake(self):
+        """Ask the writer thread to flush now"""
+        self._wakeup.set()
+
+    def _write_loop(self):
+        while True:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            self.flush()
+
+    @abstractmethod
+    def flush(self):
+        """Write the buffered state and return how many items were written"""
@@ -0,0 +1,60 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from flask import current_app, has_app_context
+
+# Upper bound on concurrent outbound Grok-3 requests per web request
+GROK3_MAX_CONCURRENCY = int(os.getenv('GROK3_MAX_CONCURRENCY', '4'))
+
+def run_bounded(func, items, max_concurrency=None):
+    """Run func over items in a bounded thread pool
+
+    Results come back in input order; an item whose call raised yields
+    None. Returns a (results, stats) tuple where stats records the peak
+    number of calls that were in flight at once.
+    """
+    max_concurrency = max(1, max_concurrency or GROK3_MAX_CONCURRENCY)
+    results = [None] * len(items)
+    stats = {'tasks': len(items), 'max_concurrency': max_concurrency, 'peak_concurrency': 0}
+
+    if not items:
+        return results, stats
+
+    # Worker threads get the caller's app context so helpers that touch
+    # configuration or the database keep working.
+    app = current_app._get_current_object() if has_app_context() else None
+    lock = threading.Lock()
+    in_flight = [0]
+
+    def run(item):
+        with lock:
+            in_flight[0] += 1
+            stats['peak_concurrency'] = max(stats['peak_concurrency'], in_flight[0])
+        try:
+            if app is None:
+                return func(item)
+            with app.app_context():
+                return func(item)
+        finally:
+            with lock:
+                in_flight[0] -= 1
+
+    if max_concurrency == 1 or len(items) == 1:
+        for index, item in enumerate(items):
+            try:
+                results[index] = run(item)
+            except Exception as e:
+                print(f"Bounded task exception: {str(e)}")
+        return results, stats
+
+    with ThreadPoolExecutor(max_workers=min(max_concurrency, len(items))) as executor:
+        futures = {executor.submit(run, item): index for index, item in enumerate(items)}
+
+        for future in as_completed(futures):
+            try:
+                results[futures[future]] = future.result()
+            except Exception as e:
+                print(f"Bounded task exception: {str(e)}")
+
+    return results, stats
@@ -0,0 +1,143 @@
+from datetime import datetime, time, timedelta
+
+from sqlalchemy import and_, func, select
+
+from src.models.models import DailySummary, Job, JobApplication, JobMatch, User, db
+from src.services.match_stats import MATCH_BUCKETS, TOP_MATCHES_LIMIT, match_bucket_expression
+from src.services.upsert import UPSERT_CHUNK_SIZE, upsert_rows
+
+# Counters stored on each DailySummary row
+SUMMARY_COUNTS = ['jobs_analyzed', 'excellent_matches', 'good_matches', 'fair_matches', 'poor_matches',
+                  'applications_submitted']
+
+def day_bounds(day):
+    """Half-open datetime range [start, end) covering one UTC day"""
+    start = datetime.combine(day, time.min)
+    return start, start + timedelta(days=1)
+
+def summarize_day(conn, user_ids, day):
+    """Build DailySummary values for each user on day with three set-based queries
+
+    Timestamps are compared against a half-open range rather than wrapped
+    in date(), so the (user_id, created_at) and (user_id, applied_at)
+    indexes serve every query.
+    """
+    start, end = day_bounds(day)
+    now = datetime.utcnow()
+    summaries = {}
+
+    for user_id in user_ids:
+        summary = {'user_id': user_id, 'date': day, 'jobs_analyzed': 0, 'applications_submitted': 0, 'created_at': now}
+        summary.update({f'{name}_matches': 0 for name, _ in MATCH_BUCKETS})
+        summaries[user_id] = summary
+
+    if not summaries:
+        return summaries
+
+    # Match buckets per user
+    bucket = match_bucket_expression(JobMatch.match_score).label('bucket')
+    match_rows = conn.execute(
+        select(JobMatch.user_id, bucket, func.count().label('count')).where(
+            JobMatch.user_id.in_(user_ids),
+            JobMatch.created_at >= start,
+            JobMatch.created_at < end
+        ).group_by(JobMatch.user_id, bucket)
+    ).all()
+    for row in match_rows:
+        summaries[row.user_id][f'{row.bucket}_matches'] = row.count
+        summaries[row.user_id]['jobs_analyzed'] += row.count
+
+    # Applications per user
+    application_rows = conn.execute(
+        select(JobApplication.user_id, func.count().label('count')).where(
+            JobApplication.user_id.in_(user_ids),
+            JobApplication.applied_at >= start,
+            JobApplication.applied_at < end
+        ).group_by(JobApplication.user_id)
+    ).all()
+    for row in application_rows:
+        summaries[row.user_id]['applications_submitted'] = row.count
+
+    # Best matches per user, with their job and whether it was applied to
+    ranked = select(
+        JobMatch.user_id,
+        JobMatch.job_id,
+        JobMatch.match_score,
+        func.row_number().over(
+            partition_by=JobMatch.user_id,
+            order_by=(JobMatch.match_score.desc(), JobMatch.id)
+        ).label('rank')
+    ).where(
+        JobMatch.user_id.in_(user_ids),
+        JobMatch.created_at >= start,
+        JobMatch.created_at < end
+    ).subquery()
+
+    top_rows = conn.execute(
+        select(
+            ranked.c.user_id,
+            ranked.c.match_score,
+            Job.title,
+            Job.company,
+            JobApplication.id.label('application_id')
+        ).join(
+            Job, Job.id == ranked.c.job_id
+        ).outerjoin(
+            JobApplication,
+            and_(JobApplication.user_id == ranked.c.user_id, JobApplication.job_id == ranked.c.job_id)
+        ).where(
+            ranked.c.rank <= TOP_MATCHES_LIMIT
+        ).order_by(ranked.c.user_id, ranked.c.rank)
+    ).all()
+
+    top_matches = {user_id: [] for user_id in summaries}
+    for row in top_rows:
+        top_matches[row.user_id].append({
+            'job_title': row.title,
+            'company': row.company,
+            'match_score': row.match_score,
+            'applied': row.application_id is not None
+        })
+
+    for user_id, summary in summaries.items():
+        summary_data = {column: summary[column] for column in SUMMARY_COUNTS}
+        summary_data['top_matches'] = top_matches[user_id]
+        summary['summary_data'] = summary_data
+
+    return summaries
+
+def rollup_daily_summaries(day, user_ids=None):
+    """Write DailySummary rows for day, for the given users or every user
+
+    Existing rows for the day are overwritten, so a day can be rolled up
+    again after late data arrives. Returns the number of rows written.
+    """
+    if user_ids is None:
+        user_ids = db.session.execute(select(User.id).order_by(User.id)).scalars().all()
+
+    written = 0
+    for start in range(0, len(user_ids), UPSERT_CHUNK_SIZE):
+        chunk = user_ids[start:start + UPSERT_CHUNK_SIZE]
+
+        with db.engine.begin() as conn:
+            rows = list(summarize_day(conn, chunk, day).values())
+            upsert_rows(
+                conn,
+                DailySummary.__table__,
+                rows,
+                ['user_id', 'date'],
+                SUMMARY_COUNTS + ['summary_data', 'created_at']
+            )
+
+        written += len(rows)
+
+    return written
+
+def backfill_daily_summaries(first_day, last_day, user_ids=None):
+    """Roll up every day from first_day to last_day inclusive"""
+    written = 0
+    day = first_day
+    while day <= last_day:
+        written += rollup_daily_summaries(day, user_ids)
+        day += timedelta(days=1)
+    return written
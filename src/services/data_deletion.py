@@ -0,0 +1,202 @@
+import os
+import time
+
+from sqlalchemy import and_, delete, exists, select, update
+
+from src.models.models import Job, JobApplication, JobMatch, User, db
+from src.services.match_stats import get_user_stats, rebuild_user_stats
+
+# Rows removed per transaction, so no statement holds the write lock for long
+DELETE_CHUNK_SIZE = int(os.getenv('DELETE_CHUNK_SIZE', '500'))
+# Deletions touching more rows than this run as a background task
+DELETE_INLINE_LIMIT = int(os.getenv('DELETE_INLINE_LIMIT', '5000'))
+
+# Rows that keep a job alive; jobs none of these point at are pruned
+JOB_REFERENCES = (JobMatch.__table__.c.job_id, JobApplication.__table__.c.job_id)
+
+# Tables whose rows are personal data even where the user reference is
+# nullable, so deleting an account deletes them rather than clearing it
+PERSONAL_TABLES = ('api_call_log',)
+
+# Per-user tables the settings page can clear on their own
+DELETABLE_ROWS = {
+    'applications': JobApplication,
+    'matches': JobMatch
+}
+
+def referencing_columns(parent):
+    """Foreign key columns, in any table, that point at rows of parent
+
+    The cascade plan comes from the model metadata, so a new table with a
+    user_id or job_id foreign key is cleaned up without changes here.
+    """
+    return [
+        fk.parent
+        for table in db.metadata.sorted_tables
+        for fk in table.foreign_keys
+        if fk.column.table is parent
+    ]
+
+def job_column(table):
+    """The table's foreign key column to job.id, or None"""
+    for fk in table.foreign_keys:
+        if fk.column.table is Job.__table__:
+            return fk.parent
+    return None
+
+def clears_reference(column):
+    """Whether rows are kept with column set to NULL rather than deleted"""
+    return column.nullable and column.table.name not in PERSONAL_TABLES
+
+def purge_references(column, parent_ids, report, job_ids=None):
+    """Remove rows whose column references parent_ids, one chunk per transaction
+
+    Rows are deleted, or have the reference set to NULL where the column
+    is nullable, like ON DELETE CASCADE and ON DELETE SET NULL. Rows of
+    PERSONAL_TABLES are always deleted. Each chunk
+    commits on its own so other writers get the lock in between. Job IDs
+    of removed rows are added to job_ids when it is given.
+    """
+    table = column.table
+    key = list(table.primary_key.columns)[0]
+    jobs = job_column(table) if job_ids is not None else None
+    columns = [key] if jobs is None else [key, jobs]
+    removed = 0
+
+    while True:
+        with db.engine.begin() as conn:
+            rows = conn.execute(
+                select(*columns).where(column.in_(parent_ids)).limit(DELETE_CHUNK_SIZE)
+            ).all()
+            if not rows:
+                break
+
+            ids = [row[0] for row in rows]
+            if clears_reference(column):
+                conn.execute(update(table).where(key.in_(ids)).values({column.name: None}))
+            else:
+                conn.execute(delete(table).where(key.in_(ids)))
+
+        if jobs is not None:
+            job_ids.update(row[1] for row in rows)
+        removed += len(rows)
+
+    report[table.name] = report.get(table.name, 0) + removed
+
+def unreferenced(job):
+    """Condition for jobs no match or application points at"""
+    return and_(*[~exists().where(column == job.c.id) for column in JOB_REFERENCES])
+
+def prune_orphaned_jobs(job_ids, report):
+    """Delete jobs, with their analyses, that nothing references any more
+
+    Each chunk runs in one transaction, and every statement re-checks that
+    the job is still unreferenced. A job another user matches or applies
+    to meanwhile is left alone together with everything hanging off it.
+    Matches and applications are never deleted here: they are what makes
+    a job referenced.
+    """
+    job = Job.__table__
+    dependents = [
+        column for column in referencing_columns(job)
+        if all(column is not reference for reference in JOB_REFERENCES)
+    ]
+    candidates = sorted(job_ids)
+    removed = 0
+
+    for start in range(0, len(candidates), DELETE_CHUNK_SIZE):
+        chunk = candidates[start:start + DELETE_CHUNK_SIZE]
+        orphaned = select(job.c.id).where(job.c.id.in_(chunk), unreferenced(job))
+
+        with db.engine.begin() as conn:
+            for column in dependents:
+                table = column.table
+                if clears_reference(column):
+                    purged = conn.execute(update(table).where(column.in_(orphaned)).values({column.name: None}))
+                else:
+                    purged = conn.execute(delete(table).where(column.in_(orphaned)))
+                report[table.name] = report.get(table.name, 0) + purged.rowcount
+
+            removed += conn.execute(
+                delete(job).where(job.c.id.in_(chunk), unreferenced(job))
+            ).rowcount
+
+    report[job.name] = removed
+
+def delete_user_rows(user_id, model, progress=None):
+    """Delete all of a user's rows of one model in chunks
+
+    Returns the rows removed per table and the elapsed seconds.
+    """
+    started = time.perf_counter()
+    report = {}
+
+    if progress:
+        progress(10, f'Deleting {model.__tablename__} rows')
+    purge_references(model.__table__.c.user_id, [user_id], report)
+
+    # Chunked deletes bypass the ORM, so recount the user's statistics
+    with db.engine.begin() as conn:
+        rebuild_user_stats(conn, user_id)
+
+    return {'rows': report, 'elapsed': round(time.perf_counter() - started, 3)}
+
+def deactivate_account(user_id):
+    """Lock the account out until its deletion finishes"""
+    user = User.__table__
+    with db.engine.begin() as conn:
+        conn.execute(update(user).where(user.c.id == user_id).values(is_active=False))
+
+def delete_account(user_id, progress=None):
+    """Delete a user and everything that references them
+
+    Dependent rows go first, in chunks, then jobs only the user had
+    matched or applied to. The user row goes last, in one transaction
+    with a final sweep for rows written while the chunks ran. Until then
+    the account is only deactivated, so an interrupted deletion can simply
+    run again. Returns the rows removed per table and the elapsed seconds.
+    """
+    started = time.perf_counter()
+    user = User.__table__
+    report = {}
+    job_ids = set()
+
+    deactivate_account(user_id)
+
+    columns = referencing_columns(user)
+    for index, column in enumerate(columns):
+        if progress:
+            progress(5 + 80 * index / len(columns), f'Deleting {column.table.name} rows')
+        purge_references(column, [user_id], report, job_ids)
+
+    if progress:
+        progress(85, f'Checking {len(job_ids)} jobs for other users')
+    prune_orphaned_jobs(job_ids, report)
+
+    with db.engine.begin() as conn:
+        for column in columns:
+            table = column.table
+            if clears_reference(column):
+                swept = conn.execute(update(table).where(column == user_id).values({column.name: None}))
+            else:
+                swept = conn.execute(delete(table).where(column == user_id))
+            report[table.name] += swept.rowcount
+
+        report[user.name] = conn.execute(delete(user).where(user.c.id == user_id)).rowcount
+
+    return {'rows': report, 'elapsed': round(time.perf_counter() - started, 3)}
+
+def pending_row_count(user_id, model=None):
+    """Rows a deletion would remove, from the maintained user statistics"""
+    user_stats = get_user_stats(user_id)
+    counts = {
+        JobApplication: user_stats.total_applications or 0,
+        JobMatch: user_stats.total_matches or 0
+    }
+    if model is not None:
+        return counts[model]
+    return sum(counts.values())
+
+def runs_in_background(row_count):
+    """Whether a deletion of row_count rows is too large to run in the request"""
+    return row_count > DELETE_INLINE_LIMIT
@@ -0,0 +1,188 @@
+import os
+import zlib
+
+from sqlalchemy import select
+
+from src.models.json_type import dumps, loads
+from src.models.models import (ApplicationSetting, DailySummary, JobApplication, JobMatch, JobPreference,
+                               LinkedInProfile, MatchingCriteria, User, db)
+
+# Rows fetched per round trip while streaming applications, matches and summaries
+EXPORT_CHUNK_SIZE = int(os.getenv('EXPORT_CHUNK_SIZE', '500'))
+# Encoded bytes collected before a chunk is handed to the server
+EXPORT_FLUSH_BYTES = int(os.getenv('EXPORT_FLUSH_BYTES', str(64 * 1024)))
+EXPORT_GZIP_LEVEL = int(os.getenv('EXPORT_GZIP_LEVEL', '6'))
+
+def isoformat(value):
+    """ISO 8601 string for a date or datetime, or None"""
+    return value.isoformat() if value else None
+
+def decoded(raw, empty):
+    """Decode a JSONText value selected as a column, or return empty"""
+    return empty if raw is None else loads(raw)
+
+def stream_rows(statement):
+    """Execute statement and fetch its rows EXPORT_CHUNK_SIZE at a time
+
+    Only one chunk is held in memory; on MySQL the rows come from a
+    server-side cursor.
+    """
+    result = db.session.execute(statement.execution_options(yield_per=EXPORT_CHUNK_SIZE))
+    try:
+        yield from result
+    finally:
+        result.close()
+
+def export_records(user_id):
+    """Yield (record type, data) for everything stored about a user
+
+    The settings rows come first, then applications, matches and daily
+    summaries streamed in id order. The large tables are read as plain
+    columns rather than model instances, so nothing accumulates in the
+    session while the export runs. A deleted account exports nothing.
+    """
+    user = db.session.get(User, user_id)
+    if user is None:
+        return
+
+    yield 'user', {
+        'id': user.id,
+        'username': user.username,
+        'email': user.email,
+        'created_at': isoformat(user.created_at),
+        'is_active': user.is_active,
+        'is_verified': user.is_verified
+    }
+
+    linkedin_profile = LinkedInProfile.query.filter_by(user_id=user_id).first()
+    if linkedin_profile:
+        yield 'linkedin_profile', {
+            'id': linkedin_profile.id,
+            'linkedin_id': linkedin_profile.linkedin_id,
+            'last_updated': isoformat(linkedin_profile.last_updated)
+        }
+
+    job_pref = JobPreference.query.filter_by(user_id=user_id).first()
+    if job_pref:
+        yield 'job_preferences', {
+            'id': job_pref.id,
+            'location': job_pref.location,
+            'industries': job_pref.industries or [],
+            'job_types': job_pref.job_types or [],
+            'experience_level': job_pref.experience_level,
+            'salary_min': job_pref.salary_min,
+            'salary_max': job_pref.salary_max,
+            'created_at': isoformat(job_pref.created_at),
+            'updated_at': isoformat(job_pref.updated_at)
+        }
+
+    match_criteria = MatchingCriteria.query.filter_by(user_id=user_id).first()
+    if match_criteria:
+        yield 'matching_criteria', {
+            'id': match_criteria.id,
+            'min_match_threshold': match_criteria.min_match_threshold,
+            'skills_weight': match_criteria.skills_weight,
+            'experience_weight': match_criteria.experience_weight,
+            'education_weight': match_criteria.education_weight,
+            'preferred_companies': match_criteria.preferred_companies or [],
+            'created_at': isoformat(match_criteria.created_at),
+            'updated_at': isoformat(match_criteria.updated_at)
+        }
+
+    app_settings = ApplicationSetting.query.filter_by(user_id=user_id).first()
+    if app_settings:
+        yield 'application_settings', {
+            'id': app_settings.id,
+            'daily_limit': app_settings.daily_limit,
+            'application_time': app_settings.application_time,
+            'is_active': app_settings.is_active,
+            'notify_on_application': app_settings.notify_on_application,
+            'notify_on_response': app_settings.notify_on_response,
+            'created_at': isoformat(app_settings.created_at),
+            'updated_at': isoformat(app_settings.updated_at)
+        }
+
+    applications = select(
+        JobApplication.id, JobApplication.job_id, JobApplication.status, JobApplication.applied_at,
+        JobApplication.response_at, JobApplication.notes
+    ).where(JobApplication.user_id == user_id).order_by(JobApplication.id)
+    for app in stream_rows(applications):
+        yield 'application', {
+            'id': app.id,
+            'job_id': app.job_id,
+            'status': app.status,
+            'applied_at': isoformat(app.applied_at),
+            'response_at': isoformat(app.response_at),
+            'notes': app.notes
+        }
+
+    matches = select(
+        JobMatch.id, JobMatch.job_id, JobMatch.match_score, JobMatch._skills_match.label('skills_match'),
+        JobMatch._missing_skills.label('missing_skills'), JobMatch.created_at
+    ).where(JobMatch.user_id == user_id).order_by(JobMatch.id)
+    for match in stream_rows(matches):
+        yield 'match', {
+            'id': match.id,
+            'job_id': match.job_id,
+            'match_score': match.match_score,
+            'skills_match': decoded(match.skills_match, []),
+            'missing_skills': decoded(match.missing_skills, []),
+            'created_at': isoformat(match.created_at)
+        }
+
+    summaries = select(
+        DailySummary.id, DailySummary.date, DailySummary.jobs_analyzed, DailySummary.excellent_matches,
+        DailySummary.good_matches, DailySummary.fair_matches, DailySummary.poor_matches,
+        DailySummary.applications_submitted, DailySummary._summary_data.label('summary_data'),
+        DailySummary.created_at
+    ).where(DailySummary.user_id == user_id).order_by(DailySummary.id)
+    for summary in stream_rows(summaries):
+        yield 'summary', {
+            'id': summary.id,
+            'date': isoformat(summary.date),
+            'jobs_analyzed': summary.jobs_analyzed,
+            'excellent_matches': summary.excellent_matches,
+            'good_matches': summary.good_matches,
+            'fair_matches': summary.fair_matches,
+            'poor_matches': summary.poor_matches,
+            'applications_submitted': summary.applications_submitted,
+            'summary_data': decoded(summary.summary_data, {}),
+            'created_at': isoformat(summary.created_at)
+        }
+
+def ndjson_export(user_id):
+    """Yield a user's export as NDJSON bytes, one {"type", "data"} record per line
+
+    Lines are sent in chunks of about EXPORT_FLUSH_BYTES. The first record
+    goes out on its own so the download starts before the large tables
+    are read.
+    """
+    buffer = []
+    size = 0
+    for kind, data in export_records(user_id):
+        line = (dumps({'type': kind, 'data': data}) + '\n').encode('utf-8')
+        buffer.append(line)
+        size += len(line)
+
+        if size >= EXPORT_FLUSH_BYTES or kind == 'user':
+            yield b''.join(buffer)
+            buffer = []
+            size = 0
+
+    if buffer:
+        yield b''.join(buffer)
+
+def gzip_chunks(chunks):
+    """Compress a stream of byte chunks into a gzip file on the fly"""
+    compressor = zlib.compressobj(EXPORT_GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    first = True
+    for chunk in chunks:
+        data = compressor.compress(chunk)
+        if first:
+            # Send the header and first records now rather than after a full deflate block
+            data += compressor.flush(zlib.Z_SYNC_FLUSH)
+            first = False
+        if data:
+            yield data
+
+    yield compressor.flush()
@@ -0,0 +1,262 @@
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+
+from src.models.models import GrokCacheEntry, db
+from src.services.upsert import UPSERT_CHUNK_SIZE, upsert_rows
+
+# Grok-3 result cache configuration
+GROK3_CACHE_ENABLED = os.getenv('GROK3_CACHE_ENABLED', 'true').lower() in ('1', 'true', 'yes')
+GROK3_CACHE_SIZE = int(os.getenv('GROK3_CACHE_SIZE', '1024'))
+GROK3_CACHE_TTL = int(os.getenv('GROK3_CACHE_TTL', str(24 * 3600)))  # in seconds
+
+def canonical_json(data):
+    """Serialize data to a stable JSON string"""
+    return json.dumps(data, sort_keys=True, separators=(',', ':'), ensure_ascii=False, default=str)
+
+def cache_key(data, analysis_type):
+    """Content address for a Grok-3 request"""
+    digest = hashlib.sha256()
+    digest.update(analysis_type.encode('utf-8'))
+    digest.update(b'\0')
+    digest.update(canonical_json(data).encode('utf-8'))
+    return digest.hexdigest()
+
+class LRUCache:
+    """Thread-safe in-process LRU cache with per-entry TTL"""
+
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+
+            value, expires = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                return None
+
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        expires = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def __len__(self):
+        return len(self._entries)
+
+class GrokResultCache:
+    """Two-tier cache for Grok-3 results: in-process LRU backed by the database"""
+
+    def __init__(self, max_size=GROK3_CACHE_SIZE, ttl=GROK3_CACHE_TTL):
+        self.ttl = ttl
+        self.memory = LRUCache(max_size, ttl)
+        self._lock = threading.Lock()
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+        self.db_errors = 0
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def get(self, key):
+        """Return the cached result for key, or None"""
+        raw = self.memory.get(key)
+        if raw is not None:
+            self._count('memory_hits')
+            return json.loads(raw)
+
+        entry = self._db_get(key)
+        if entry is not None:
+            raw, expires_at = entry
+            remaining = (expires_at - datetime.utcnow()).total_seconds()
+            self.memory.set(key, raw, ttl=min(self.ttl, remaining))
+            self._count('db_hits')
+            return json.loads(raw)
+
+        self._count('misses')
+        return None
+
+    def get_many(self, keys):
+        """Return a dict of cached results for keys, with one database query per chunk"""
+        results = {}
+        missing = []
+
+        for key in dict.fromkeys(keys):
+            raw = self.memory.get(key)
+            if raw is not None:
+                self._count('memory_hits')
+                results[key] = json.loads(raw)
+            else:
+                missing.append(key)
+
+        db_hits = 0
+        for start in range(0, len(missing), UPSERT_CHUNK_SIZE):
+            for key, (raw, expires_at) in self._db_get_many(missing[start:start + UPSERT_CHUNK_SIZE]).items():
+                remaining = (expires_at - datetime.utcnow()).total_seconds()
+                self.memory.set(key, raw, ttl=min(self.ttl, remaining))
+                results[key] = json.loads(raw)
+                db_hits += 1
+
+        with self._lock:
+            self.db_hits += db_hits
+            self.misses += len(missing) - db_hits
+
+        return results
+
+    def set(self, key, analysis_type, result):
+        """Store a result in both tiers"""
+        raw = canonical_json(result)
+        self.memory.set(key, raw)
+        self._db_set(key, analysis_type, raw)
+
+    def set_many(self, entries):
+        """Store (key, analysis_type, result) entries in both tiers with bulk upserts"""
+        now = datetime.utcnow()
+        rows = []
+
+        for key, analysis_type, result in entries:
+            raw = canonical_json(result)
+            self.memory.set(key, raw)
+            rows.append({
+                'cache_key': key,
+                'analysis_type': analysis_type,
+                'result_data': raw,
+                'created_at': now,
+                'expires_at': now + timedelta(seconds=self.ttl)
+            })
+
+        if not rows:
+            return
+
+        try:
+            with db.engine.begin() as conn:
+                upsert_rows(
+                    conn,
+                    GrokCacheEntry.__table__,
+                    rows,
+                    ['cache_key'],
+                    ['analysis_type', 'result_data', 'created_at', 'expires_at']
+                )
+        except SQLAlchemyError as e:
+            print(f"Grok-3 cache write error: {str(e)}")
+            self._count('db_errors')
+
+    def _db_get(self, key):
+        table = GrokCacheEntry.__table__
+        try:
+            with db.engine.connect() as conn:
+                row = conn.execute(
+                    select(table.c.result_data, table.c.expires_at).where(
+                        table.c.cache_key == key,
+                        table.c.expires_at > datetime.utcnow()
+                    )
+                ).first()
+        except SQLAlchemyError as e:
+            print(f"Grok-3 cache read error: {str(e)}")
+            self._count('db_errors')
+            return None
+
+        return (row.result_data, row.expires_at) if row else None
+
+    def _db_get_many(self, keys):
+        table = GrokCacheEntry.__table__
+        try:
+            with db.engine.connect() as conn:
+                rows = conn.execute(
+                    select(table.c.cache_key, table.c.result_data, table.c.expires_at).where(
+                        table.c.cache_key.in_(keys),
+                        table.c.expires_at > datetime.utcnow()
+                    )
+                ).all()
+        except SQLAlchemyError as e:
+            print(f"Grok-3 cache read error: {str(e)}")
+            self._count('db_errors')
+            return {}
+
+        return {row.cache_key: (row.result_data, row.expires_at) for row in rows}
+
+    def _db_set(self, key, analysis_type, raw):
+        # Written on its own connection so caching never commits the
+        # caller's pending session state.
+        table = GrokCacheEntry.__table__
+        now = datetime.utcnow()
+        values = {
+            'analysis_type': analysis_type,
+            'result_data': raw,
+            'created_at': now,
+            'expires_at': now + timedelta(seconds=self.ttl)
+        }
+
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(table.insert().values(cache_key=key, **values))
+        except IntegrityError:
+            try:
+                with db.engine.begin() as conn:
+                    conn.execute(update(table).where(table.c.cache_key == key).values(**values))
+            except SQLAlchemyError as e:
+                print(f"Grok-3 cache write error: {str(e)}")
+                self._count('db_errors')
+        except SQLAlchemyError as e:
+            print(f"Grok-3 cache write error: {str(e)}")
+            self._count('db_errors')
+
+    def purge_expired(self):
+        """Delete expired rows from the database tier, one chunk per transaction"""
+        table = GrokCacheEntry.__table__
+        purged = 0
+        while True:
+            with db.engine.begin() as conn:
+                expired = conn.execute(
+                    select(table.c.id).where(table.c.expires_at <= datetime.utcnow()).limit(UPSERT_CHUNK_SIZE)
+                ).scalars().all()
+                if not expired:
+                    return purged
+                purged += conn.execute(delete(table).where(table.c.id.in_(expired))).rowcount
+
+    def stats(self):
+        """Hit/miss/eviction counters for this worker"""
+        hits = self.memory_hits + self.db_hits
+        lookups = hits + self.misses
+        return {
+            'enabled': GROK3_CACHE_ENABLED,
+            'memory_hits': self.memory_hits,
+            'db_hits': self.db_hits,
+            'misses': self.misses,
+            'hit_ratio': round(hits / lookups, 4) if lookups else 0.0,
+            'evictions': self.memory.evictions,
+            'expirations': self.memory.expirations,
+            'db_errors': self.db_errors,
+            'memory_size': len(self.memory),
+            'memory_capacity': self.memory.max_size,
+            'ttl': self.ttl
+        }
+
+# Shared cache instance for this worker
+grok_cache = GrokResultCache()
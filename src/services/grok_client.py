@@ -0,0 +1,108 @@
+import os
+import random
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from src.services.metrics import grok_latency
+from src.services.outbound import guard_from_env
+
+# Grok-3 HTTP client configuration
+GROK3_POOL_SIZE = int(os.getenv('GROK3_POOL_SIZE', '10'))
+GROK3_CONNECT_TIMEOUT = float(os.getenv('GROK3_CONNECT_TIMEOUT', '3.05'))
+GROK3_READ_TIMEOUT = float(os.getenv('GROK3_READ_TIMEOUT', '30'))
+GROK3_MAX_RETRIES = int(os.getenv('GROK3_MAX_RETRIES', '3'))
+GROK3_BACKOFF_FACTOR = float(os.getenv('GROK3_BACKOFF_FACTOR', '0.5'))
+GROK3_BACKOFF_MAX = float(os.getenv('GROK3_BACKOFF_MAX', '10'))
+
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504)
+
+# Shared rate limit and circuit breaker for every worker calling Grok-3
+grok_guard = guard_from_env('grok3', 'GROK3', rate=5, burst=10)
+
+# One session per worker process, created lazily so forked gunicorn
+# workers never share sockets inherited from the master.
+_session = None
+_session_pid = None
+_session_lock = threading.Lock()
+
+def build_session(pool_size=None):
+    """Build a keep-alive session with a bounded connection pool
+
+    The adapter never retries on its own; post() retries through the
+    guard so every attempt takes a rate limit token and reaches the
+    circuit breaker.
+    """
+    pool_size = pool_size or GROK3_POOL_SIZE
+
+    adapter = HTTPAdapter(
+        pool_connections=1,
+        pool_maxsize=pool_size,
+        max_retries=0,
+        pool_block=True
+    )
+
+    session = requests.Session()
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+def get_session():
+    """Return the Grok-3 session for the current worker process"""
+    global _session, _session_pid
+
+    pid = os.getpid()
+    if _session is None or _session_pid != pid:
+        with _session_lock:
+            if _session is None or _session_pid != pid:
+                _session = build_session()
+                _session_pid = pid
+
+    return _session
+
+def retry_delay(attempt, response=None):
+    """Seconds to wait before retry number attempt, honouring Retry-After"""
+    retry_after = response.headers.get('Retry-After') if response is not None else None
+    if retry_after:
+        try:
+            return min(max(float(retry_after), 0), GROK3_BACKOFF_MAX)
+        except ValueError:
+            pass
+
+    # Full-jitter exponential backoff
+    return random.uniform(0, min(GROK3_BACKOFF_FACTOR * 2 ** attempt, GROK3_BACKOFF_MAX))
+
+def post(url, headers=None, json=None, timeout=None, metric_labels=None):
+    """POST to the Grok-3 API over the pooled session
+
+    Connection errors and 429/5xx responses are retried up to
+    GROK3_MAX_RETRIES times with jittered backoff. Every attempt goes
+    through the guard, so it takes a rate limit token and counts towards
+    the circuit breaker, and OutboundUnavailable is raised without sending
+    anything once the breaker is open or the shared rate limit is
+    exhausted. Requests that are sent are timed in
+    grok_request_duration_seconds with metric_labels.
+    """
+    if timeout is None:
+        timeout = (GROK3_CONNECT_TIMEOUT, GROK3_READ_TIMEOUT)
+
+    send = get_session().post
+    if metric_labels is not None:
+        send = grok_latency.timed(send, **metric_labels)
+
+    for attempt in range(GROK3_MAX_RETRIES + 1):
+        last_attempt = attempt == GROK3_MAX_RETRIES
+        try:
+            response = grok_guard.call(send, url, headers=headers, json=json, timeout=timeout)
+        except requests.ConnectionError:
+            if last_attempt:
+                raise
+            time.sleep(retry_delay(attempt))
+            continue
+
+        if response.status_code not in RETRY_STATUS_CODES or last_attempt:
+            return response
+
+        time.sleep(retry_delay(attempt, response))
@@ -0,0 +1,118 @@
+from datetime import datetime
+
+from sqlalchemy import delete, select
+
+from src.models.json_type import RawJSON, loads
+from src.models.models import Job, JobAnalysis, db
+from src.services.upsert import UPSERT_CHUNK_SIZE, upsert_rows
+
+# Posting fields copied onto Job rows; a re-ingested posting refreshes them
+JOB_COLUMNS = ['title', 'company', 'location', 'description', 'job_url', 'posted_at', 'expires_at',
+               'job_function', 'employment_type', 'industries', 'seniority_level', 'job_data']
+
+# Fields sent to Grok-3 for a job analysis (see build_job_data); a change
+# to any of them makes the stored analysis describe a different posting
+ANALYZED_COLUMNS = ['title', 'company', 'description', 'location', 'seniority_level', 'employment_type', 'industries']
+
+def parse_posting_date(value):
+    """Posting dates arrive as 'YYYY-MM-DD' strings or datetimes"""
+    if not value or isinstance(value, datetime):
+        return value
+    return datetime.strptime(value, '%Y-%m-%d')
+
+def job_row(posting, now):
+    """Job column values for one posting"""
+    row = {'linkedin_job_id': posting['linkedin_job_id'], 'created_at': now}
+    for column in JOB_COLUMNS:
+        if column in posting:
+            value = posting[column]
+            row[column] = parse_posting_date(value) if column in ('posted_at', 'expires_at') else value
+    return row
+
+def existing_job_ids(conn, linkedin_job_ids):
+    """Job IDs by LinkedIn job ID, one IN query per chunk"""
+    found = {}
+    for start in range(0, len(linkedin_job_ids), UPSERT_CHUNK_SIZE):
+        chunk = linkedin_job_ids[start:start + UPSERT_CHUNK_SIZE]
+        found.update(conn.execute(
+            select(Job.linkedin_job_id, Job.id).where(Job.linkedin_job_id.in_(chunk))
+        ).all())
+    return found
+
+def changed_job_ids(conn, known, rows, columns):
+    """IDs of existing jobs whose analyzed fields the incoming rows change"""
+    columns = [column for column in ANALYZED_COLUMNS if column in columns]
+    if not columns or not known:
+        return []
+
+    job = Job.__table__
+    changed = []
+    existing = list(known.values())
+    for start in range(0, len(existing), UPSERT_CHUNK_SIZE):
+        stored_rows = conn.execute(
+            select(job.c.id, job.c.linkedin_job_id, *[job.c[column] for column in columns]).where(
+                job.c.id.in_(existing[start:start + UPSERT_CHUNK_SIZE])
+            )
+        )
+        for stored in stored_rows:
+            incoming = rows[stored.linkedin_job_id]
+            for column in columns:
+                value = stored._mapping[column]
+                if isinstance(value, RawJSON):
+                    value = loads(value)
+                if value != incoming.get(column):
+                    changed.append(stored.id)
+                    break
+    return changed
+
+def bulk_ingest_jobs(postings):
+    """Insert new postings and refresh existing ones with bulk upserts
+
+    Postings are deduplicated by linkedin_job_id (the last one wins) and
+    written on the session's connection, so they commit with the caller's
+    transaction. Existing rows are refreshed with the fields every posting
+    in the batch provides; when that changes what Grok-3 analyzed, the
+    job's analysis is deleted so it is analyzed again and its matches are
+    recomputed. Returns (job_ids, new_job_ids), with job_ids in the order
+    the postings were first seen.
+    """
+    now = datetime.utcnow()
+    rows = {}
+    for posting in postings:
+        rows[posting['linkedin_job_id']] = job_row(posting, now)
+
+    if not rows:
+        return [], []
+
+    linkedin_job_ids = list(rows)
+    conn = db.session.connection()
+    known = existing_job_ids(conn, linkedin_job_ids)
+
+    # Rows in one multi-row INSERT must share their columns, so missing
+    # fields are inserted as NULL but never overwrite an existing value
+    given = [set(row) for row in rows.values()]
+    insert_columns = [column for column in JOB_COLUMNS if column in set.union(*given)]
+    update_columns = [column for column in insert_columns if column in set.intersection(*given)]
+
+    # Drop analyses of postings whose analyzed text changed; matches stamped
+    # with the old analysis fingerprint then read as stale
+    stale_job_ids = changed_job_ids(conn, known, rows, update_columns)
+    for start in range(0, len(stale_job_ids), UPSERT_CHUNK_SIZE):
+        chunk = stale_job_ids[start:start + UPSERT_CHUNK_SIZE]
+        conn.execute(delete(JobAnalysis.__table__).where(JobAnalysis.__table__.c.job_id.in_(chunk)))
+
+    upsert_rows(
+        conn,
+        Job.__table__,
+        [{column: row.get(column) for column in ['linkedin_job_id', 'created_at'] + insert_columns}
+         for row in rows.values()],
+        ['linkedin_job_id'],
+        update_columns
+    )
+
+    ids = existing_job_ids(conn, [key for key in linkedin_job_ids if key not in known])
+    ids.update(known)
+
+    job_ids = [ids[key] for key in linkedin_job_ids if key in ids]
+    new_job_ids = [ids[key] for key in linkedin_job_ids if key in ids and key not in known]
+    return job_ids, new_job_ids
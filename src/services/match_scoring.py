@@ -0,0 +1,207 @@
+import numpy as np
+
+# Skill weights by importance in a job analysis
+SKILL_IMPORTANCE_WEIGHTS = {'required': 1.0, 'preferred': 0.5, 'nice_to_have': 0.25}
+
+# Credit for a skill by the candidate's level
+SKILL_LEVEL_CREDIT = {'expert': 1.0, 'advanced': 1.0, 'intermediate': 0.8, 'beginner': 0.5}
+
+SENIORITY_LEVELS = {
+    'intern': 0, 'entry': 1, 'junior': 1, 'associate': 2, 'mid': 2,
+    'senior': 3, 'lead': 4, 'principal': 4, 'manager': 4, 'director': 5, 'executive': 6
+}
+
+def value_or(value, kind):
+    """value if it is a kind (JSON columns come back decoded), else an empty kind"""
+    return value if isinstance(value, kind) else kind()
+
+def skill_name(skill):
+    name = skill.get('name') if isinstance(skill, dict) else skill
+    return str(name).strip().lower() if name else None
+
+def seniority_level(value):
+    return SENIORITY_LEVELS.get(str(value).strip().lower(), 2) if value else None
+
+def as_number(value, default=0.0):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return default
+
+class Vocabulary:
+    """Maps names to column indexes"""
+
+    def __init__(self):
+        self.index = {}
+
+    def add(self, name):
+        if name not in self.index:
+            self.index[name] = len(self.index)
+        return self.index[name]
+
+    def __len__(self):
+        return len(self.index)
+
+def name_overlap(required_sets, candidate):
+    """Fraction of each job's required names the candidate has (1.0 if none required)"""
+    vocab = Vocabulary()
+    coords = [(row, vocab.add(name)) for row, names in enumerate(required_sets) for name in names]
+
+    matrix = np.zeros((len(required_sets), max(len(vocab), 1)), dtype=np.float32)
+    if coords:
+        rows, cols = zip(*coords)
+        matrix[rows, cols] = 1.0
+
+    have = np.zeros(matrix.shape[1], dtype=np.float32)
+    for name in candidate:
+        if name in vocab.index:
+            have[vocab.index[name]] = 1.0
+
+    required = matrix.sum(axis=1)
+    return np.where(required > 0, (matrix @ have) / np.maximum(required, 1.0), 1.0)
+
+class LocalScores:
+    """Vectorised match scores for one candidate against many jobs"""
+
+    def __init__(self, job_ids, total, skills, experience, education, skill_matrix, skill_names, candidate_skills):
+        self.job_ids = job_ids
+        self.total = total
+        self.skills = skills
+        self.experience = experience
+        self.education = education
+        self._skill_matrix = skill_matrix
+        self._skill_names = skill_names
+        self._candidate_skills = candidate_skills
+
+    def above(self, threshold):
+        """Boolean mask of jobs scoring at or above threshold"""
+        return self.total >= threshold
+
+    def match_result(self, position):
+        """Match result for one job in the shape Grok-3 returns"""
+        row = self._skill_matrix[position]
+        required = np.flatnonzero(row)
+        matching = [self._skill_names[i] for i in required if self._candidate_skills[i] > 0]
+        missing = [self._skill_names[i] for i in required if self._candidate_skills[i] == 0]
+        score = int(self.total[position])
+
+        return {
+            'match_score': score,
+            'matching_skills': matching,
+            'missing_skills': missing,
+            'experience_match': {'score': round(float(self.experience[position]) * 100)},
+            'education_match': {'score': round(float(self.education[position]) * 100)},
+            'source': 'local',
+            'summary': f'Scored {score}% locally on skills, experience and education; below your match threshold so it was not sent for full analysis.'
+        }
+
+def score_jobs(linkedin_profile, match_criteria, job_analyses):
+    """Score a candidate against job analyses in one vectorised pass
+
+    job_analyses is a list of JobAnalysis rows; the returned LocalScores
+    arrays are aligned with it.
+    """
+    # Candidate features
+    profile_skills = value_or(linkedin_profile.skills, list)
+    profile_experience = value_or(linkedin_profile.experience, dict)
+    profile_education = value_or(linkedin_profile.education, dict)
+
+    # Job features
+    skill_vocab = Vocabulary()
+    skill_coords = []
+    skill_weights = []
+    required_years = np.zeros(len(job_analyses), dtype=np.float32)
+    required_seniority = np.full(len(job_analyses), -1, dtype=np.float32)
+    required_degree = np.zeros(len(job_analyses), dtype=np.float32)
+    degree_required = np.ones(len(job_analyses), dtype=bool)
+    domain_sets = []
+    field_sets = []
+
+    for row, job_analysis in enumerate(job_analyses):
+        for skill in value_or(job_analysis.required_skills, list):
+            name = skill_name(skill)
+            if not name:
+                continue
+            importance = skill.get('importance', 'required') if isinstance(skill, dict) else 'required'
+            skill_coords.append((row, skill_vocab.add(name)))
+            skill_weights.append(SKILL_IMPORTANCE_WEIGHTS.get(importance, 1.0))
+
+        experience = value_or(job_analysis.experience_requirements, dict)
+        required_years[row] = as_number(experience.get('years'))
+        seniority = seniority_level(experience.get('seniority'))
+        if seniority is not None:
+            required_seniority[row] = seniority
+        domain_sets.append({str(d).lower() for d in value_or(experience.get('domains'), list)})
+
+        education = value_or(job_analysis.education_requirements, dict)
+        required_degree[row] = as_number(education.get('degree_level'))
+        degree_required[row] = bool(education.get('required', True))
+        field_sets.append({str(f).lower() for f in value_or(education.get('fields'), list)})
+
+    skill_names = [None] * len(skill_vocab)
+    for name, column in skill_vocab.index.items():
+        skill_names[column] = name
+
+    skill_matrix = np.zeros((len(job_analyses), max(len(skill_vocab), 1)), dtype=np.float32)
+    if skill_coords:
+        rows, cols = zip(*skill_coords)
+        np.maximum.at(skill_matrix, (np.array(rows), np.array(cols)), np.array(skill_weights, dtype=np.float32))
+
+    candidate_skills = np.zeros(skill_matrix.shape[1], dtype=np.float32)
+    for skill in profile_skills:
+        name = skill_name(skill)
+        if name in skill_vocab.index:
+            level = skill.get('level', 'intermediate') if isinstance(skill, dict) else 'intermediate'
+            candidate_skills[skill_vocab.index[name]] = SKILL_LEVEL_CREDIT.get(str(level).lower(), 0.8)
+
+    # Skills: weighted share of required skills the candidate has
+    skill_totals = skill_matrix.sum(axis=1)
+    skills_score = np.where(skill_totals > 0, (skill_matrix @ candidate_skills) / np.maximum(skill_totals, 1e-6), 1.0)
+
+    # Experience: years, seniority and domain overlap
+    years = as_number(profile_experience.get('total_years'))
+    years_score = np.where(required_years > 0, np.clip(years / np.maximum(required_years, 1e-6), 0.0, 1.0), 1.0)
+
+    candidate_seniority = seniority_level(profile_experience.get('seniority'))
+    if candidate_seniority is None:
+        seniority_score = np.ones(len(job_analyses), dtype=np.float32)
+    else:
+        gap = np.maximum(required_seniority - candidate_seniority, 0.0)
+        seniority_score = np.where(required_seniority >= 0, np.clip(1.0 - 0.25 * gap, 0.0, 1.0), 1.0)
+
+    candidate_domains = {str(d).lower() for d in value_or(profile_experience.get('domains'), list)}
+    candidate_domains |= {str(d).lower() for d in value_or(profile_experience.get('industries'), list)}
+    domain_score = name_overlap(domain_sets, candidate_domains)
+
+    experience_score = 0.5 * years_score + 0.3 * seniority_score + 0.2 * domain_score
+
+    # Education: degree level and field overlap
+    degree = as_number(profile_education.get('degree_level'))
+    degree_score = np.where(required_degree > 0, np.clip(degree / np.maximum(required_degree, 1e-6), 0.0, 1.0), 1.0)
+    degree_score = np.where(degree_required, degree_score, np.maximum(degree_score, 0.75))
+    field_score = name_overlap(field_sets, {str(f).lower() for f in value_or(profile_education.get('fields'), list)})
+
+    education_score = 0.7 * degree_score + 0.3 * field_score
+
+    # Weighted total on the 0-100 scale used by JobMatch.match_score
+    weights = np.array([
+        match_criteria.skills_weight or 0,
+        match_criteria.experience_weight or 0,
+        match_criteria.education_weight or 0
+    ], dtype=np.float32)
+    if weights.sum() <= 0:
+        weights = np.ones(3, dtype=np.float32)
+    weights /= weights.sum()
+
+    total = np.rint(100.0 * (weights[0] * skills_score + weights[1] * experience_score + weights[2] * education_score))
+
+    return LocalScores(
+        [job_analysis.job_id for job_analysis in job_analyses],
+        total.astype(np.int32),
+        skills_score,
+        experience_score,
+        education_score,
+        skill_matrix,
+        skill_names,
+        candidate_skills
+    )
@@ -0,0 +1,198 @@
+from collections import Counter
+from datetime import datetime
+
+from sqlalchemy import case, event, func, inspect, select, update
+from sqlalchemy.orm import Session, object_session
+
+from src.models.models import JobApplication, JobMatch, UserStats, db
+from src.services.upsert import upsert_rows
+
+# Match score buckets by lower bound, highest first
+MATCH_BUCKETS = (('excellent', 90), ('good', 70), ('fair', 50), ('poor', 0))
+
+APPLICATION_STATUSES = ('pending', 'submitted', 'viewed', 'responded', 'rejected')
+
+# Best matches kept on each user's stats row
+TOP_MATCHES_LIMIT = 5
+
+# Columns whose changes move a row between UserStats counters
+TRACKED_COLUMNS = {
+    JobMatch: ('user_id', 'match_score'),
+    JobApplication: ('user_id', 'status')
+}
+
+def match_bucket(score):
+    """Bucket name for a match score"""
+    for name, lower_bound in MATCH_BUCKETS:
+        if (score or 0) >= lower_bound:
+            return name
+    return MATCH_BUCKETS[-1][0]
+
+def match_bucket_expression(score_column):
+    """SQL CASE expression mapping a score column to its bucket name"""
+    return case(
+        *[(score_column >= lower_bound, name) for name, lower_bound in MATCH_BUCKETS[:-1]],
+        else_=MATCH_BUCKETS[-1][0]
+    )
+
+def match_bucket_counts(user_id, *criteria, conn=None):
+    """Count the user's matches in every bucket with one GROUP BY query"""
+    bucket = match_bucket_expression(JobMatch.match_score).label('bucket')
+    rows = (conn or db.session).execute(
+        select(bucket, func.count().label('count')).where(
+            JobMatch.user_id == user_id, *criteria
+        ).group_by(bucket)
+    ).all()
+
+    counts = {name: 0 for name, _ in MATCH_BUCKETS}
+    counts.update({row.bucket: row.count for row in rows})
+    counts['total'] = sum(row.count for row in rows)
+    return counts
+
+def application_status_counts(user_id, *criteria, conn=None):
+    """Count the user's applications by status with one GROUP BY query"""
+    rows = (conn or db.session).execute(
+        select(JobApplication.status, func.count().label('count')).where(
+            JobApplication.user_id == user_id, *criteria
+        ).group_by(JobApplication.status)
+    ).all()
+
+    counts = {status: 0 for status in APPLICATION_STATUSES}
+    counts.update({row.status: row.count for row in rows if row.status})
+    counts['total'] = sum(row.count for row in rows)
+    return counts
+
+def best_matches(conn, user_id):
+    """The user's best matches as stored on their stats row"""
+    rows = conn.execute(
+        select(JobMatch.id, JobMatch.job_id, JobMatch.match_score).where(
+            JobMatch.user_id == user_id
+        ).order_by(JobMatch.match_score.desc(), JobMatch.id).limit(TOP_MATCHES_LIMIT)
+    ).all()
+    return [{'id': row.id, 'job_id': row.job_id, 'match_score': row.match_score} for row in rows]
+
+def rebuild_user_stats(conn, user_id):
+    """Recompute a user's stats row from their full history
+
+    Used when the row is missing and after bulk deletes, which bypass the
+    mapper events that keep it current. Returns the stored values.
+    """
+    match_counts = match_bucket_counts(user_id, conn=conn)
+    status_counts = application_status_counts(user_id, conn=conn)
+
+    values = {
+        'user_id': user_id,
+        'total_matches': match_counts['total'],
+        'total_applications': status_counts['total'],
+        'top_matches': best_matches(conn, user_id),
+        'updated_at': datetime.utcnow()
+    }
+    values.update({f'{name}_matches': match_counts[name] for name, _ in MATCH_BUCKETS})
+    values.update({f'{status}_applications': status_counts[status] for status in APPLICATION_STATUSES})
+
+    upsert_rows(conn, UserStats.__table__, [values], ['user_id'], [column for column in values if column != 'user_id'])
+    return values
+
+def get_user_stats(user_id):
+    """The user's stats row, rebuilt from history if it does not exist yet"""
+    stats = db.session.get(UserStats, user_id)
+    if stats is not None:
+        return stats
+
+    # Stored on its own connection so a read-only request still keeps it
+    with db.engine.begin() as conn:
+        values = rebuild_user_stats(conn, user_id)
+    return UserStats(**values)
+
+def counter_columns(model, values):
+    """UserStats counters a match or application with these values counts towards"""
+    if model is JobMatch:
+        return ['total_matches', f"{match_bucket(values['match_score'])}_matches"]
+
+    columns = ['total_applications']
+    if values['status'] in APPLICATION_STATUSES:
+        columns.append(f"{values['status']}_applications")
+    return columns
+
+def pending_change(target, user_id):
+    """Stats changes collected for one user during the current flush"""
+    changes = object_session(target).info.setdefault('user_stats_changes', {})
+    return changes.setdefault(user_id, {'deltas': Counter(), 'matches': False, 'rebuild': False})
+
+def count_row(target, values, step):
+    model = type(target)
+    change = pending_change(target, values['user_id'])
+    for column in counter_columns(model, values):
+        change['deltas'][column] += step
+    if model is JobMatch:
+        change['matches'] = True
+
+def count_inserted(mapper, connection, target):
+    """Add a new match or application to its user's counters"""
+    count_row(target, {key: getattr(target, key) for key in TRACKED_COLUMNS[type(target)]}, 1)
+
+def count_deleted(mapper, connection, target):
+    """Remove a deleted match or application from its user's counters"""
+    loaded = inspect(target).dict
+    keys = TRACKED_COLUMNS[type(target)]
+
+    if 'user_id' not in loaded:
+        print(f"Stats not updated for deleted {target!r}: user_id was never loaded")
+        return
+    if any(key not in loaded for key in keys):
+        pending_change(target, loaded['user_id'])['rebuild'] = True
+        return
+
+    count_row(target, {key: loaded[key] for key in keys}, -1)
+
+def count_updated(mapper, connection, target):
+    """Move an updated match or application between counters"""
+    state = inspect(target)
+    histories = {key: state.attrs[key].history for key in TRACKED_COLUMNS[type(target)]}
+    if not any(history.has_changes() for history in histories.values()):
+        return
+
+    new_values = {key: getattr(target, key) for key in histories}
+    if any(history.has_changes() and not history.deleted for history in histories.values()):
+        # The old value was never loaded, so the old counter is unknown
+        pending_change(target, new_values['user_id'])['rebuild'] = True
+        return
+
+    old_values = {key: history.deleted[0] if history.deleted else new_values[key] for key, history in histories.items()}
+    count_row(target, old_values, -1)
+    count_row(target, new_values, 1)
+
+def apply_user_stats_changes(session, flush_context):
+    """Write the counters collected during a flush, one UPDATE per user"""
+    changes = session.info.pop('user_stats_changes', None)
+    if not changes:
+        return
+
+    table = UserStats.__table__
+    conn = session.connection()
+
+    for user_id, change in changes.items():
+        if not change['rebuild']:
+            values = {column: table.c[column] + delta for column, delta in change['deltas'].items() if delta}
+            if change['matches']:
+                values['top_matches'] = best_matches(conn, user_id)
+            if not values:
+                continue
+
+            values['updated_at'] = datetime.utcnow()
+            updated = conn.execute(update(table).where(table.c.user_id == user_id).values(**values))
+            if updated.rowcount:
+                continue
+
+        rebuild_user_stats(conn, user_id)
+
+def discard_user_stats_changes(session, previous_transaction):
+    session.info.pop('user_stats_changes', None)
+
+for counted_model in TRACKED_COLUMNS:
+    event.listen(counted_model, 'after_insert', count_inserted)
+    event.listen(counted_model, 'after_update', count_updated)
+    event.listen(counted_model, 'after_delete', count_deleted)
+
+event.listen(Session, 'after_flush', apply_user_stats_changes)
+event.listen(Session, 'after_soft_rollback', discard_user_stats_changes)
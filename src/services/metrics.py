@@ -0,0 +1,212 @@
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from urllib.parse import urlparse
+
+from flask import g, has_request_context, request
+from sqlalchemy import event, select
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.models.models import MetricBucket, db
+from src.services.background_flush import BackgroundFlusher
+from src.services.upsert import upsert_rows
+
+# Seconds between each worker's writes of its observations
+METRICS_FLUSH_INTERVAL = float(os.getenv('METRICS_FLUSH_INTERVAL', '10'))
+
+# Histogram bucket upper bounds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 200)
+
+def format_bound(bound):
+    """Bucket bound as written in the le label"""
+    return '+Inf' if math.isinf(bound) else repr(float(bound))
+
+def escape_label(value):
+    """Escape a label value for the text exposition format"""
+    return str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+class Histogram:
+    """A labelled histogram whose observations are summed across workers"""
+
+    def __init__(self, registry, name, documentation, labelnames, buckets):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.bounds = tuple(float(bound) for bound in buckets) + (math.inf,)
+        self.bucket_names = [format_bound(bound) for bound in self.bounds]
+
+    def observe(self, value, **labels):
+        """Record one observation"""
+        rendered = ','.join(f'{name}="{escape_label(labels[name])}"' for name in self.labelnames)
+        bucket = self.bucket_names[bisect_left(self.bounds, value)]
+        self.registry.add(self.name, rendered, bucket, value)
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe the seconds spent in the with block, even if it raises"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def timed(self, func, **labels):
+        """Wrap func so each call is observed
+
+        Used around the request itself when it goes through an
+        OutboundGuard, so calls refused by the breaker or rate limiter
+        are not counted as round trips.
+        """
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with self.time(**labels):
+                return func(*args, **kwargs)
+        return wrapper
+
+class MetricsRegistry(BackgroundFlusher):
+    """Histograms kept in-process and added to shared MetricBucket rows
+
+    Each worker counts observations in memory and its writer thread adds
+    them to the database rows every METRICS_FLUSH_INTERVAL seconds, so
+    /metrics reports the totals of every gunicorn worker and the task
+    worker, and survives restarts.
+    """
+    thread_name = 'metrics-writer'
+
+    def __init__(self, flush_interval=METRICS_FLUSH_INTERVAL):
+        super().__init__(flush_interval)
+        self.histograms = {}
+        self.pending = {}
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+
+    def histogram(self, name, documentation, labelnames, buckets=LATENCY_BUCKETS):
+        histogram = Histogram(self, name, documentation, labelnames, buckets)
+        self.histograms[name] = histogram
+        return histogram
+
+    def add(self, name, labels, bucket, value):
+        """Count an observation in its bucket and add it to the sum"""
+        with self._lock:
+            key = (name, labels, bucket)
+            self.pending[key] = self.pending.get(key, 0) + 1
+            key = (name, labels, 'sum')
+            self.pending[key] = self.pending.get(key, 0) + value
+        self.ensure_writer()
+
+    def flush(self):
+        """Add this worker's observations since the last flush to the shared rows"""
+        with self._flush_lock:
+            with self._lock:
+                pending, self.pending = self.pending, {}
+
+            if not pending or self.app is None:
+                return 0
+
+            rows = [
+                {'name': name, 'labels': labels, 'bucket': bucket, 'value': value}
+                for (name, labels, bucket), value in pending.items()
+            ]
+            try:
+                with self.app.app_context(), db.engine.begin() as conn:
+                    upsert_rows(conn, MetricBucket.__table__, rows, ['name', 'labels', 'bucket'],
+                                increment_columns=['value'])
+            except SQLAlchemyError as e:
+                print(f"Error writing metrics: {str(e)}")
+                # Keep the observations for the next attempt
+                with self._lock:
+                    for key, value in pending.items():
+                        self.pending[key] = self.pending.get(key, 0) + value
+                return 0
+
+            return len(rows)
+
+    def render(self):
+        """All histograms in the Prometheus text exposition format"""
+        table = MetricBucket.__table__
+        series = {}
+        with db.engine.connect() as conn:
+            for row in conn.execute(select(table.c.name, table.c.labels, table.c.bucket, table.c.value)):
+                series.setdefault(row.name, {}).setdefault(row.labels, {})[row.bucket] = row.value
+
+        lines = []
+        for name, histogram in self.histograms.items():
+            lines.append(f'# HELP {name} {histogram.documentation}')
+            lines.append(f'# TYPE {name} histogram')
+            for labels, buckets in sorted(series.get(name, {}).items()):
+                prefix = f'{labels},' if labels else ''
+                cumulative = 0
+                for bucket in histogram.bucket_names:
+                    cumulative += buckets.get(bucket, 0)
+                    lines.append(f'{name}_bucket{{{prefix}le="{bucket}"}} {int(cumulative)}')
+                lines.append(f'{name}_sum{{{labels}}} {buckets.get("sum", 0)!r}')
+                lines.append(f'{name}_count{{{labels}}} {int(cumulative)}')
+
+        return '\n'.join(lines) + '\n'
+
+    def init_app(self, app):
+        """Time every request and count its database queries"""
+        super().init_app(app)
+
+        @app.before_request
+        def start_request_timer():
+            g.metrics_started = time.perf_counter()
+            g.db_queries = 0
+            g.db_seconds = 0.0
+
+        @app.after_request
+        def observe_request(response):
+            started = g.pop('metrics_started', None)
+            if started is None:
+                return response
+
+            endpoint = request.url_rule.endpoint if request.url_rule else 'unmatched'
+            request_latency.observe(
+                time.perf_counter() - started, endpoint=endpoint, method=request.method, status=response.status_code
+            )
+            request_db_queries.observe(g.db_queries, endpoint=endpoint)
+            request_db_seconds.observe(g.db_seconds, endpoint=endpoint)
+            return response
+
+        with app.app_context():
+            engine = db.engine
+
+        @event.listens_for(engine, 'before_cursor_execute')
+        def start_query_timer(conn, cursor, statement, parameters, context, executemany):
+            conn.info['metrics_query_started'] = time.perf_counter()
+
+        @event.listens_for(engine, 'after_cursor_execute')
+        def observe_query(conn, cursor, statement, parameters, context, executemany):
+            elapsed = time.perf_counter() - conn.info['metrics_query_started']
+            # Queries from helper threads and the task worker have no request to charge
+            if has_request_context() and 'db_queries' in g:
+                g.db_queries += 1
+                g.db_seconds += elapsed
+
+metrics = MetricsRegistry()
+
+request_latency = metrics.histogram(
+    'http_request_duration_seconds', 'Time to build each response, by route', ['endpoint', 'method', 'status']
+)
+request_db_queries = metrics.histogram(
+    'http_request_db_queries', 'Database queries run by each request', ['endpoint'], QUERY_COUNT_BUCKETS
+)
+request_db_seconds = metrics.histogram(
+    'http_request_db_seconds', 'Time each request spent in database queries', ['endpoint']
+)
+grok_latency = metrics.histogram(
+    'grok_request_duration_seconds', 'Grok-3 API round trips, by analysis type', ['analysis_type', 'mode']
+)
+linkedin_latency = metrics.histogram(
+    'linkedin_request_duration_seconds', 'LinkedIn API round trips, by endpoint', ['endpoint']
+)
+
+def linkedin_endpoint(url):
+    """The URL's path, which names a LinkedIn endpoint without its member IDs"""
+    return urlparse(url).path or '/'
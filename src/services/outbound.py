@@ -0,0 +1,227 @@
+import os
+import time
+
+from sqlalchemy import case, select, update
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.models.models import OutboundServiceState, db
+from src.services.api_log import log_api_call
+from src.services.upsert import upsert_rows
+
+# Outbound protection defaults; each provider can override them by env prefix
+BREAKER_FAILURE_THRESHOLD = int(os.getenv('BREAKER_FAILURE_THRESHOLD', '5'))
+BREAKER_COOLDOWN_SECONDS = float(os.getenv('BREAKER_COOLDOWN_SECONDS', '30'))
+RATE_LIMIT_MAX_WAIT = float(os.getenv('RATE_LIMIT_MAX_WAIT', '5'))
+
+# Responses that count as provider failures
+FAILURE_STATUS_CODES = (429, 500, 502, 503, 504)
+
+class OutboundUnavailable(Exception):
+    """Raised instead of calling a provider that is failing or over quota"""
+
+class CircuitOpenError(OutboundUnavailable):
+    """The provider's circuit breaker is open"""
+
+class RateLimitedError(OutboundUnavailable):
+    """No rate limiter token became available in time"""
+
+class OutboundGuard:
+    """Shared token-bucket rate limiter and circuit breaker for one provider
+
+    State lives in an OutboundServiceState row so every worker draws from
+    the same bucket and sees the same breaker. Admitting a call is a single
+    write transaction, and a successful call only writes again when there
+    are failures to reset. Each process also remembers when it last saw
+    the breaker open, so calls during an outage fail without touching the
+    database.
+    """
+
+    def __init__(self, service, rate, burst, failure_threshold=None, cooldown=None, max_wait=None):
+        self.service = service
+        self.rate = rate
+        self.burst = burst
+        self.failure_threshold = failure_threshold or BREAKER_FAILURE_THRESHOLD
+        self.cooldown = BREAKER_COOLDOWN_SECONDS if cooldown is None else cooldown
+        self.max_wait = RATE_LIMIT_MAX_WAIT if max_wait is None else max_wait
+        self._open_until = 0.0
+        self._row_ready = False
+        self._failures_seen = True
+
+    def call(self, func, *args, **kwargs):
+        """Call func behind the breaker and rate limiter, returning its response"""
+        probe = self.before_call()
+
+        try:
+            response = func(*args, **kwargs)
+        except Exception:
+            self.after_call(False, probe)
+            raise
+
+        status_code = getattr(response, 'status_code', None)
+        self.after_call(status_code not in FAILURE_STATUS_CODES, probe, status_code)
+        return response
+
+    def before_call(self):
+        """Admit one call or raise, returning True when it is a half-open probe"""
+        if time.time() < self._open_until:
+            raise CircuitOpenError(f'{self.service} circuit is open')
+
+        deadline = time.monotonic() + self.max_wait
+
+        while True:
+            try:
+                probe = self._admit()
+            except SQLAlchemyError as e:
+                # Never let the guard's own storage take the provider down with it
+                print(f"Outbound guard error for {self.service}: {str(e)}")
+                return False
+
+            if probe is not None:
+                return probe
+
+            wait = 1.0 / self.rate
+            if time.monotonic() + wait > deadline:
+                raise RateLimitedError(f'{self.service} rate limit exceeded')
+
+            time.sleep(wait)
+
+    def after_call(self, success, probe=False, status_code=None):
+        """Record the outcome of an admitted call"""
+        if success and not probe and not self._failures_seen:
+            # Nothing to reset, so a healthy call costs no second write
+            return
+
+        table = OutboundServiceState.__table__
+        now = time.time()
+        this_service = table.c.service == self.service
+
+        try:
+            with db.engine.begin() as conn:
+                if probe:
+                    new_state = 'closed' if success else 'open'
+                    changed = conn.execute(
+                        update(table).where(this_service, table.c.breaker_state == 'half_open').values(
+                            breaker_state=new_state,
+                            failure_count=0 if success else self.failure_threshold,
+                            opened_at=None if success else now
+                        )
+                    )
+                    if changed.rowcount:
+                        self._log_transition('half_open', new_state, status_code)
+                        if not success:
+                            self._open_until = now + self.cooldown
+                elif success:
+                    conn.execute(
+                        update(table).where(
+                            this_service,
+                            table.c.breaker_state == 'closed',
+                            table.c.failure_count > 0
+                        ).values(failure_count=0)
+                    )
+                    self._failures_seen = False
+                else:
+                    conn.execute(
+                        update(table).where(this_service, table.c.breaker_state == 'closed').values(
+                            failure_count=table.c.failure_count + 1
+                        )
+                    )
+                    self._failures_seen = True
+                    opened = conn.execute(
+                        update(table).where(
+                            this_service,
+                            table.c.breaker_state == 'closed',
+                            table.c.failure_count >= self.failure_threshold
+                        ).values(breaker_state='open', opened_at=now)
+                    )
+                    if opened.rowcount:
+                        self._log_transition('closed', 'open', status_code)
+                        self._open_until = now + self.cooldown
+        except SQLAlchemyError as e:
+            print(f"Outbound guard error for {self.service}: {str(e)}")
+
+    def _ensure_row(self, conn):
+        if self._row_ready:
+            return
+
+        upsert_rows(conn, OutboundServiceState.__table__, [{
+            'service': self.service,
+            'tokens': float(self.burst),
+            'refilled_at': time.time(),
+            'breaker_state': 'closed',
+            'failure_count': 0
+        }], ['service'])
+        self._row_ready = True
+
+    def _admit(self):
+        """Take a token in one transaction, claiming the half-open probe if the breaker is due one
+
+        Returns True for a probe, False for a normal call, or None when the
+        bucket is empty and the caller should wait.
+        """
+        table = OutboundServiceState.__table__
+        this_service = table.c.service == self.service
+
+        with db.engine.begin() as conn:
+            self._ensure_row(conn)
+
+            now = time.time()
+            available = table.c.tokens + (now - table.c.refilled_at) * self.rate
+            level = case((available > self.burst, self.burst), else_=available)
+
+            # Closed breaker with a token to spare: the common case, one statement
+            taken = conn.execute(
+                update(table).where(this_service, table.c.breaker_state == 'closed', level >= 1).values(
+                    tokens=level - 1,
+                    refilled_at=now
+                )
+            )
+
+            row = conn.execute(
+                select(table.c.breaker_state, table.c.opened_at, table.c.failure_count, level.label('level'))
+                .where(this_service)
+            ).first()
+            self._failures_seen = row.failure_count > 0
+
+            if taken.rowcount == 1:
+                return False
+
+            if row.breaker_state == 'closed' or row.level < 1:
+                return None
+
+            retry_at = (row.opened_at or 0) + self.cooldown
+            if now < retry_at:
+                if row.breaker_state == 'open':
+                    self._open_until = retry_at
+                raise CircuitOpenError(f'{self.service} circuit is {row.breaker_state}')
+
+            # Cooldown over, or a probe went silent: let exactly one caller probe,
+            # taking its token in the same statement so a claimed probe always runs
+            claimed = conn.execute(
+                update(table).where(
+                    this_service,
+                    table.c.breaker_state != 'closed',
+                    table.c.opened_at <= now - self.cooldown,
+                    level >= 1
+                ).values(breaker_state='half_open', opened_at=now, tokens=level - 1, refilled_at=now)
+            )
+            if claimed.rowcount != 1:
+                raise CircuitOpenError(f'{self.service} circuit is half open')
+
+            if row.breaker_state == 'open':
+                self._log_transition('open', 'half_open')
+
+        return True
+
+    def _log_transition(self, old_state, new_state, status_code=None):
+        print(f"Circuit breaker for {self.service}: {old_state} -> {new_state}")
+        log_api_call(f'circuit/{self.service}/{new_state}', 'BREAKER', status_code=status_code)
+
+def guard_from_env(service, prefix, rate, burst):
+    """Build a guard whose limits can be overridden with PREFIX_* variables"""
+    return OutboundGuard(
+        service,
+        rate=float(os.getenv(f'{prefix}_RATE_LIMIT', str(rate))),  # requests per second
+        burst=int(os.getenv(f'{prefix}_RATE_BURST', str(burst))),
+        failure_threshold=int(os.getenv(f'{prefix}_BREAKER_THRESHOLD', str(BREAKER_FAILURE_THRESHOLD))),
+        cooldown=float(os.getenv(f'{prefix}_BREAKER_COOLDOWN', str(BREAKER_COOLDOWN_SECONDS)))
+    )
@@ -0,0 +1,198 @@
+import cProfile
+import os
+import re
+import time
+import traceback
+from datetime import datetime
+
+from flask import g, has_request_context, request
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from sqlalchemy import event
+
+from src.models.json_type import dumps
+from src.models.models import db
+
+# Profile every request; otherwise only requests with a valid profiling header
+PROFILER_ENABLED = os.getenv('PROFILER_ENABLED', '').lower() in ('1', 'true', 'yes')
+# Also run cProfile around every profiled request
+PROFILER_CPROFILE = os.getenv('PROFILER_CPROFILE', '').lower() in ('1', 'true', 'yes')
+# Where the per-request dumps go (default: <instance path>/profiles)
+PROFILER_DIR = os.getenv('PROFILER_DIR', '')
+# A statement shape run this many times in one request is reported as a suspected N+1
+PROFILER_REPEAT_THRESHOLD = int(os.getenv('PROFILER_REPEAT_THRESHOLD', '5'))
+# Seconds a signed profiling token stays valid
+PROFILER_TOKEN_MAX_AGE = int(os.getenv('PROFILER_TOKEN_MAX_AGE', str(24 * 3600)))
+
+PROFILE_HEADER = 'X-Profile'
+TOKEN_SALT = 'request-profiler'
+
+# Literals and placeholder lists that vary between runs of the same query
+QUOTED_LITERAL = re.compile(r"'(?:[^']|'')*'")
+NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+PLACEHOLDER_LIST = re.compile(r'\?(?:\s*,\s*\?)+|%s(?:\s*,\s*%s)+')
+WHITESPACE = re.compile(r'\s+')
+
+SRC_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+def statement_shape(statement):
+    """The statement with literals and IN lists collapsed, so repeats of one query compare equal"""
+    shape = QUOTED_LITERAL.sub('?', statement)
+    shape = NUMBER_LITERAL.sub('?', shape)
+    shape = PLACEHOLDER_LIST.sub('?', shape)
+    return WHITESPACE.sub(' ', shape).strip()
+
+def query_origin():
+    """The innermost application frame outside this module that ran the current query"""
+    for frame in reversed(traceback.extract_stack()):
+        if frame.filename.startswith(SRC_DIR) and frame.filename != __file__:
+            return f'{os.path.relpath(frame.filename, SRC_DIR)}:{frame.lineno} in {frame.name}'
+    return None
+
+class RequestProfile:
+    """Statements run by one request, grouped by shape"""
+
+    def __init__(self, cprofile=False):
+        self.started = time.perf_counter()
+        self.shapes = {}
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.profile = cProfile.Profile() if cprofile else None
+
+    def record(self, statement, seconds):
+        shape = statement_shape(statement)
+        entry = self.shapes.get(shape)
+        if entry is None:
+            # Walking the stack is slow, so only the first run of each shape is traced
+            entry = self.shapes[shape] = {'count': 0, 'seconds': 0.0, 'origin': query_origin()}
+        entry['count'] += 1
+        entry['seconds'] += seconds
+        self.queries += 1
+        self.query_seconds += seconds
+
+    def repeated(self):
+        """Shapes run at least PROFILER_REPEAT_THRESHOLD times, most frequent first"""
+        return sorted(
+            ({'statement': shape, **entry} for shape, entry in self.shapes.items()
+             if entry['count'] >= PROFILER_REPEAT_THRESHOLD),
+            key=lambda entry: entry['count'], reverse=True
+        )
+
+class RequestProfiler:
+    """Opt-in per-request profiling of SQL statements and, optionally, Python time
+
+    A request is profiled when PROFILER_ENABLED is set or when it carries
+    an X-Profile header signed with the app's secret key (see the
+    profile-token command). The response gets X-Profile-* and
+    Server-Timing headers with the query count, query time and suspected
+    N+1 statements, and the full report is written to the dump directory.
+    """
+
+    def __init__(self):
+        self.app = None
+        self.directory = None
+
+    def serializer(self):
+        return URLSafeTimedSerializer(self.app.config['SECRET_KEY'], salt=TOKEN_SALT)
+
+    def token(self, cprofile=False):
+        """A header value that turns profiling on for requests that send it"""
+        return self.serializer().dumps({'cprofile': cprofile})
+
+    def requested(self):
+        """Profiling options for the current request, or None if it is not profiled"""
+        token = request.headers.get(PROFILE_HEADER)
+        if token:
+            try:
+                return self.serializer().loads(token, max_age=PROFILER_TOKEN_MAX_AGE)
+            except BadSignature:
+                print(f"Ignoring invalid {PROFILE_HEADER} header on {request.path}")
+
+        if PROFILER_ENABLED:
+            return {'cprofile': PROFILER_CPROFILE}
+        return None
+
+    def init_app(self, app):
+        """Profile requests that ask for it and count their SQL statements"""
+        self.app = app
+        self.directory = PROFILER_DIR or os.path.join(app.instance_path, 'profiles')
+
+        @app.before_request
+        def start_profile():
+            options = self.requested()
+            if options is None:
+                return
+
+            g.request_profile = RequestProfile(cprofile=options.get('cprofile', False))
+            if g.request_profile.profile is not None:
+                g.request_profile.profile.enable()
+
+        @app.after_request
+        def finish_profile(response):
+            profile = g.pop('request_profile', None)
+            if profile is None:
+                return response
+
+            if profile.profile is not None:
+                profile.profile.disable()
+            self.report(profile, response)
+            return response
+
+        with app.app_context():
+            engine = db.engine
+
+        @event.listens_for(engine, 'before_cursor_execute')
+        def start_statement_timer(conn, cursor, statement, parameters, context, executemany):
+            conn.info['profiler_query_started'] = time.perf_counter()
+
+        @event.listens_for(engine, 'after_cursor_execute')
+        def record_statement(conn, cursor, statement, parameters, context, executemany):
+            if not has_request_context() or 'request_profile' not in g:
+                return
+            elapsed = time.perf_counter() - conn.info['profiler_query_started']
+            g.request_profile.record(statement, elapsed)
+
+    def report(self, profile, response):
+        """Add the summary headers to the response and write the dump files"""
+        elapsed = time.perf_counter() - profile.started
+        repeated = profile.repeated()
+        endpoint = request.url_rule.endpoint if request.url_rule else 'unmatched'
+
+        response.headers['X-Profile-Queries'] = str(profile.queries)
+        response.headers['X-Profile-Query-Time'] = f'{profile.query_seconds * 1000:.1f}ms'
+        response.headers['X-Profile-N-Plus-One'] = str(len(repeated))
+        response.headers.add(
+            'Server-Timing',
+            f'db;dur={profile.query_seconds * 1000:.1f};desc="{profile.queries} queries", '
+            f'app;dur={elapsed * 1000:.1f}'
+        )
+        for entry in repeated:
+            print(f"Suspected N+1 in {endpoint}: {entry['count']} runs from {entry['origin']}: "
+                  f"{entry['statement'][:200]}")
+
+        name = f"{datetime.utcnow():%Y%m%dT%H%M%S%f}-{endpoint.replace('.', '-')}"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(os.path.join(self.directory, f'{name}.json'), 'w') as dump:
+                dump.write(dumps({
+                    'endpoint': endpoint,
+                    'method': request.method,
+                    'path': request.full_path,
+                    'status': response.status_code,
+                    'elapsed': round(elapsed, 6),
+                    'queries': profile.queries,
+                    'query_seconds': round(profile.query_seconds, 6),
+                    'suspected_n_plus_one': repeated,
+                    'statements': sorted(
+                        ({'statement': shape, **entry} for shape, entry in profile.shapes.items()),
+                        key=lambda entry: entry['seconds'], reverse=True
+                    )
+                }))
+            if profile.profile is not None:
+                profile.profile.dump_stats(os.path.join(self.directory, f'{name}.prof'))
+        except OSError as e:
+            print(f"Error writing request profile: {str(e)}")
+            return
+
+        response.headers['X-Profile-Dump'] = name
+
+request_profiler = RequestProfiler()
@@ -0,0 +1,176 @@
+import os
+import socket
+import threading
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.models.models import JobAnalysis, JobAnalysisLease, db
+from src.services.upsert import UPSERT_CHUNK_SIZE, upsert_rows
+
+# Single-flight configuration for shared job analyses (owners renew their
+# leases after every Grok-3 chunk, so this only has to cover one chunk)
+ANALYSIS_LEASE_SECONDS = int(os.getenv('ANALYSIS_LEASE_SECONDS', '120'))
+ANALYSIS_WAIT_SECONDS = float(os.getenv('ANALYSIS_WAIT_SECONDS', '60'))
+ANALYSIS_POLL_INTERVAL = float(os.getenv('ANALYSIS_POLL_INTERVAL', '0.25'))
+
+# In-flight analyses in this process, by job ID
+_local_flights = {}
+_local_lock = threading.Lock()
+
+class AnalysisFlight:
+    """Job analyses this caller must run, and the ones it must wait for"""
+
+    def __init__(self, owner):
+        self.owner = owner
+        self.owned = []
+        self.waiting = []
+        self._events = {}
+
+def acquire_analysis_leases(job_ids):
+    """Claim the right to analyze each job
+
+    A job is owned by at most one caller per process (tracked in memory)
+    and across processes (tracked by a JobAnalysisLease row). Jobs claimed
+    elsewhere end up in flight.waiting.
+    """
+    flight = AnalysisFlight(f'{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}')
+
+    # Deduplicate within this process first
+    local_owned = []
+    with _local_lock:
+        for job_id in dict.fromkeys(job_ids):
+            if job_id in _local_flights:
+                flight.waiting.append(job_id)
+            else:
+                event = threading.Event()
+                _local_flights[job_id] = event
+                flight._events[job_id] = event
+                local_owned.append(job_id)
+
+    # Then across workers through the lease table, in bulk
+    table = JobAnalysisLease.__table__
+    now = datetime.utcnow()
+    expires_at = now + timedelta(seconds=ANALYSIS_LEASE_SECONDS)
+    owned = set()
+
+    for start in range(0, len(local_owned), UPSERT_CHUNK_SIZE):
+        chunk = local_owned[start:start + UPSERT_CHUNK_SIZE]
+
+        with db.engine.begin() as conn:
+            # Insert leases nobody holds, leaving existing ones alone
+            upsert_rows(conn, table, [
+                {'job_id': job_id, 'owner': flight.owner, 'expires_at': expires_at, 'created_at': now}
+                for job_id in chunk
+            ], ['job_id'])
+
+            # Take over leases whose holder died without releasing them
+            conn.execute(
+                update(table).where(
+                    table.c.job_id.in_(chunk),
+                    table.c.expires_at < now
+                ).values(owner=flight.owner, expires_at=expires_at, created_at=now)
+            )
+
+            owned.update(conn.execute(
+                select(table.c.job_id).where(
+                    table.c.job_id.in_(chunk),
+                    table.c.owner == flight.owner
+                )
+            ).scalars())
+
+    flight.owned = [job_id for job_id in local_owned if job_id in owned]
+    lost = [job_id for job_id in local_owned if job_id not in owned]
+    _release_local(flight, lost)
+    flight.waiting.extend(lost)
+
+    return flight
+
+def renew_analysis_leases(flight):
+    """Push back the expiry of every lease flight still holds
+
+    Long batches call this as chunks complete so waiters and other workers
+    never see a live owner's lease as expired.
+    """
+    if not flight.owned:
+        return
+
+    table = JobAnalysisLease.__table__
+    expires_at = datetime.utcnow() + timedelta(seconds=ANALYSIS_LEASE_SECONDS)
+
+    try:
+        with db.engine.begin() as conn:
+            for start in range(0, len(flight.owned), UPSERT_CHUNK_SIZE):
+                conn.execute(
+                    update(table).where(
+                        table.c.job_id.in_(flight.owned[start:start + UPSERT_CHUNK_SIZE]),
+                        table.c.owner == flight.owner
+                    ).values(expires_at=expires_at)
+                )
+    except SQLAlchemyError as e:
+        # A missed renewal only risks a duplicate analysis, so keep going
+        print(f"Error renewing analysis leases: {str(e)}")
+
+def release_analysis_leases(flight):
+    """Release every lease held by flight and wake local waiters"""
+    if flight.owned:
+        table = JobAnalysisLease.__table__
+        with db.engine.begin() as conn:
+            conn.execute(delete(table).where(
+                table.c.job_id.in_(flight.owned),
+                table.c.owner == flight.owner
+            ))
+
+    _release_local(flight, list(flight._events))
+
+def _release_local(flight, job_ids):
+    with _local_lock:
+        for job_id in job_ids:
+            event = flight._events.pop(job_id, None)
+            if event is not None:
+                _local_flights.pop(job_id, None)
+                event.set()
+
+def wait_for_analyses(job_ids, timeout=None):
+    """Block until other callers finish analyzing job_ids
+
+    Returns when every job has a JobAnalysis row or no live lease, or
+    once the timeout expires.
+    """
+    timeout = ANALYSIS_WAIT_SECONDS if timeout is None else timeout
+    deadline = time.monotonic() + timeout
+    pending = set(job_ids)
+
+    # Waiters in this process are woken directly by the owner
+    with _local_lock:
+        events = [_local_flights.get(job_id) for job_id in pending]
+    for event in events:
+        if event is not None:
+            event.wait(max(0, deadline - time.monotonic()))
+
+    analysis_table = JobAnalysis.__table__
+    lease_table = JobAnalysisLease.__table__
+
+    while pending:
+        # Fresh connection per poll so REPEATABLE READ snapshots never hide new rows
+        with db.engine.connect() as conn:
+            analyzed = set(conn.execute(
+                select(analysis_table.c.job_id).where(analysis_table.c.job_id.in_(pending))
+            ).scalars())
+            leased = set(conn.execute(
+                select(lease_table.c.job_id).where(
+                    lease_table.c.job_id.in_(pending),
+                    lease_table.c.expires_at >= datetime.utcnow()
+                )
+            ).scalars())
+
+        pending -= analyzed
+        pending &= leased
+
+        if not pending or time.monotonic() >= deadline:
+            break
+
+        time.sleep(ANALYSIS_POLL_INTERVAL)
@@ -0,0 +1,265 @@
+import os
+import signal
+import socket
+import time
+import traceback
+from datetime import datetime, timedelta
+
+from sqlalchemy import or_, select, update
+
+from src.models.models import BackgroundTask, db
+
+# Task queue configuration
+TASK_QUEUE_EAGER = os.getenv('TASK_QUEUE_EAGER', 'false').lower() in ('1', 'true', 'yes')
+TASK_LEASE_SECONDS = int(os.getenv('TASK_LEASE_SECONDS', '300'))
+TASK_MAX_ATTEMPTS = int(os.getenv('TASK_MAX_ATTEMPTS', '3'))
+TASK_POLL_INTERVAL = float(os.getenv('TASK_POLL_INTERVAL', '1.0'))
+
+# Registered task handlers by task type
+TASK_HANDLERS = {}
+
+class TaskContext:
+    """Handle passed to task handlers for reporting progress"""
+
+    def __init__(self, task_id, user_id, worker_id):
+        self.task_id = task_id
+        self.user_id = user_id
+        self.worker_id = worker_id
+
+    def progress(self, percent, message=None):
+        """Record task progress and extend the worker's lease"""
+        values = {
+            'progress': max(0, min(100, int(percent))),
+            'locked_until': datetime.utcnow() + timedelta(seconds=TASK_LEASE_SECONDS),
+            'updated_at': datetime.utcnow()
+        }
+        if message is not None:
+            values['message'] = message[:200]
+
+        # Own connection so progress is visible before the handler commits
+        table = BackgroundTask.__table__
+        with db.engine.begin() as conn:
+            conn.execute(update(table).where(table.c.id == self.task_id).values(**values))
+
+def task(task_type):
+    """Register a background task handler"""
+    def decorator(f):
+        TASK_HANDLERS[task_type] = f
+        return f
+    return decorator
+
+def enqueue(task_type, user_id=None, **payload):
+    """Queue a background task and return it"""
+    if task_type not in TASK_HANDLERS:
+        raise ValueError(f'Unknown task type: {task_type}')
+
+    new_task = BackgroundTask(
+        user_id=user_id,
+        task_type=task_type,
+        payload=payload,
+        status='queued',
+        progress=0
+    )
+    db.session.add(new_task)
+    db.session.commit()
+
+    if TASK_QUEUE_EAGER:
+        # Run inline for development setups without a worker
+        run_task(new_task.id, worker_id='eager')
+        db.session.refresh(new_task)
+
+    return new_task
+
+def claim_next_task(worker_id):
+    """Atomically claim the oldest runnable task, returning its ID or None"""
+    table = BackgroundTask.__table__
+    now = datetime.utcnow()
+
+    runnable = or_(
+        table.c.status == 'queued',
+        # Tasks whose worker died mid-run become runnable again
+        (table.c.status == 'running') & (table.c.locked_until < now)
+    )
+
+    with db.engine.begin() as conn:
+        candidates = conn.execute(
+            select(table.c.id).where(runnable).order_by(table.c.id).limit(5)
+        ).scalars().all()
+
+    for task_id in candidates:
+        with db.engine.begin() as conn:
+            claimed = conn.execute(
+                update(table).where(table.c.id == task_id, runnable).values(
+                    status='running',
+                    locked_by=worker_id,
+                    locked_until=now + timedelta(seconds=TASK_LEASE_SECONDS),
+                    started_at=now,
+                    attempts=table.c.attempts + 1,
+                    updated_at=now
+                )
+            )
+        if claimed.rowcount == 1:
+            return task_id
+
+    return None
+
+def finish_task(task_id, status, result=None, error=None):
+    """Record the outcome of a task"""
+    table = BackgroundTask.__table__
+    now = datetime.utcnow()
+    values = {
+        'status': status,
+        'locked_by': None,
+        'locked_until': None,
+        'updated_at': now
+    }
+
+    if status in ('succeeded', 'failed'):
+        values['finished_at'] = now
+    if status == 'succeeded':
+        values['progress'] = 100
+        values['result'] = result
+        values['error'] = None
+    if error is not None:
+        values['error'] = error
+
+    with db.engine.begin() as conn:
+        conn.execute(update(table).where(table.c.id == task_id).values(**values))
+
+def run_task(task_id, worker_id):
+    """Run a claimed task and record its outcome"""
+    queued_task = db.session.get(BackgroundTask, task_id)
+    if not queued_task:
+        return
+
+    handler = TASK_HANDLERS.get(queued_task.task_type)
+    payload = queued_task.payload or {}
+    attempts = queued_task.attempts or 0
+    context = TaskContext(task_id, queued_task.user_id, worker_id)
+
+    try:
+        if handler is None:
+            raise ValueError(f'Unknown task type: {queued_task.task_type}')
+
+        result = handler(context, **payload)
+    except Exception as e:
+        db.session.rollback()
+        print(f"Task {task_id} ({queued_task.task_type}) failed: {str(e)}")
+        traceback.print_exc()
+
+        # Retry until the attempt budget is spent
+        if handler is not None and 0 < attempts < TASK_MAX_ATTEMPTS:
+            finish_task(task_id, 'queued', error=str(e))
+        else:
+            finish_task(task_id, 'failed', error=str(e))
+        return
+
+    finish_task(task_id, 'succeeded', result=result)
+
+def run_worker(app, poll_interval=None, once=False):
+    """Process queued tasks until stopped"""
+    poll_interval = TASK_POLL_INTERVAL if poll_interval is None else poll_interval
+    worker_id = f'{socket.gethostname()}:{os.getpid()}'
+    stopping = []
+
+    def stop(signum, frame):
+        stopping.append(signum)
+
+    signal.signal(signal.SIGTERM, stop)
+    signal.signal(signal.SIGINT, stop)
+
+    print(f"Task worker {worker_id} started")
+
+    while not stopping:
+        with app.app_context():
+            task_id = claim_next_task(worker_id)
+
+            if task_id is not None:
+                run_task(task_id, worker_id)
+                db.session.remove()
+                continue
+
+        if once:
+            break
+
+        time.sleep(poll_interval)
+
+    print(f"Task worker {worker_id} stopped")
+
+@task('profile_analysis')
+def profile_analysis_task(context):
+    """Analyze the user's LinkedIn profile with Grok-3"""
+    from src.routes.grok import run_profile_analysis
+
+    context.progress(10, 'Analyzing profile')
+    analysis_result, error = run_profile_analysis(context.user_id)
+
+    if error:
+        raise RuntimeError(error[0])
+
+    return analysis_result
+
+@task('job_analysis')
+def job_analysis_task(context, job_ids):
+    """Analyze jobs with Grok-3"""
+    from src.models.models import Job
+    from src.routes.grok import analyze_jobs_batch
+
+    jobs = Job.query.filter(Job.id.in_(job_ids)).all()
+    context.progress(10, f'Analyzing {len(jobs)} jobs')
+    job_analyses = analyze_jobs_batch(
+        jobs,
+        on_progress=lambda done, total: context.progress(10 + 85 * done / max(total, 1), f'Analyzed {done} of {total} jobs')
+    )
+
+    return {'analyzed': len(job_analyses)}
+
+@task('job_matching')
+def job_matching_task(context, job_ids):
+    """Match jobs to the user's profile with Grok-3"""
+    from src.models.models import Job
+    from src.routes.grok import match_jobs_batch
+    from src.services.match_stats import match_bucket
+
+    jobs = Job.query.filter(Job.id.in_(job_ids)).all()
+    context.progress(10, f'Matching {len(jobs)} jobs')
+    new_matches, error = match_jobs_batch(context.user_id, jobs, progress=context.progress)
+
+    if error:
+        raise RuntimeError(error[0])
+
+    return {
+        'match_count': len(new_matches),
+        'matches': [
+            {'job_id': match.job_id, 'match_score': match.match_score, 'bucket': match_bucket(match.match_score)}
+            for match in new_matches
+        ]
+    }
+
+@task('refresh_matches')
+def refresh_matches_task(context):
+    """Rematch every job for the user"""
+    from src.routes.grok import refresh_user_matches
+
+    context.progress(5, 'Refreshing matches')
+    summary, error = refresh_user_matches(context.user_id, progress=context.progress)
+
+    if error:
+        raise RuntimeError(error[0])
+
+    return summary
+
+@task('delete_user_rows')
+def delete_user_rows_task(context, rows):
+    """Delete one kind of the user's rows in chunks"""
+    from src.services.data_deletion import DELETABLE_ROWS, delete_user_rows
+
+    return delete_user_rows(context.user_id, DELETABLE_ROWS[rows], progress=context.progress)
+
+@task('delete_account')
+def delete_account_task(context, account_id):
+    """Delete a user account and all related data in chunks"""
+    from src.services.data_deletion import delete_account
+
+    # Passed explicitly, since the deletion clears this task's own user_id
+    return delete_account(account_id, progress=context.progress)
@@ -0,0 +1,58 @@
+from sqlalchemy import insert
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.exc import IntegrityError
+
+# Rows per statement, well under SQLite's bound-parameter limit
+UPSERT_CHUNK_SIZE = 500
+
+def upsert_statement(dialect_name, table, rows, index_elements, update_columns=None, increment_columns=None):
+    """Build a dialect-aware INSERT that updates or ignores conflicting rows
+
+    update_columns are overwritten with the new values and
+    increment_columns have the new values added to them. With neither,
+    conflicting rows are left untouched. Returns None for dialects without
+    native upsert support.
+    """
+    update_columns = update_columns or []
+    increment_columns = increment_columns or []
+
+    if dialect_name in ('sqlite', 'postgresql'):
+        dialect = sqlite if dialect_name == 'sqlite' else postgresql
+        stmt = dialect.insert(table).values(rows)
+        if not update_columns and not increment_columns:
+            return stmt.on_conflict_do_nothing(index_elements=index_elements)
+        set_ = {column: stmt.excluded[column] for column in update_columns}
+        set_.update({column: table.c[column] + stmt.excluded[column] for column in increment_columns})
+        return stmt.on_conflict_do_update(index_elements=index_elements, set_=set_)
+
+    if dialect_name in ('mysql', 'mariadb'):
+        stmt = mysql.insert(table).values(rows)
+        if not update_columns and not increment_columns:
+            return stmt.prefix_with('IGNORE')
+        set_ = {column: stmt.inserted[column] for column in update_columns}
+        set_.update({column: table.c[column] + stmt.inserted[column] for column in increment_columns})
+        return stmt.on_duplicate_key_update(**set_)
+
+    return None
+
+def upsert_rows(conn, table, rows, index_elements, update_columns=None, increment_columns=None):
+    """Insert rows in chunks, updating (or ignoring) rows that already exist"""
+    for start in range(0, len(rows), UPSERT_CHUNK_SIZE):
+        chunk = rows[start:start + UPSERT_CHUNK_SIZE]
+        stmt = upsert_statement(conn.dialect.name, table, chunk, index_elements, update_columns, increment_columns)
+
+        if stmt is not None:
+            conn.execute(stmt)
+            continue
+
+        # Portable fallback: one savepoint per row
+        for row in chunk:
+            try:
+                with conn.begin_nested():
+                    conn.execute(insert(table).values(**row))
+            except IntegrityError:
+                if update_columns or increment_columns:
+                    criteria = [table.c[column] == row[column] for column in index_elements]
+                    values = {column: row[column] for column in update_columns or []}
+                    values.update({column: table.c[column] + row[column] for column in increment_columns or []})
+                    conn.execute(table.update().where(*criteria).values(**values))
@@ -172,6 +172,194 @@ function validateWizardForm(formId) {
     return true;
 }
 
+// Poll a background task until it finishes
+function pollTask(statusUrl, onProgress, interval) {
+    interval = interval || 1000;
+    
+    return new Promise(function(resolve, reject) {
+        function check() {
+            fetch(statusUrl, { headers: { 'Accept': 'application/json' } })
+            .then(response => response.json())
+            .then(task => {
+                if (task.error && !task.status) {
+                    reject(new Error(task.error));
+                    return;
+                }
+                
+                if (onProgress) {
+                    onProgress(task);
+                }
+                
+                if (task.status === 'succeeded') {
+                    resolve(task);
+                } else if (task.status === 'failed') {
+                    reject(new Error(task.error || 'Task failed'));
+                } else {
+                    setTimeout(check, interval);
+                }
+            })
+            .catch(reject);
+        }
+        
+        check();
+    });
+}
+
+// Wait for a queued request to finish, or return its immediate result
+function awaitTaskResponse(data, onProgress) {
+    if (data.status_url) {
+        return pollTask(data.status_url, onProgress);
+    }
+    
+    return Promise.resolve(data.task || data);
+}
+
+// Build a compact match card for live match lists
+function buildMatchCard(match) {
+    var card = document.createElement('div');
+    card.className = 'list-group-item list-group-item-action';
+    card.setAttribute('data-match-job-id', match.job_id);
+    
+    var header = document.createElement('div');
+    header.className = 'd-flex w-100 justify-content-between';
+    
+    var title = document.createElement('h6');
+    title.className = 'mb-1';
+    title.textContent = match.title || '';
+    
+    var score = document.createElement('div');
+    score.className = 'match-score';
+    
+    header.appendChild(title);
+    header.appendChild(score);
+    
+    var company = document.createElement('p');
+    company.className = 'mb-1';
+    company.textContent = match.company || '';
+    
+    var link = document.createElement('a');
+    link.className = 'btn btn-sm btn-outline-primary';
+    link.href = match.url || '#';
+    link.textContent = 'View Details';
+    
+    var footer = document.createElement('small');
+    footer.className = 'text-muted';
+    footer.appendChild(link);
+    
+    card.appendChild(header);
+    card.appendChild(company);
+    card.appendChild(footer);
+    return card;
+}
+
+// Update every card for a job with a new or changed match
+function applyMatchUpdate(match) {
+    var cards = document.querySelectorAll('[data-match-job-id="' + match.job_id + '"]');
+    var list = document.getElementById('liveMatches');
+    
+    if (cards.length === 0 && list) {
+        var limit = parseInt(list.getAttribute('data-limit') || '0');
+        var lowest = list.lastElementChild ? parseInt(list.lastElementChild.getAttribute('data-score') || '0') : 0;
+        
+        // Only list matches that make the top of a full list
+        if (!limit || list.children.length < limit || match.score > lowest) {
+            list.appendChild(buildMatchCard(match));
+            cards = [list.lastElementChild];
+            
+            var empty = document.getElementById('liveMatchesEmpty');
+            if (empty) {
+                empty.remove();
+            }
+        }
+    }
+    
+    cards.forEach(function(card) {
+        card.setAttribute('data-score', match.score);
+        
+        var scoreElement = card.querySelector('.match-score');
+        if (scoreElement) {
+            scoreElement.className = 'match-score match-' + match.bucket;
+            scoreElement.textContent = match.score + '%';
+        }
+    });
+    
+    if (list) {
+        sortMatchList(list);
+    }
+}
+
+// Keep a live match list ordered by score and within its limit
+function sortMatchList(list) {
+    var cards = [].slice.call(list.children);
+    cards.forEach(function(card) {
+        if (!card.hasAttribute('data-score')) {
+            var scoreElement = card.querySelector('.match-score');
+            card.setAttribute('data-score', scoreElement ? parseInt(scoreElement.textContent) || 0 : 0);
+        }
+    });
+    
+    cards.sort(function(a, b) {
+        return parseInt(b.getAttribute('data-score')) - parseInt(a.getAttribute('data-score'));
+    });
+    cards.forEach(function(card) {
+        list.appendChild(card);
+    });
+    
+    var limit = parseInt(list.getAttribute('data-limit') || '0');
+    while (limit && list.children.length > limit) {
+        list.lastElementChild.remove();
+    }
+}
+
+// Show background task progress
+function applyTaskUpdate(task) {
+    document.querySelectorAll('[data-task-id="' + task.id + '"]').forEach(function(progressBar) {
+        progressBar.style.width = (task.progress || 0) + '%';
+        progressBar.setAttribute('aria-valuenow', task.progress || 0);
+    });
+    
+    var status = document.getElementById('liveTaskStatus');
+    if (!status) return;
+    
+    if (task.status === 'queued' || task.status === 'running') {
+        status.textContent = (task.message || 'Working') + ' (' + (task.progress || 0) + '%)';
+        status.classList.remove('d-none');
+    } else {
+        status.textContent = task.status === 'failed' ? 'Background task failed' : (task.message || 'Done');
+        setTimeout(function() {
+            status.classList.add('d-none');
+        }, 3000);
+    }
+}
+
+// Subscribe to live match and task updates
+var LIVE_UPDATES_RETRY_MS = 30000;
+
+function initLiveUpdates(container) {
+    if (!window.EventSource) return null;
+    
+    var source = new EventSource(container.getAttribute('data-stream-url'));
+    
+    source.addEventListener('match', function(event) {
+        applyMatchUpdate(JSON.parse(event.data));
+    });
+    
+    source.addEventListener('task', function(event) {
+        applyTaskUpdate(JSON.parse(event.data));
+    });
+    
+    // A busy server answers 204, which closes the stream for good; try again later
+    source.addEventListener('error', function() {
+        if (source.readyState === EventSource.CLOSED) {
+            setTimeout(function() {
+                initLiveUpdates(container);
+            }, LIVE_UPDATES_RETRY_MS);
+        }
+    });
+    
+    return source;
+}
+
 // LinkedIn profile analysis
 function analyzeProfile() {
     var analyzeButton = document.getElementById('analyzeProfileBtn');
@@ -185,24 +373,11 @@ function analyzeProfile() {
     progressBar.parentElement.classList.remove('d-none');
     resultContainer.classList.add('d-none');
     
-    // Simulate analysis progress
-    var progress = 0;
-    var interval = setInterval(function() {
-        progress += 5;
+    function setProgress(progress) {
         progressBar.style.width = progress + '%';
         progressBar.setAttribute('aria-valuenow', progress);
-        
-        if (progress >= 100) {
-            clearInterval(interval);
-            setTimeout(function() {
-                progressBar.parentElement.classList.add('d-none');
-                resultContainer.classList.remove('d-none');
-                analyzeButton.disabled = false;
-            }, 500);
-        }
-    }, 200);
+    }
     
-    // In a real implementation, this would make an AJAX call to the server
     fetch('/grok/analyze-profile', {
         method: 'POST',
         headers: {
@@ -211,8 +386,22 @@ function analyzeProfile() {
     })
     .then(response => response.json())
     .then(data => {
-        // Handle response
-        console.log('Profile analysis complete', data);
+        if (data.error) {
+            throw new Error(data.error);
+        }
+        
+        return awaitTaskResponse(data, function(task) {
+            setProgress(task.progress || 0);
+        });
+    })
+    .then(task => {
+        console.log('Profile analysis complete', task.result);
+        setProgress(100);
+        setTimeout(function() {
+            progressBar.parentElement.classList.add('d-none');
+            resultContainer.classList.remove('d-none');
+            analyzeButton.disabled = false;
+        }, 500);
     })
     .catch(error => {
         console.error('Error analyzing profile:', error);
@@ -229,7 +418,6 @@ function matchJob(jobId) {
     matchButton.disabled = true;
     matchButton.innerHTML = '<span class="spinner-border spinner-border-sm" role="status" aria-hidden="true"></span> Matching...';
     
-    // In a real implementation, this would make an AJAX call to the server
     fetch('/grok/match-job', {
         method: 'POST',
         headers: {
@@ -239,9 +427,27 @@ function matchJob(jobId) {
     })
     .then(response => response.json())
     .then(data => {
-        // Handle response
-        console.log('Job matching complete', data);
-        window.location.reload();
+        if (data.error) {
+            throw new Error(data.error);
+        }
+        
+        return awaitTaskResponse(data);
+    })
+    .then(result => {
+        console.log('Job matching complete', result);
+        
+        // Existing matches come back directly, new ones as a task result
+        var matches = result.match ? [{ job_id: parseInt(jobId), score: result.match.score, bucket: result.match.bucket }] : ((result.result || {}).matches || []);
+        matches.forEach(function(match) {
+            applyMatchUpdate({
+                job_id: match.job_id,
+                score: match.score !== undefined ? match.score : match.match_score,
+                bucket: match.bucket
+            });
+        });
+        
+        var score = matches.length ? (matches[0].score !== undefined ? matches[0].score : matches[0].match_score) : null;
+        matchButton.innerHTML = score !== null ? 'Match: ' + score + '%' : 'No match';
     })
     .catch(error => {
         console.error('Error matching job:', error);
@@ -268,9 +474,17 @@ function applyToJob(jobId) {
     })
     .then(response => response.json())
     .then(data => {
-        // Handle response
+        if (data.error) {
+            throw new Error(data.error);
+        }
+        
         console.log('Job application complete', data);
-        window.location.reload();
+        
+        // Swap the button for an applied badge in place
+        var badge = document.createElement('span');
+        badge.className = 'badge bg-success';
+        badge.textContent = 'Applied';
+        applyButton.replaceWith(badge);
     })
     .catch(error => {
         console.error('Error applying to job:', error);
@@ -291,6 +505,12 @@ document.addEventListener('DOMContentLoaded', function() {
         initDashboardCharts();
     }
     
+    // Subscribe to live updates on pages that show matches
+    var liveContainer = document.querySelector('[data-live-updates]');
+    if (liveContainer) {
+        initLiveUpdates(liveContainer);
+    }
+    
     // Initialize profile analysis button if it exists
     var analyzeButton = document.getElementById('analyzeProfileBtn');
     if (analyzeButton) {
@@ -6,5 +6,41 @@ export FLASK_APP=src.main
 export FLASK_ENV=production
 export PYTHONPATH=/home/ubuntu/linkedin_job_app_web
 
+# Apply database migrations (stamping databases from db.create_all() first)
+flask upgrade-db
+
+# Run queued background tasks next to the web server (set START_TASK_WORKER=false
+# when a separate `flask worker` process is deployed)
+WORKER_PID=
+if [ "${START_TASK_WORKER:-true}" != "false" ]; then
+    (
+        trap 'kill -TERM $CHILD_PID 2>/dev/null; wait $CHILD_PID; exit 0' TERM INT
+        # Restart the worker if it ever exits
+        while true; do
+            flask worker &
+            CHILD_PID=$!
+            wait $CHILD_PID
+            echo "Task worker exited with status $?; restarting in 5 seconds" >&2
+            sleep 5
+        done
+    ) &
+    WORKER_PID=$!
+fi
+
 # Start Gunicorn server
-exec gunicorn --bind 0.0.0.0:5000 --workers 2 --timeout 120 src.main:app
+gunicorn --bind 0.0.0.0:5000 --workers 2 --worker-class gthread --threads 8 --timeout 120 src.main:app &
+WEB_PID=$!
+
+# Pass shutdown signals on to both processes
+trap 'kill -TERM $WEB_PID $WORKER_PID 2>/dev/null' TERM INT
+
+wait $WEB_PID
+STATUS=$?
+
+# Stop the worker once the web server has gone
+if [ -n "$WORKER_PID" ]; then
+    kill -TERM $WORKER_PID 2>/dev/null
+    wait $WORKER_PID
+fi
+wait $WEB_PID 2>/dev/null
+exit $STATUS